@@ -9,16 +9,22 @@ nested relationships, and custom business logic for MCQ assessments.
 from rest_framework import serializers
 from django.db import transaction
 from django.db.models import Q, Count, Avg, F
+from django.utils.text import slugify
 
 from apps.assessments.models import (
     QuestionCategory, MultipleChoiceQuestion, 
     QuestionChoice, QuestionResponse, Assessment
 )
+from apps.assessments.mcq_scoring_module.mcq_submission import (
+    MCQSubmissionError, MCQSubmissionService
+)
 
 
 class QuestionChoiceSerializer(serializers.ModelSerializer):
     """Serializer for question choices."""
     
+    risk_factor = serializers.BooleanField(source='contributes_to_risk', read_only=True)
+    
     class Meta:
         model = QuestionChoice
         fields = [
@@ -39,6 +45,8 @@ class MultipleChoiceQuestionSerializer(serializers.ModelSerializer):
         read_only=True,
         allow_null=True
     )
+    created_at = serializers.DateTimeField(source='created', read_only=True)
+    updated_at = serializers.DateTimeField(source='updated', read_only=True)
     
     class Meta:
         model = MultipleChoiceQuestion
@@ -55,9 +63,12 @@ class MultipleChoiceQuestionSerializer(serializers.ModelSerializer):
 class QuestionCategorySerializer(serializers.ModelSerializer):
     """Serializer for question categories with statistics."""
     
+    slug = serializers.SerializerMethodField()
     question_count = serializers.SerializerMethodField()
     completion_rate = serializers.SerializerMethodField()
     average_score = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField(source='created', read_only=True)
+    updated_at = serializers.DateTimeField(source='updated', read_only=True)
     
     class Meta:
         model = QuestionCategory
@@ -69,6 +80,10 @@ class QuestionCategorySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
     
+    def get_slug(self, obj):
+        """Slug derived from the category name."""
+        return slugify(obj.name)
+    
     def get_question_count(self, obj):
         """Get count of active questions in category."""
         return obj.questions.filter(is_active=True).count()
@@ -167,46 +182,12 @@ class MCQResponseBulkSerializer(serializers.Serializer):
         return value
     
     def create(self, validated_data):
-        """Create multiple responses in a transaction."""
-        responses_data = validated_data['responses']
-        assessment = self.context['assessment']
-        created_responses = []
-        
-        with transaction.atomic():
-            # Delete existing responses for this assessment
-            QuestionResponse.objects.filter(assessment=assessment).delete()
-            
-            for response_data in responses_data:
-                question_id = response_data.pop('question_id')
-                
-                try:
-                    question = MultipleChoiceQuestion.objects.get(
-                        id=question_id,
-                        is_active=True
-                    )
-                except MultipleChoiceQuestion.DoesNotExist:
-                    raise serializers.ValidationError(
-                        f"질문 ID {question_id}를 찾을 수 없습니다."
-                    )
-                
-                # Create response
-                response = QuestionResponse.objects.create(
-                    assessment=assessment,
-                    question=question,
-                    response_text=response_data.get('response_text', '')
-                )
-                
-                # Add selected choices
-                choice_ids = response_data.get('selected_choices', [])
-                if choice_ids:
-                    choices = QuestionChoice.objects.filter(
-                        id__in=choice_ids,
-                        question=question
-                    )
-                    response.selected_choices.set(choices)
-                    response.save()  # Trigger points calculation
-                
-                created_responses.append(response)
+        """Replace the assessment's responses in one bulk transaction."""
+        service = MCQSubmissionService(self.context['assessment'])
+        try:
+            created_responses = service.submit(validated_data['responses'], replace=True)
+        except MCQSubmissionError as e:
+            raise serializers.ValidationError(str(e))
         
         return {'responses': created_responses}
 
@@ -122,11 +122,15 @@ class AssessmentSerializer(serializers.ModelSerializer):
                   'balance_score', 'cardio_score',
                   # Risk Assessment
                   'injury_risk_score', 'risk_factors',
+                  # Normative snapshot
+                  'percentile_rankings_snapshot', 'performance_age_snapshot', 'norm_version',
                   # Metadata
                   'created_at']
         read_only_fields = ['id', 'trainer', 'created_at', 'overall_score', 
                            'strength_score', 'mobility_score', 'balance_score', 
-                           'cardio_score', 'injury_risk_score', 'risk_factors']
+                           'cardio_score', 'injury_risk_score', 'risk_factors',
+                           'percentile_rankings_snapshot', 'performance_age_snapshot',
+                           'norm_version']
     
     def create(self, validated_data):
         """Create assessment with current user's trainer"""
@@ -13,6 +13,7 @@ from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count, Avg, Prefetch
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
@@ -20,6 +21,8 @@ from apps.assessments.models import (
     QuestionCategory, MultipleChoiceQuestion,
     QuestionChoice, QuestionResponse, Assessment
 )
+from apps.assessments.mcq_catalog import get_catalog
+from apps.assessments.mcq_scoring_module import mcq_analytics
 from apps.trainers.decorators import (
     requires_trainer, organization_member_required
 )
@@ -39,6 +42,37 @@ class MCQPagination(PageNumberPagination):
     max_page_size = 100
 
 
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CatalogETagMixin:
+    """
+    Serve read-only MCQ data from the cached catalog snapshot.
+    
+    Responses carry the catalog's content ETag; a matching If-None-Match
+    header gets a 304 without serializing anything.
+    """
+    
+    def catalog_response(self, request, catalog, build):
+        """
+        Args:
+            request: Current request
+            catalog: MCQCatalog snapshot the response is built from
+            build: Callable returning the Response for a changed catalog
+        """
+        etag = catalog.etag
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        response = build()
+        response['ETag'] = etag
+        return response
+
+
 @extend_schema_view(
     list=extend_schema(
         summary="List MCQ categories",
@@ -51,7 +85,7 @@ class MCQPagination(PageNumberPagination):
         tags=["MCQ"]
     )
 )
-class QuestionCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class QuestionCategoryViewSet(CatalogETagMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for question categories."""
     
     queryset = QuestionCategory.objects.filter(is_active=True)
@@ -84,6 +118,15 @@ class QuestionCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def questions(self, request, pk=None):
         """Get all questions for a specific category."""
+        catalog = get_catalog()
+        category_id = _to_int(pk)
+        if catalog is not None and catalog.has_category(category_id):
+            return self.catalog_response(request, catalog, lambda: Response(
+                MultipleChoiceQuestionSerializer(
+                    catalog.questions_for(category_id), many=True
+                ).data
+            ))
+        
         category = self.get_object()
         
         questions = MultipleChoiceQuestion.objects.filter(
@@ -147,9 +190,13 @@ class QuestionCategoryViewSet(viewsets.ReadOnlyModelViewSet):
         tags=["MCQ"]
     )
 )
-class MultipleChoiceQuestionViewSet(viewsets.ReadOnlyModelViewSet):
+class MultipleChoiceQuestionViewSet(CatalogETagMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for multiple choice questions."""
     
+    # Query parameters that can be answered from the catalog snapshot;
+    # filtering, search and custom ordering still go to the database
+    CATALOG_LIST_PARAMS = {'page', 'page_size', 'format'}
+    
     queryset = MultipleChoiceQuestion.objects.filter(is_active=True)
     serializer_class = MultipleChoiceQuestionSerializer
     permission_classes = [IsAuthenticated]
@@ -183,6 +230,30 @@ class MultipleChoiceQuestionViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        """List active questions, from the catalog snapshot when unfiltered."""
+        catalog = get_catalog()
+        if catalog is None or set(request.query_params) - self.CATALOG_LIST_PARAMS:
+            return super().list(request, *args, **kwargs)
+        
+        def build():
+            page = self.paginate_queryset(list(catalog.questions))
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        return self.catalog_response(request, catalog, build)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a question, from the catalog snapshot when it is listed there."""
+        catalog = get_catalog()
+        question = catalog.question(_to_int(kwargs.get('pk'))) if catalog is not None else None
+        if question is None:
+            return super().retrieve(request, *args, **kwargs)
+        
+        return self.catalog_response(
+            request, catalog, lambda: Response(self.get_serializer(question).data)
+        )
+    
     @extend_schema(
         summary="Validate question answer",
         description="Validate an answer and calculate points earned",
@@ -308,11 +379,8 @@ class MCQAssessmentAPIView(viewsets.GenericViewSet):
         )
         serializer.is_valid(raise_exception=True)
         
-        # Save responses
-        result = serializer.save()
-        
-        # Update assessment MCQ scores
-        assessment.calculate_mcq_scores()
+        # Save responses; MCQ scores are recomputed once by the bulk write
+        serializer.save()
         
         # Return updated MCQ status
         mcq_serializer = MCQAssessmentSerializer(assessment)
@@ -363,129 +431,17 @@ class MCQAnalyticsViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='category-scores')
     def category_scores(self, request):
         """Get average scores by category for the organization."""
-        trainer = request.user.trainer
-        organization = trainer.organization
-        
-        # Get all assessments for the organization
-        assessments = Assessment.objects.filter(
-            trainer__organization=organization
-        ).exclude(
-            comprehensive_score__isnull=True
-        )
-        
-        # Calculate average scores by category
-        category_scores = []
-        
-        categories = QuestionCategory.objects.filter(is_active=True)
-        for category in categories:
-            if category.slug == 'knowledge':
-                avg_score = assessments.aggregate(
-                    avg=Avg('knowledge_score')
-                )['avg'] or 0
-            elif category.slug == 'lifestyle':
-                avg_score = assessments.aggregate(
-                    avg=Avg('lifestyle_score')
-                )['avg'] or 0
-            elif category.slug == 'readiness':
-                avg_score = assessments.aggregate(
-                    avg=Avg('readiness_score')
-                )['avg'] or 0
-            else:
-                avg_score = 0
-            
-            category_scores.append({
-                'category': category.name_ko,
-                'slug': category.slug,
-                'average_score': round(avg_score, 1),
-                'assessment_count': assessments.count()
-            })
-        
-        return Response(category_scores)
+        organization = request.user.trainer_profile.organization
+        return Response(mcq_analytics.category_scores(organization))
     
     @action(detail=False, methods=['get'], url_path='risk-factors')
     def risk_factors(self, request):
         """Get most common risk factors from MCQ responses."""
-        trainer = request.user.trainer
-        organization = trainer.organization
-        
-        # Get all responses for the organization
-        responses = QuestionResponse.objects.filter(
-            assessment__trainer__organization=organization
-        ).prefetch_related('selected_choices')
-        
-        # Count risk factors
-        risk_factor_counts = {}
-        
-        for response in responses:
-            for choice in response.selected_choices.all():
-                if choice.risk_factor:
-                    if choice.risk_factor not in risk_factor_counts:
-                        risk_factor_counts[choice.risk_factor] = 0
-                    risk_factor_counts[choice.risk_factor] += 1
-        
-        # Sort by count and return top 10
-        sorted_factors = sorted(
-            risk_factor_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
-        
-        result = [
-            {
-                'risk_factor': factor,
-                'count': count,
-                'percentage': round(count / len(responses) * 100, 1) if responses else 0
-            }
-            for factor, count in sorted_factors
-        ]
-        
-        return Response(result)
+        organization = request.user.trainer_profile.organization
+        return Response(mcq_analytics.risk_factors(organization))
     
     @action(detail=False, methods=['get'], url_path='completion-rates')
     def completion_rates(self, request):
         """Get MCQ completion rates by category."""
-        trainer = request.user.trainer
-        organization = trainer.organization
-        
-        # Get all assessments for the organization
-        assessments = Assessment.objects.filter(
-            trainer__organization=organization
-        ).prefetch_related(
-            'question_responses__question__category'
-        )
-        
-        # Calculate completion rates
-        completion_data = []
-        
-        categories = QuestionCategory.objects.filter(is_active=True)
-        for category in categories:
-            total_questions = category.questions.filter(
-                is_active=True
-            ).count()
-            
-            if total_questions == 0:
-                continue
-            
-            # Count assessments with complete responses for this category
-            complete_count = 0
-            
-            for assessment in assessments:
-                answered = assessment.question_responses.filter(
-                    question__category=category
-                ).count()
-                
-                if answered == total_questions:
-                    complete_count += 1
-            
-            completion_data.append({
-                'category': category.name_ko,
-                'slug': category.slug,
-                'total_questions': total_questions,
-                'completion_rate': round(
-                    complete_count / assessments.count() * 100, 1
-                ) if assessments.count() > 0 else 0,
-                'complete_count': complete_count,
-                'total_assessments': assessments.count()
-            })
-        
-        return Response(completion_data)
\ No newline at end of file
+        organization = request.user.trainer_profile.organization
+        return Response(mcq_analytics.completion_rates(organization))
\ No newline at end of file
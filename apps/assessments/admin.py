@@ -11,6 +11,7 @@ from .models import (
     QuestionCategory, MultipleChoiceQuestion, 
     QuestionChoice, QuestionResponse
 )
+from . import mcq_catalog, score_dependencies, standards_index
 
 
 @admin.register(Assessment)
@@ -207,7 +208,7 @@ class TestStandardAdmin(admin.ModelAdmin):
     
     actions = [
         'duplicate_standard', 'activate_standards', 'deactivate_standards',
-        'test_standard_scoring', 'export_standards'
+        'test_standard_scoring', 'preview_affected_assessments', 'export_standards'
     ]
     
     def duplicate_standard(self, request, queryset):
@@ -238,16 +239,47 @@ class TestStandardAdmin(admin.ModelAdmin):
     
     def activate_standards(self, request, queryset):
         """Activate selected standards."""
+        changed = list(queryset.filter(is_active=False))
         updated = queryset.update(is_active=True)
-        self.message_user(request, f"{updated}개의 기준이 활성화되었습니다.")
+        # queryset.update() bypasses post_save, so refresh the index and
+        # queue the affected assessments explicitly
+        standards_index.invalidate()
+        queued = score_dependencies.enqueue(
+            score_dependencies.affected_assessments(standards=changed)
+        )
+        self.message_user(
+            request,
+            f"{updated}개의 기준이 활성화되었습니다. {queued}개의 평가가 재계산 대기열에 추가되었습니다."
+        )
     activate_standards.short_description = "선택된 기준 활성화"
     
     def deactivate_standards(self, request, queryset):
         """Deactivate selected standards."""
+        changed = list(queryset.filter(is_active=True))
         updated = queryset.update(is_active=False)
-        self.message_user(request, f"{updated}개의 기준이 비활성화되었습니다.")
+        standards_index.invalidate()
+        queued = score_dependencies.enqueue(
+            score_dependencies.affected_assessments(standards=changed)
+        )
+        self.message_user(
+            request,
+            f"{updated}개의 기준이 비활성화되었습니다. {queued}개의 평가가 재계산 대기열에 추가되었습니다."
+        )
     deactivate_standards.short_description = "선택된 기준 비활성화"
     
+    def preview_affected_assessments(self, request, queryset):
+        """Report how many assessments, per organization, depend on the selected standards."""
+        report = score_dependencies.impact_report(
+            score_dependencies.affected_assessments(standards=queryset)
+        )
+        lines = [f"{name}: {count}개" for name, count in report['organizations'][:20]]
+        self.message_user(
+            request,
+            f"선택된 기준을 변경하면 {report['assessments']}개의 평가 점수가 재계산됩니다.\n"
+            + "\n".join(lines)
+        )
+    preview_affected_assessments.short_description = "영향 받는 평가 미리보기"
+    
     def test_standard_scoring(self, request, queryset):
         """Test scoring with selected standards."""
         tested_count = 0
@@ -322,15 +354,10 @@ class TestStandardAdmin(admin.ModelAdmin):
     export_standards.short_description = "선택된 기준 CSV 내보내기"
     
     def save_model(self, request, obj, form, change):
-        """Override save to clear cache when standards are modified."""
+        """Override save to notify that the standards index was refreshed."""
+        # post_save on TestStandard rebuilds the in-memory standards index
         super().save_model(request, obj, form, change)
         
-        # Clear related cache entries
-        from django.core.cache import cache
-        cache_pattern = f"test_standard_{obj.test_type}_*"
-        # Note: In production, you might want to use a more sophisticated cache invalidation
-        cache.clear()  # Clear all cache for simplicity
-        
         if change:
             self.message_user(
                 request,
@@ -527,6 +554,9 @@ class MultipleChoiceQuestionAdmin(admin.ModelAdmin):
                                 )
                         
                         imported_count += 1
+                    
+                    # Publish one new catalog version for the whole import
+                    mcq_catalog.invalidate()
                 
                 messages.success(request, f'{imported_count}개의 질문을 성공적으로 가져왔습니다.')
                 return redirect('admin:assessments_multiplechoicequestion_changelist')
@@ -657,6 +687,9 @@ class MultipleChoiceQuestionAdmin(admin.ModelAdmin):
                             )
                         
                         imported_count += 1
+                    
+                    # Publish one new catalog version for the whole import
+                    mcq_catalog.invalidate()
                 
                 messages.success(request, f'{imported_count}개의 질문을 성공적으로 가져왔습니다.')
                 return redirect('admin:assessments_multiplechoicequestion_changelist')
@@ -749,12 +782,15 @@ class MultipleChoiceQuestionAdmin(admin.ModelAdmin):
     def activate_questions(self, request, queryset):
         """Activate selected questions."""
         updated = queryset.update(is_active=True)
+        # queryset.update() bypasses post_save, so bump the catalog explicitly
+        mcq_catalog.invalidate()
         messages.success(request, f'{updated}개의 질문이 활성화되었습니다.')
     activate_questions.short_description = "선택된 질문 활성화"
     
     def deactivate_questions(self, request, queryset):
         """Deactivate selected questions."""
         updated = queryset.update(is_active=False)
+        mcq_catalog.invalidate()
         messages.success(request, f'{updated}개의 질문이 비활성화되었습니다.')
     deactivate_questions.short_description = "선택된 질문 비활성화"
     
@@ -766,6 +802,7 @@ class MultipleChoiceQuestionAdmin(admin.ModelAdmin):
             if category_id:
                 category = QuestionCategory.objects.get(pk=category_id)
                 updated = queryset.update(category=category)
+                mcq_catalog.invalidate()
                 messages.success(request, f'{updated}개의 질문 카테고리가 변경되었습니다.')
             return redirect(request.get_full_path())
         
@@ -0,0 +1,358 @@
+"""
+Vectorized batch scoring for many assessments at once.
+
+The functions here mirror the scalar scoring functions in
+apps.assessments.scoring, taking columnar arrays (one entry per assessment)
+instead of single values. Thresholds are resolved once per distinct
+(gender, age, variation) group through the same TestStandard lookup and
+hardcoded fallbacks as the scalar path, and then applied to whole columns
+with NumPy.
+
+Results are bit-identical to calling the scalar functions row by row: the
+arithmetic is performed in the same order on the same float64 values.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .scoring import (
+    BALANCE_THRESHOLDS,
+    FARMERS_CARRY_THRESHOLDS,
+    STEP_TEST_THRESHOLDS,
+    _fallback_pushup_thresholds,
+    get_test_standard,
+)
+
+
+GENDER_MAP = {'Male': 'M', 'Female': 'F', '남성': 'M', '여성': 'F'}
+
+# Variation adjustment applied by the hardcoded push-up fallback
+PUSHUP_VARIATION_FACTORS = {'modified': 0.7, 'wall': 0.4}
+
+# Defaults used by calculate_category_scores for missing assessment values
+CATEGORY_DEFAULTS = {
+    'push_up_score': 1,
+    'farmers_carry_score': 1,
+    'toe_touch_score': 1,
+    'shoulder_mobility_score': 1,
+    'overhead_squat_score': 1,
+    'single_leg_balance_right_open': 0,
+    'single_leg_balance_left_open': 0,
+    'single_leg_balance_right_closed': 0,
+    'single_leg_balance_left_closed': 0,
+    'step_test_hr1': 90,
+    'step_test_hr2': 80,
+    'step_test_hr3': 70,
+}
+
+
+def _as_float_array(values, size=None) -> np.ndarray:
+    """Convert a column to a float64 array, treating None as NaN."""
+    if np.isscalar(values) or values is None:
+        return np.full(size, np.nan if values is None else values, dtype=np.float64)
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'biuf':
+        return values.astype(np.float64, copy=False)
+    return np.array(
+        [np.nan if value is None else value for value in values],
+        dtype=np.float64
+    )
+
+
+def _as_object_array(values, size) -> np.ndarray:
+    """Convert a categorical column (or a single value) to an object array."""
+    if values is None or isinstance(values, str):
+        return np.full(size, values, dtype=object)
+    return np.asarray(list(values), dtype=object)
+
+
+def _bucket(values: np.ndarray, excellent, good, average) -> np.ndarray:
+    """
+    Vectorized equivalent of the 4-tier if/elif threshold chain.
+
+    Thresholds may be scalars or per-row arrays.
+    """
+    return np.select(
+        [values >= excellent, values >= good, values >= average],
+        [4, 3, 2],
+        default=1
+    )
+
+
+def batch_pushup_scores(gender: Sequence[str], age: Sequence[int], reps: Sequence[int],
+                        push_up_type: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Vectorized calculate_pushup_score.
+
+    Args:
+        gender: 'Male'/'남성' or 'Female'/'여성' per assessment
+        age: Age in years per assessment
+        reps: Number of repetitions per assessment
+        push_up_type: Push-up type per assessment (or a single value for all)
+
+    Returns:
+        np.ndarray: Integer scores from 1-4
+    """
+    reps = np.maximum(0, _as_float_array(reps))
+    size = len(reps)
+    ages = np.clip(np.asarray(age, dtype=np.int64), 0, 120)
+    genders = np.array([GENDER_MAP.get(g, 'M') for g in _as_object_array(gender, size)], dtype=object)
+    types = _as_object_array(push_up_type if push_up_type is not None else 'standard', size)
+
+    excellent = np.empty(size, dtype=np.float64)
+    good = np.empty(size, dtype=np.float64)
+    average = np.empty(size, dtype=np.float64)
+    from_standard = np.empty(size, dtype=bool)
+    factor = np.ones(size, dtype=np.float64)
+
+    # Resolve thresholds once per distinct (gender, age, type) group
+    groups = {}
+    for i, key in enumerate(zip(genders, ages.tolist(), types)):
+        groups.setdefault(key, []).append(i)
+
+    for (db_gender, group_age, group_type), rows in groups.items():
+        rows = np.asarray(rows)
+        standard = get_test_standard('push_up', db_gender, group_age, group_type)
+        if standard:
+            excellent[rows] = standard.excellent_threshold
+            good[rows] = standard.good_threshold
+            average[rows] = standard.average_threshold
+            from_standard[rows] = True
+        else:
+            thresholds = _fallback_pushup_thresholds(db_gender, group_age)
+            excellent[rows] = thresholds['excellent']
+            good[rows] = thresholds['good']
+            average[rows] = thresholds['average']
+            from_standard[rows] = False
+            factor[rows] = PUSHUP_VARIATION_FACTORS.get(group_type or 'standard', 1.0)
+
+    # The hardcoded fallback scores int(reps); standards compare the raw value
+    values = np.where(from_standard, reps, np.trunc(reps))
+    scores = _bucket(values, excellent, good, average)
+
+    adjusted = factor != 1.0
+    if adjusted.any():
+        scores = np.where(
+            adjusted,
+            np.clip(np.round(scores * factor), 1, 4),
+            scores
+        ).astype(np.int64)
+    return scores
+
+
+def _balance_condition_scores(values: np.ndarray, conditions: str) -> np.ndarray:
+    standard = get_test_standard('balance', 'A', 30, None, conditions)
+    if standard:
+        return _bucket(values, standard.excellent_threshold,
+                       standard.good_threshold, standard.average_threshold)
+    thresholds = BALANCE_THRESHOLDS['closed' if conditions == 'eyes_closed' else 'open']
+    return _bucket(values, thresholds['excellent'], thresholds['good'], thresholds['average'])
+
+
+def batch_single_leg_balance_scores(right_open, left_open, right_closed, left_closed) -> np.ndarray:
+    """
+    Vectorized calculate_single_leg_balance_score.
+
+    Returns:
+        np.ndarray: Float scores from 1.0-4.0
+    """
+    right_open = np.clip(_as_float_array(right_open), 0, 120)
+    left_open = np.clip(_as_float_array(left_open), 0, 120)
+    right_closed = np.clip(_as_float_array(right_closed), 0, 120)
+    left_closed = np.clip(_as_float_array(left_closed), 0, 120)
+
+    open_eyes_avg = (right_open + left_open) / 2
+    closed_eyes_avg = (right_closed + left_closed) / 2
+
+    open_score = _balance_condition_scores(open_eyes_avg, 'eyes_open').astype(np.float64)
+    closed_score = _balance_condition_scores(closed_eyes_avg, 'eyes_closed').astype(np.float64)
+
+    return (open_score * 0.4) + (closed_score * 0.6)
+
+
+def batch_farmers_carry_scores(gender: Sequence[str], time: Sequence[float],
+                               body_weight_percentage=None) -> np.ndarray:
+    """
+    Vectorized calculate_farmers_carry_score.
+
+    Args:
+        gender: 'Male'/'남성' or 'Female'/'여성' per assessment
+        time: Carry time in seconds per assessment
+        body_weight_percentage: Optional percentage of body weight per assessment
+
+    Returns:
+        np.ndarray: Float scores from 1.0-4.0
+    """
+    time = np.maximum(0, _as_float_array(time))
+    size = len(time)
+    genders = np.array([GENDER_MAP.get(g, 'M') for g in _as_object_array(gender, size)], dtype=object)
+
+    base_score = np.empty(size, dtype=np.float64)
+    for db_gender in set(genders.tolist()):
+        rows = genders == db_gender
+        standard = get_test_standard('farmer_carry', db_gender, 30)
+        if standard:
+            thresholds = (standard.excellent_threshold, standard.good_threshold,
+                          standard.average_threshold)
+        else:
+            fallback_key = {'M': 'Male', 'F': 'Female', 'A': 'Male'}.get(db_gender, db_gender)
+            fallback = FARMERS_CARRY_THRESHOLDS['time'].get(
+                fallback_key, FARMERS_CARRY_THRESHOLDS['time']['Male']
+            )
+            thresholds = (fallback['excellent'], fallback['good'], fallback['average'])
+        base_score[rows] = _bucket(time[rows], *thresholds)
+
+    if body_weight_percentage is not None:
+        bwp = _as_float_array(body_weight_percentage, size)
+        has_bwp = ~np.isnan(bwp) & (bwp > 0)
+        lighter = has_bwp & (bwp < 50)
+        heavier = has_bwp & (bwp > 100)
+        base_score = np.where(lighter, base_score * np.maximum(0.5, bwp / 50), base_score)
+        base_score = np.where(
+            heavier,
+            base_score * np.minimum(1.2, 1 + (bwp - 100) / 500),
+            base_score
+        )
+
+    return np.clip(base_score, 1.0, 4.0)
+
+
+def batch_step_test_scores(hr1, hr2, hr3):
+    """
+    Vectorized calculate_step_test_score.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (Scores from 1-4, Physical Fitness Index)
+    """
+    hr1 = np.clip(_as_float_array(hr1), 40, 220)
+    hr2 = np.clip(_as_float_array(hr2), 40, 220)
+    hr3 = np.clip(_as_float_array(hr3), 40, 220)
+
+    test_duration = 180  # 3 minutes in seconds
+    pfi = (100 * test_duration) / (2 * (hr1 + hr2 + hr3))
+
+    thresholds = STEP_TEST_THRESHOLDS['pfi']
+    scores = _bucket(pfi, thresholds['excellent'], thresholds['good'], thresholds['average'])
+    return scores, pfi
+
+
+def batch_temperature_adjustment(scores, temperature, test_environment) -> np.ndarray:
+    """
+    Vectorized apply_temperature_adjustment.
+
+    Args:
+        scores: Base scores per assessment
+        temperature: Temperature in Celsius per assessment (None for unknown)
+        test_environment: 'indoor' or 'outdoor' per assessment (or a single value)
+    """
+    scores = _as_float_array(scores)
+    size = len(scores)
+    temperature = _as_float_array(temperature, size)
+    outdoor = _as_object_array(test_environment, size) == 'outdoor'
+
+    deviation = np.where(temperature < 15, 15 - temperature, temperature - 25)
+    adjustment_factor = 1 + np.minimum(0.1, deviation * 0.01)
+    adjusted = np.minimum(scores * adjustment_factor, 100)
+
+    needs_adjustment = outdoor & ~np.isnan(temperature) & ((temperature < 15) | (temperature > 25))
+    return np.where(needs_adjustment, adjusted, scores)
+
+
+def batch_category_scores(assessment_data: Dict[str, Any], size: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_category_scores.
+
+    Args:
+        assessment_data: Columns keyed like the scalar assessment_data dict.
+            Missing columns use the same defaults as the scalar function.
+        size: Number of assessments (inferred from the columns if omitted)
+
+    Returns:
+        Dict[str, np.ndarray]: Category scores and PFI, one entry per assessment
+    """
+    if size is None:
+        size = len(next(iter(assessment_data.values())))
+
+    def column(key):
+        return _as_float_array(assessment_data.get(key, CATEGORY_DEFAULTS[key]), size)
+
+    # Strength - Push-up and Farmer's Carry
+    strength_score = (column('push_up_score') + column('farmers_carry_score')) / 2 * 25
+
+    # Mobility - Toe Touch and Shoulder Mobility (0-3 normalized to 1-4)
+    shoulder_mobility_score = column('shoulder_mobility_score')
+    shoulder_mobility_normalized = np.where(
+        shoulder_mobility_score == 0, 1, 1 + shoulder_mobility_score
+    )
+    mobility_score = (column('toe_touch_score') + shoulder_mobility_normalized) / 2 * 25
+
+    # Balance - Single Leg Balance and Overhead Squat (0-3 normalized to 1-4)
+    single_leg_balance_score = batch_single_leg_balance_scores(
+        column('single_leg_balance_right_open'),
+        column('single_leg_balance_left_open'),
+        column('single_leg_balance_right_closed'),
+        column('single_leg_balance_left_closed')
+    )
+    overhead_squat_score = column('overhead_squat_score')
+    overhead_squat_normalized = np.where(
+        overhead_squat_score == 0, 1, 1 + overhead_squat_score
+    )
+    balance_score = (single_leg_balance_score + overhead_squat_normalized) / 2 * 25
+
+    # Cardio - Harvard Step Test
+    step_test_score, pfi = batch_step_test_scores(
+        column('step_test_hr1'), column('step_test_hr2'), column('step_test_hr3')
+    )
+    cardio_score = step_test_score * 20
+
+    overall_score = (
+        strength_score * 0.3 +
+        mobility_score * 0.25 +
+        balance_score * 0.25 +
+        cardio_score * 0.2
+    )
+
+    return {
+        'overall_score': overall_score,
+        'strength_score': strength_score,
+        'mobility_score': mobility_score,
+        'balance_score': balance_score,
+        'cardio_score': cardio_score,
+        'pfi': pfi,
+    }
+
+
+def batch_calculate_scores(assessment_data: Dict[str, Any], gender: Sequence[str],
+                           age: Sequence[int], push_up_reps=None, push_up_type=None,
+                           temperature=None, test_environment='indoor') -> Dict[str, np.ndarray]:
+    """
+    Score N assessments end to end from raw columns.
+
+    Push-up scores are derived from `push_up_reps` when given, category
+    scores are computed with batch_category_scores, and the overall score
+    gets the outdoor temperature adjustment.
+
+    Args:
+        assessment_data: Columns keyed like the scalar assessment_data dict
+        gender: 'Male'/'남성' or 'Female'/'여성' per assessment
+        age: Age in years per assessment
+        push_up_reps: Optional push-up repetitions per assessment
+        push_up_type: Optional push-up type per assessment
+        temperature: Optional temperature in Celsius per assessment
+        test_environment: 'indoor' or 'outdoor' per assessment
+
+    Returns:
+        Dict[str, np.ndarray]: Category scores, PFI and push_up_score arrays
+    """
+    size = len(gender)
+    data = dict(assessment_data)
+
+    if push_up_reps is not None:
+        data['push_up_score'] = batch_pushup_scores(gender, age, push_up_reps, push_up_type)
+
+    scores = batch_category_scores(data, size=size)
+    scores['overall_score'] = batch_temperature_adjustment(
+        scores['overall_score'], temperature, test_environment
+    )
+    scores['push_up_score'] = _as_float_array(data.get('push_up_score', 1), size)
+    return scores
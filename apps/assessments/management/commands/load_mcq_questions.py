@@ -17,6 +17,7 @@ import os
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.conf import settings
+from apps.assessments import mcq_catalog
 from apps.assessments.models import QuestionCategory, MultipleChoiceQuestion, QuestionChoice, QuestionResponse
 
 
@@ -93,6 +94,8 @@ class Command(BaseCommand):
                 
                 if dry_run:
                     transaction.set_rollback(True)
+                else:
+                    mcq_catalog.invalidate()
                 
                 self.display_summary(stats)
                 
@@ -3,9 +3,11 @@ Management command to load normative data for fitness assessments.
 This command loads standardized fitness data based on ACSM guidelines and Korean population studies.
 """
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from apps.assessments.models import NormativeData
+from apps.assessments import norms_table
 
 
 class Command(BaseCommand):
@@ -23,6 +25,11 @@ class Command(BaseCommand):
             default='ACSM',
             help='Data source to load (ACSM, Korean, or All)',
         )
+        parser.add_argument(
+            '--refresh-snapshots',
+            action='store_true',
+            help='Refresh assessment percentile snapshots made with older normative data',
+        )
 
     def handle(self, *args, **options):
         if options['clear']:
@@ -38,7 +45,17 @@ class Command(BaseCommand):
         if source in ['KOREAN', 'ALL']:
             self.load_korean_data()
         
+        # Make every worker reload its cached normative table
+        norms_table.invalidate()
+        
         self.stdout.write(self.style.SUCCESS('Successfully loaded normative data'))
+        
+        if options['refresh_snapshots']:
+            call_command('refresh_norm_snapshots', stdout=self.stdout)
+        else:
+            self.stdout.write(
+                'Run "manage.py refresh_norm_snapshots" to update stale assessment snapshots'
+            )
 
     @transaction.atomic
     def load_acsm_data(self):
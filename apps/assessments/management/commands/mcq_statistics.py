@@ -2,26 +2,32 @@
 Generate MCQ response statistics and insights.
 
 This command analyzes MCQ responses to provide insights about question
-effectiveness, response patterns, and assessment quality.
+effectiveness, response patterns, and assessment quality. Responses are
+streamed once and accumulated in counters (see apps.assessments.mcq_stats);
+long ranges can be split into date shards collected by worker processes.
+Exports are written section by section as CSV or JSON.
 
 Usage:
     python manage.py mcq_statistics
     python manage.py mcq_statistics --category "Knowledge Assessment"
     python manage.py mcq_statistics --trainer 5
     python manage.py mcq_statistics --start-date 2025-01-01 --end-date 2025-12-31
+    python manage.py mcq_statistics --start-date 2020-01-01 --shards 12 --workers 4
     python manage.py mcq_statistics --export stats.csv
+    python manage.py mcq_statistics --export stats.json
 """
 
 import csv
+import json
+import os
 from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
-from django.db.models import Count, Avg, Q, F, Sum, StdDev
 from django.utils import timezone
-from apps.assessments.models import (
-    QuestionCategory, MultipleChoiceQuestion, 
-    QuestionChoice, QuestionResponse, Assessment
-)
-from apps.trainers.models import Trainer
+from apps.assessments import mcq_stats
+from apps.assessments.models import QuestionCategory, MultipleChoiceQuestion
+
+
+QUESTION_TYPES = ['single', 'multiple', 'scale', 'text']
 
 
 class Command(BaseCommand):
@@ -51,13 +57,30 @@ class Command(BaseCommand):
         parser.add_argument(
             '--export',
             type=str,
-            help='Export statistics to CSV file'
+            help='Export statistics to a CSV or JSON file'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='Export format (default: from the export file extension, else csv)'
         )
         parser.add_argument(
             '--detailed',
             action='store_true',
             help='Show detailed question-level statistics'
         )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=1,
+            help='Number of date ranges the period is split into (default: 1)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes collecting shards (default: 1, in-process)'
+        )
     
     def handle(self, *args, **options):
         category_filter = options['category']
@@ -87,51 +110,33 @@ class Command(BaseCommand):
         self.stdout.write(f"Generating MCQ statistics from {start_date.date()} to {end_date.date()}")
         
         # Collect statistics
+        responses = mcq_stats.collect(
+            start_date, end_date, trainer_id,
+            shards=options['shards'], workers=max(1, options['workers'])
+        )
+        summary = mcq_stats.assessment_summary(start_date, end_date, trainer_id)
         stats = {
-            'overview': self.get_overview_stats(start_date, end_date, trainer_id),
-            'categories': self.get_category_stats(category_filter, start_date, end_date, trainer_id),
-            'questions': self.get_question_stats(category_filter, start_date, end_date, trainer_id, detailed),
-            'response_patterns': self.get_response_patterns(start_date, end_date, trainer_id),
-            'quality_metrics': self.get_quality_metrics(start_date, end_date, trainer_id)
+            'overview': self.get_overview_stats(summary, responses),
+            'categories': self.get_category_stats(category_filter, summary, responses),
+            'questions': self.get_question_stats(category_filter, responses),
+            'response_patterns': self.get_response_patterns(responses),
+            'quality_metrics': self.get_quality_metrics(summary, responses)
         }
         
         # Display or export statistics
         if export_file:
-            self.export_statistics(stats, export_file)
+            export_format = options['format'] or (
+                'json' if os.path.splitext(export_file)[1].lower() == '.json' else 'csv'
+            )
+            self.export_statistics(stats, export_file, export_format)
         else:
             self.display_statistics(stats, detailed)
     
-    def get_overview_stats(self, start_date, end_date, trainer_id):
+    def get_overview_stats(self, summary, responses):
         """Get general overview statistics."""
-        # Filter assessments
-        assessment_filter = Q(date__gte=start_date, date__lte=end_date)
-        if trainer_id:
-            assessment_filter &= Q(trainer_id=trainer_id)
-        
-        assessments = Assessment.objects.filter(assessment_filter)
-        total_assessments = assessments.count()
-        
-        # MCQ completion stats
-        assessments_with_mcq = assessments.filter(
-            question_responses__isnull=False
-        ).distinct().count()
-        
-        # Response stats
-        response_filter = Q(assessment__date__gte=start_date, assessment__date__lte=end_date)
-        if trainer_id:
-            response_filter &= Q(assessment__trainer_id=trainer_id)
-        
-        total_responses = QuestionResponse.objects.filter(response_filter).count()
-        
-        # Score statistics
-        mcq_scores = assessments.exclude(
-            knowledge_score__isnull=True
-        ).aggregate(
-            avg_knowledge=Avg('knowledge_score'),
-            avg_lifestyle=Avg('lifestyle_score'),
-            avg_readiness=Avg('readiness_score'),
-            avg_comprehensive=Avg('comprehensive_score')
-        )
+        total_assessments = summary['total']
+        assessments_with_mcq = responses.assessments_with_responses
+        total_responses = responses.total_responses
         
         return {
             'total_assessments': total_assessments,
@@ -139,54 +144,56 @@ class Command(BaseCommand):
             'mcq_completion_rate': (assessments_with_mcq / total_assessments * 100) if total_assessments > 0 else 0,
             'total_responses': total_responses,
             'avg_responses_per_assessment': total_responses / assessments_with_mcq if assessments_with_mcq > 0 else 0,
-            'score_averages': mcq_scores
+            'score_averages': {
+                key: summary[key]
+                for key in ('avg_knowledge', 'avg_lifestyle', 'avg_readiness', 'avg_comprehensive')
+            }
         }
     
-    def get_category_stats(self, category_filter, start_date, end_date, trainer_id):
+    def get_category_stats(self, category_filter, summary, responses):
         """Get statistics by category."""
-        categories = QuestionCategory.objects.filter(is_active=True)
+        categories = QuestionCategory.objects.filter(is_active=True).prefetch_related('questions')
         if category_filter:
             categories = categories.filter(name=category_filter)
         
+        assessment_count = summary['total']
+        
         category_stats = []
         
         for category in categories:
-            # Get questions in category
-            questions = category.multiplechoicequestion_set.filter(is_active=True)
-            
-            # Build response filter
-            response_filter = Q(
-                question__category=category,
-                assessment__date__gte=start_date,
-                assessment__date__lte=end_date
-            )
-            if trainer_id:
-                response_filter &= Q(assessment__trainer_id=trainer_id)
+            # All questions count towards responses, active ones towards rates
+            all_questions = list(category.questions.all())
+            questions = [question for question in all_questions if question.is_active]
             
-            # Calculate stats
-            responses = QuestionResponse.objects.filter(response_filter)
-            response_count = responses.count()
-            avg_points = responses.aggregate(avg=Avg('points_earned'))['avg'] or 0
+            response_count = 0
+            points_earned = 0
+            for question in all_questions:
+                question_responses, points = responses.totals(question.id)
+                response_count += question_responses
+                points_earned += points
+            avg_points = points_earned / response_count if response_count else 0
             
             # Calculate response rate
-            possible_responses = questions.count() * Assessment.objects.filter(
-                date__gte=start_date, date__lte=end_date
-            ).count()
+            possible_responses = len(questions) * assessment_count
             response_rate = (response_count / possible_responses * 100) if possible_responses > 0 else 0
             
+            avg_question_points = (
+                sum(question.points for question in questions) / len(questions)
+            ) if questions else 0
+            
             category_stats.append({
                 'name': category.name_ko,
                 'weight': float(category.weight),
-                'active_questions': questions.count(),
+                'active_questions': len(questions),
                 'total_responses': response_count,
                 'response_rate': response_rate,
                 'avg_points_earned': avg_points,
-                'avg_score': (avg_points / questions.aggregate(avg=Avg('points'))['avg'] * 100) if questions.exists() else 0
+                'avg_score': (avg_points / avg_question_points * 100) if avg_question_points else 0
             })
         
         return category_stats
     
-    def get_question_stats(self, category_filter, start_date, end_date, trainer_id, detailed):
+    def get_question_stats(self, category_filter, responses):
         """Get question-level statistics."""
         questions = MultipleChoiceQuestion.objects.filter(is_active=True)
         if category_filter:
@@ -194,18 +201,8 @@ class Command(BaseCommand):
         
         question_stats = []
         
-        for question in questions.select_related('category'):
-            # Build response filter
-            response_filter = Q(
-                question=question,
-                assessment__date__gte=start_date,
-                assessment__date__lte=end_date
-            )
-            if trainer_id:
-                response_filter &= Q(assessment__trainer_id=trainer_id)
-            
-            responses = QuestionResponse.objects.filter(response_filter)
-            response_count = responses.count()
+        for question in questions.select_related('category').prefetch_related('choices'):
+            response_count, points_earned = responses.totals(question.id)
             
             if response_count == 0:
                 continue
@@ -216,7 +213,7 @@ class Command(BaseCommand):
                 'question': question.question_text_ko[:50] + '...',
                 'type': question.get_question_type_display(),
                 'response_count': response_count,
-                'avg_points': responses.aggregate(avg=Avg('points_earned'))['avg'] or 0,
+                'avg_points': points_earned / response_count,
                 'max_points': question.points
             }
             
@@ -225,7 +222,7 @@ class Command(BaseCommand):
                 # Choice distribution
                 choice_stats = []
                 for choice in question.choices.all():
-                    selected_count = responses.filter(selected_choices=choice).count()
+                    selected_count = responses.choice_selections.get(choice.id, 0)
                     choice_stats.append({
                         'text': choice.choice_text_ko,
                         'count': selected_count,
@@ -235,85 +232,41 @@ class Command(BaseCommand):
                 
                 stats['choices'] = sorted(choice_stats, key=lambda x: x['count'], reverse=True)
                 
-                # Calculate discrimination index (how well question differentiates high/low performers)
+                # Discrimination index (how well question differentiates high/low performers)
                 if response_count >= 10:
-                    # Get top and bottom 27% of assessments by comprehensive score
-                    top_27_percent = int(response_count * 0.27)
-                    
-                    top_assessments = Assessment.objects.filter(
-                        question_responses__question=question
-                    ).order_by('-comprehensive_score')[:top_27_percent]
-                    
-                    bottom_assessments = Assessment.objects.filter(
-                        question_responses__question=question
-                    ).order_by('comprehensive_score')[:top_27_percent]
-                    
-                    top_correct = responses.filter(
-                        assessment__in=top_assessments,
-                        points_earned__gt=0
-                    ).count()
-                    
-                    bottom_correct = responses.filter(
-                        assessment__in=bottom_assessments,
-                        points_earned__gt=0
-                    ).count()
-                    
-                    discrimination_index = (top_correct - bottom_correct) / top_27_percent if top_27_percent > 0 else 0
-                    stats['discrimination_index'] = discrimination_index
+                    discrimination_index = responses.discrimination_index(question.id)
+                    if discrimination_index is not None:
+                        stats['discrimination_index'] = discrimination_index
             
             question_stats.append(stats)
         
         return sorted(question_stats, key=lambda x: x['response_count'], reverse=True)
     
-    def get_response_patterns(self, start_date, end_date, trainer_id):
+    def get_response_patterns(self, responses):
         """Analyze response patterns and trends."""
-        response_filter = Q(
-            assessment__date__gte=start_date,
-            assessment__date__lte=end_date
+        active_questions = list(
+            MultipleChoiceQuestion.objects.filter(is_active=True).select_related('category')
         )
-        if trainer_id:
-            response_filter &= Q(assessment__trainer_id=trainer_id)
-        
-        # Time to complete analysis (if timestamps available)
-        assessments = Assessment.objects.filter(
-            date__gte=start_date,
-            date__lte=end_date,
-            question_responses__isnull=False
-        ).distinct()
         
         # Response completeness by question type
         completeness_by_type = {}
-        for q_type in ['single', 'multiple', 'scale', 'text']:
-            total_questions = MultipleChoiceQuestion.objects.filter(
-                question_type=q_type,
-                is_active=True
-            ).count()
+        for q_type in QUESTION_TYPES:
+            total_questions = sum(1 for question in active_questions if question.question_type == q_type)
             
             if total_questions > 0:
-                responses = QuestionResponse.objects.filter(
-                    response_filter,
-                    question__question_type=q_type
-                ).values('assessment').annotate(
-                    answered=Count('id')
-                )
-                
-                avg_answered = responses.aggregate(avg=Avg('answered'))['avg'] or 0
+                avg_answered = responses.average_answered(q_type)
                 completeness_by_type[q_type] = {
                     'total_questions': total_questions,
                     'avg_answered': avg_answered,
-                    'completion_rate': (avg_answered / total_questions * 100) if total_questions > 0 else 0
+                    'completion_rate': avg_answered / total_questions * 100
                 }
         
         # Skip patterns (questions frequently left unanswered)
-        all_questions = MultipleChoiceQuestion.objects.filter(is_active=True)
+        possible_responses = responses.assessments_with_responses
         skip_patterns = []
         
-        for question in all_questions:
-            possible_responses = assessments.count()
-            actual_responses = QuestionResponse.objects.filter(
-                response_filter,
-                question=question
-            ).count()
+        for question in active_questions:
+            actual_responses, _ = responses.totals(question.id)
             
             skip_rate = ((possible_responses - actual_responses) / possible_responses * 100) if possible_responses > 0 else 0
             
@@ -330,57 +283,31 @@ class Command(BaseCommand):
             'high_skip_questions': sorted(skip_patterns, key=lambda x: x['skip_rate'], reverse=True)[:10]
         }
     
-    def get_quality_metrics(self, start_date, end_date, trainer_id):
+    def get_quality_metrics(self, summary, responses):
         """Calculate quality metrics for MCQ system."""
-        response_filter = Q(
-            assessment__date__gte=start_date,
-            assessment__date__lte=end_date
-        )
-        if trainer_id:
-            response_filter &= Q(assessment__trainer_id=trainer_id)
-        
         # Internal consistency (category score correlations)
-        assessments = Assessment.objects.filter(
-            date__gte=start_date,
-            date__lte=end_date,
-            knowledge_score__isnull=False
-        )
-        
-        if assessments.count() >= 10:
-            # Calculate correlations between MCQ scores and physical scores
-            score_data = assessments.values(
-                'knowledge_score', 'lifestyle_score', 'readiness_score',
-                'overall_score', 'comprehensive_score'
-            )
-            
+        assessment_count = summary['scored']
+        if assessment_count >= 10:
             # Simple correlation indicator
-            mcq_vs_physical = assessments.filter(
-                comprehensive_score__gte=70,
-                overall_score__gte=70
-            ).count() / assessments.count() * 100 if assessments.count() > 0 else 0
+            mcq_vs_physical = summary['aligned'] / assessment_count * 100
         else:
             mcq_vs_physical = None
         
         # Question difficulty distribution
         difficulty_distribution = []
-        for category in QuestionCategory.objects.filter(is_active=True):
-            questions = category.multiplechoicequestion_set.filter(is_active=True)
+        questions = MultipleChoiceQuestion.objects.filter(
+            is_active=True, category__is_active=True
+        ).values_list('id', 'points')
+        for question_id, max_points in questions:
+            question_responses, points_earned = responses.totals(question_id)
             
-            for question in questions:
-                responses = QuestionResponse.objects.filter(
-                    response_filter,
-                    question=question
-                )
+            if question_responses >= 5 and max_points:
+                avg_score_rate = points_earned * 100.0 / max_points / question_responses
                 
-                if responses.count() >= 5:
-                    avg_score_rate = responses.aggregate(
-                        avg=Avg(F('points_earned') * 100.0 / question.points)
-                    )['avg'] or 0
-                    
-                    difficulty_distribution.append({
-                        'question_id': question.id,
-                        'difficulty': 100 - avg_score_rate  # Higher = more difficult
-                    })
+                difficulty_distribution.append({
+                    'question_id': question_id,
+                    'difficulty': 100 - avg_score_rate  # Higher = more difficult
+                })
         
         # Categorize difficulty
         difficulty_categories = {
@@ -486,52 +413,74 @@ class Command(BaseCommand):
         
         self.stdout.write("\n" + "="*70)
     
-    def export_statistics(self, stats, filename):
-        """Export statistics to CSV file."""
-        with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.writer(f)
-            
-            # Write overview
-            writer.writerow(['MCQ STATISTICS REPORT'])
-            writer.writerow([])
-            writer.writerow(['OVERVIEW'])
-            overview = stats['overview']
-            writer.writerow(['Metric', 'Value'])
-            writer.writerow(['Total Assessments', overview['total_assessments']])
-            writer.writerow(['Assessments with MCQ', overview['assessments_with_mcq']])
-            writer.writerow(['MCQ Completion Rate', f"{overview['mcq_completion_rate']:.1f}%"])
-            writer.writerow(['Total Responses', overview['total_responses']])
-            writer.writerow(['Avg Responses per Assessment', f"{overview['avg_responses_per_assessment']:.1f}"])
-            
-            # Write category stats
+    def export_statistics(self, stats, filename, export_format='csv'):
+        """Export statistics to a CSV or JSON file, one section at a time."""
+        with open(filename, 'w', encoding='utf-8-sig' if export_format == 'csv' else 'utf-8', newline='') as f:
+            if export_format == 'json':
+                self._write_json(stats, f)
+            else:
+                self._write_csv(stats, f)
+        
+        self.stdout.write(self.style.SUCCESS(f"Statistics exported to {filename}"))
+    
+    def _write_json(self, stats, f):
+        """Write the report as a JSON object, emitting list items as they are read."""
+        f.write('{')
+        for index, (section, value) in enumerate(stats.items()):
+            f.write(',\n' if index else '\n')
+            f.write(f'{json.dumps(section)}: ')
+            if isinstance(value, list):
+                f.write('[')
+                for item_index, item in enumerate(value):
+                    f.write(', ' if item_index else '')
+                    f.write(json.dumps(item, ensure_ascii=False, default=str))
+                f.write(']')
+            else:
+                f.write(json.dumps(value, ensure_ascii=False, default=str))
+        f.write('\n}\n')
+    
+    def _write_csv(self, stats, f):
+        writer = csv.writer(f)
+        
+        # Write overview
+        writer.writerow(['MCQ STATISTICS REPORT'])
+        writer.writerow([])
+        writer.writerow(['OVERVIEW'])
+        overview = stats['overview']
+        writer.writerow(['Metric', 'Value'])
+        writer.writerow(['Total Assessments', overview['total_assessments']])
+        writer.writerow(['Assessments with MCQ', overview['assessments_with_mcq']])
+        writer.writerow(['MCQ Completion Rate', f"{overview['mcq_completion_rate']:.1f}%"])
+        writer.writerow(['Total Responses', overview['total_responses']])
+        writer.writerow(['Avg Responses per Assessment', f"{overview['avg_responses_per_assessment']:.1f}"])
+        
+        # Write category stats
+        writer.writerow([])
+        writer.writerow(['CATEGORY STATISTICS'])
+        writer.writerow(['Category', 'Weight', 'Active Questions', 'Total Responses', 'Response Rate', 'Average Score'])
+        
+        for cat in stats['categories']:
+            writer.writerow([
+                cat['name'],
+                f"{cat['weight']:.0%}",
+                cat['active_questions'],
+                cat['total_responses'],
+                f"{cat['response_rate']:.1f}%",
+                f"{cat['avg_score']:.1f}%"
+            ])
+        
+        # Write question stats
+        if stats['questions']:
             writer.writerow([])
-            writer.writerow(['CATEGORY STATISTICS'])
-            writer.writerow(['Category', 'Weight', 'Active Questions', 'Total Responses', 'Response Rate', 'Average Score'])
+            writer.writerow(['QUESTION STATISTICS'])
+            writer.writerow(['Question', 'Category', 'Type', 'Responses', 'Avg Points', 'Max Points'])
             
-            for cat in stats['categories']:
+            for q in stats['questions']:
                 writer.writerow([
-                    cat['name'],
-                    f"{cat['weight']:.0%}",
-                    cat['active_questions'],
-                    cat['total_responses'],
-                    f"{cat['response_rate']:.1f}%",
-                    f"{cat['avg_score']:.1f}%"
+                    q['question'],
+                    q['category'],
+                    q['type'],
+                    q['response_count'],
+                    f"{q['avg_points']:.1f}",
+                    q['max_points']
                 ])
-            
-            # Write question stats
-            if stats['questions']:
-                writer.writerow([])
-                writer.writerow(['QUESTION STATISTICS'])
-                writer.writerow(['Question', 'Category', 'Type', 'Responses', 'Avg Points', 'Max Points'])
-                
-                for q in stats['questions']:
-                    writer.writerow([
-                        q['question'],
-                        q['category'],
-                        q['type'],
-                        q['response_count'],
-                        f"{q['avg_points']:.1f}",
-                        q['max_points']
-                    ])
-        
-        self.stdout.write(self.style.SUCCESS(f"Statistics exported to {filename}"))
\ No newline at end of file
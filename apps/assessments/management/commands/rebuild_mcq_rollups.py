@@ -0,0 +1,31 @@
+"""
+Rebuild the daily MCQ analytics rollups from the raw responses.
+
+The rollups are kept up to date by the MCQ save paths. Run this after
+deploying the rollup tables, after bulk imports or raw SQL changes to
+responses, and after moving assessments between days, trainers or
+organizations.
+
+Usage:
+    python manage.py rebuild_mcq_rollups
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.assessments import mcq_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily MCQ analytics rollup tables from scratch'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        question_rows, choice_rows = mcq_rollups.rebuild()
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt MCQ rollups: {question_rows} question rows, '
+            f'{choice_rows} choice rows in {elapsed:.1f}s'
+        ))
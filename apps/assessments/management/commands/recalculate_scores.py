@@ -1,8 +1,88 @@
+"""
+Recalculate scores for existing assessments.
+
+Assessments are streamed in primary-key order in fixed-size chunks, scored
+(optionally in a pool of worker processes) and written back with
+bulk_update. Each chunk is committed on its own and the last processed id
+is checkpointed, so an interrupted run can be resumed with --resume.
+
+Usage:
+    python manage.py recalculate_scores
+    python manage.py recalculate_scores --workers 4 --chunk-size 1000
+    python manage.py recalculate_scores --resume
+    python manage.py recalculate_scores --only-stale
+    python manage.py recalculate_scores --pending
+    python manage.py recalculate_scores --assessment-id 42
+    python manage.py recalculate_scores --dry-run
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connections, transaction
+
 from apps.assessments.models import Assessment
 
 
+# Fields written by Assessment.calculate_scores()
+SCORE_FIELDS = [
+    'overhead_squat_score', 'push_up_score',
+    'overall_score', 'strength_score', 'mobility_score',
+    'balance_score', 'cardio_score', 'injury_risk_score', 'risk_factors',
+    'percentile_rankings_snapshot', 'performance_age_snapshot', 'norm_version',
+    'scoring_fingerprint',
+]
+
+# JSON fields that are too verbose for dry-run diffs
+SNAPSHOT_FIELDS = {'risk_factors', 'percentile_rankings_snapshot', 'performance_age_snapshot'}
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, 'logs', 'recalculate_scores.checkpoint')
+
+
+def _init_worker():
+    """Make sure Django is configured in spawned worker processes."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _score_batch(assessments):
+    """
+    Score a batch of assessments.
+
+    Runs in a worker process. Returns a list of (id, scores, error) tuples
+    where scores maps SCORE_FIELDS to their recalculated values.
+    """
+    results = []
+    for assessment in assessments:
+        try:
+            assessment.calculate_scores()
+            scores = {field: getattr(assessment, field) for field in SCORE_FIELDS}
+            results.append((assessment.pk, scores, None))
+        except Exception as e:
+            results.append((assessment.pk, None, str(e)))
+    return results
+
+
+def _split(items, parts):
+    """Split a list into at most `parts` contiguous slices."""
+    size = max(1, -(-len(items) // parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+
 class Command(BaseCommand):
     help = 'Recalculate scores for all existing assessments'
 
@@ -17,105 +97,227 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be updated without making changes',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of assessments fetched, scored and committed together (default: 500)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes used for scoring (default: 1, in-process)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last assessment ID recorded in the checkpoint file',
+        )
+        parser.add_argument(
+            '--only-stale',
+            action='store_true',
+            help='Only rescore assessments whose scoring fingerprint no longer matches',
+        )
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Only rescore assessments queued by a standards/normative data change',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            default=DEFAULT_CHECKPOINT,
+            help='Checkpoint file path',
+        )
 
     def handle(self, *args, **options):
         assessment_id = options.get('assessment_id')
-        dry_run = options.get('dry_run', False)
-        
+        self.dry_run = options.get('dry_run', False)
+        self.verbosity = options.get('verbosity', 1)
+        self.checkpoint_path = options['checkpoint']
+        chunk_size = max(1, options['chunk_size'])
+        workers = max(1, options['workers'])
+        only_stale = options['only_stale']
+
+        queryset = Assessment.objects.select_related('client')
+        if options['pending']:
+            # Queued rows have their fingerprint cleared (see score_dependencies)
+            queryset = queryset.filter(scoring_fingerprint='')
+
         if assessment_id:
-            assessments = Assessment.objects.filter(id=assessment_id)
-            if not assessments.exists():
+            if not queryset.filter(id=assessment_id).exists():
                 self.stdout.write(
                     self.style.ERROR(f'Assessment with ID {assessment_id} not found')
                 )
                 return
-        else:
-            assessments = Assessment.objects.all()
-        
+            self.stdout.write(f"Processing single assessment #{assessment_id}")
+            queryset = queryset.filter(id=assessment_id)
+
+        start_after = 0
+        if options['resume'] and not assessment_id:
+            start_after = self._read_checkpoint()
+            if start_after:
+                self.stdout.write(f"Resuming after assessment #{start_after}")
+
+        total = queryset.filter(id__gt=start_after).count()
         self.stdout.write(
-            self.style.SUCCESS(f'Found {assessments.count()} assessments to process')
+            self.style.SUCCESS(f'Found {total} assessments to process')
         )
-        
-        updated_count = 0
-        error_count = 0
-        
-        with transaction.atomic():
-            for assessment in assessments:
-                try:
-                    # Store old scores for comparison
-                    old_scores = {
-                        'overall': assessment.overall_score,
-                        'strength': assessment.strength_score,
-                        'mobility': assessment.mobility_score,
-                        'balance': assessment.balance_score,
-                        'cardio': assessment.cardio_score,
-                        'injury_risk': assessment.injury_risk_score,
-                    }
-                    
-                    # Recalculate scores
-                    assessment.calculate_scores()
-                    
-                    # Check if scores changed
-                    scores_changed = any([
-                        old_scores['overall'] != assessment.overall_score,
-                        old_scores['strength'] != assessment.strength_score,
-                        old_scores['mobility'] != assessment.mobility_score,
-                        old_scores['balance'] != assessment.balance_score,
-                        old_scores['cardio'] != assessment.cardio_score,
-                        old_scores['injury_risk'] != assessment.injury_risk_score,
-                    ])
-                    
-                    if scores_changed:
-                        if dry_run:
-                            self.stdout.write(
-                                f"Would update Assessment #{assessment.id} for {assessment.client.name}:"
-                            )
-                            self.stdout.write(f"  Overall: {old_scores['overall']} → {assessment.overall_score}")
-                            self.stdout.write(f"  Strength: {old_scores['strength']} → {assessment.strength_score}")
-                            self.stdout.write(f"  Mobility: {old_scores['mobility']} → {assessment.mobility_score}")
-                            self.stdout.write(f"  Balance: {old_scores['balance']} → {assessment.balance_score}")
-                            self.stdout.write(f"  Cardio: {old_scores['cardio']} → {assessment.cardio_score}")
-                            self.stdout.write(f"  Injury Risk: {old_scores['injury_risk']} → {assessment.injury_risk_score}")
-                        else:
-                            assessment.save(update_fields=[
-                                'overall_score', 'strength_score', 'mobility_score',
-                                'balance_score', 'cardio_score', 'injury_risk_score', 'risk_factors'
-                            ])
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f"Updated Assessment #{assessment.id} for {assessment.client.name}"
-                                )
-                            )
-                        updated_count += 1
-                    else:
-                        self.stdout.write(
-                            f"No changes for Assessment #{assessment.id} for {assessment.client.name}"
-                        )
-                        
-                except Exception as e:
-                    error_count += 1
+
+        pool = None
+        if workers > 1 and total > chunk_size:
+            # Warm the standards index and normative table so forked workers
+            # inherit them, and drop DB connections so no socket is shared
+            # with the children.
+            from apps.assessments import norms_table, standards_index
+            standards_index.get_index()
+            norms_table.get_table()
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+        self.updated_count = 0
+        self.error_count = 0
+        self.stale_count = 0
+        processed = 0
+        started = time.monotonic()
+        last_id = start_after
+
+        try:
+            while True:
+                chunk = list(queryset.filter(id__gt=last_id).order_by('id')[:chunk_size])
+                if not chunk:
+                    break
+
+                last_id = chunk[-1].pk
+                processed += len(chunk)
+
+                # Fingerprints are cheap to compute here; only stale rows get scored
+                to_score = chunk
+                if only_stale:
+                    to_score = [assessment for assessment in chunk if assessment.scoring_is_stale()]
+                    self.stale_count += len(to_score)
+
+                # Snapshot before scoring: the in-process path mutates the chunk
+                old_scores = {
+                    assessment.pk: {field: getattr(assessment, field) for field in SCORE_FIELDS}
+                    for assessment in to_score
+                }
+
+                if not to_score:
+                    results = []
+                elif pool:
+                    results = [
+                        result
+                        for batch in pool.map(_score_batch, _split(to_score, workers))
+                        for result in batch
+                    ]
+                else:
+                    results = _score_batch(to_score)
+
+                self._write_chunk(to_score, old_scores, results)
+                if not self.dry_run and not assessment_id:
+                    self._write_checkpoint(last_id)
+
+                elapsed = time.monotonic() - started
+                rate = processed / elapsed if elapsed > 0 else 0
+                eta = (total - processed) / rate if rate else 0
+                self.stdout.write(
+                    f"Processed {processed}/{total} assessments "
+                    f"(up to #{last_id}, {rate:.1f} rows/sec, ETA {_format_duration(eta)})"
+                )
+        finally:
+            if pool:
+                pool.shutdown()
+
+        if only_stale:
+            self.stdout.write(f"\nFound {self.stale_count} stale assessments.")
+
+        if self.dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"\nDry run complete. Would update {self.updated_count} assessments."
+                )
+            )
+        else:
+            if not assessment_id:
+                self._clear_checkpoint()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\nSuccessfully updated {self.updated_count} assessments."
+                )
+            )
+
+        if self.error_count > 0:
+            self.stdout.write(
+                self.style.ERROR(f"Encountered {self.error_count} errors.")
+            )
+
+    def _write_chunk(self, chunk, old_scores, results):
+        """Apply scored values to a chunk and persist changed rows in one transaction."""
+        by_id = {assessment.pk: assessment for assessment in chunk}
+        changed = []
+
+        for pk, scores, error in results:
+            assessment = by_id[pk]
+            if error:
+                self.error_count += 1
+                self.stdout.write(
+                    self.style.ERROR(f"Error processing Assessment #{pk}: {error}")
+                )
+                continue
+
+            old = old_scores[pk]
+            if old == scores:
+                if self.verbosity >= 2:
                     self.stdout.write(
-                        self.style.ERROR(
-                            f"Error processing Assessment #{assessment.id}: {str(e)}"
-                        )
+                        f"No changes for Assessment #{pk} for {assessment.client.name}"
                     )
-            
-            if dry_run:
-                # Rollback the transaction in dry-run mode
-                transaction.set_rollback(True)
+                continue
+
+            for field, value in scores.items():
+                setattr(assessment, field, value)
+            changed.append(assessment)
+
+            if self.dry_run:
                 self.stdout.write(
-                    self.style.WARNING(
-                        f"\nDry run complete. Would update {updated_count} assessments."
-                    )
+                    f"Would update Assessment #{pk} for {assessment.client.name}:"
                 )
-            else:
+                for field in SCORE_FIELDS:
+                    if old[field] != scores[field] and field not in SNAPSHOT_FIELDS:
+                        self.stdout.write(f"  {field}: {old[field]} → {scores[field]}")
+            elif self.verbosity >= 2:
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f"\nSuccessfully updated {updated_count} assessments."
+                        f"Updated assessment #{pk} for {assessment.client.name}"
                     )
                 )
-                
-            if error_count > 0:
-                self.stdout.write(
-                    self.style.ERROR(f"Encountered {error_count} errors.")
-                )
\ No newline at end of file
+
+        self.updated_count += len(changed)
+
+        if changed and not self.dry_run:
+            with transaction.atomic():
+                Assessment.objects.bulk_update(changed, SCORE_FIELDS)
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return int(json.load(f).get('last_id', 0))
+        except (OSError, ValueError, AttributeError):
+            return 0
+
+    def _write_checkpoint(self, last_id):
+        """Atomically record the last committed assessment id."""
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_id': last_id}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        try:
+            os.remove(self.checkpoint_path)
+        except OSError:
+            pass
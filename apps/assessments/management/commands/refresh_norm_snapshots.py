@@ -0,0 +1,88 @@
+"""
+Refresh stale percentile/performance-age snapshots.
+
+Each assessment stores the percentile rankings and performance age computed
+at scoring time, together with the version of the normative data used. After
+`load_normative_data` changes the norms, this command recomputes only the
+snapshots whose norm version no longer matches.
+
+Usage:
+    python manage.py refresh_norm_snapshots
+    python manage.py refresh_norm_snapshots --chunk-size 1000
+    python manage.py refresh_norm_snapshots --all
+    python manage.py refresh_norm_snapshots --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.assessments import norms_table
+from apps.assessments.models import Assessment
+
+
+SNAPSHOT_FIELDS = ['percentile_rankings_snapshot', 'performance_age_snapshot', 'norm_version']
+
+
+class Command(BaseCommand):
+    help = 'Recompute percentile/performance-age snapshots built from outdated normative data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of assessments refreshed per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Refresh every snapshot, not only stale ones',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many snapshots are stale',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+
+        # Always compare against the norms currently in the database
+        norms_table.reset()
+        table = norms_table.get_table()
+        if table is None:
+            self.stdout.write(self.style.ERROR('Normative data is not available'))
+            return
+
+        queryset = Assessment.objects.select_related('client')
+        if not options['all']:
+            queryset = queryset.exclude(norm_version=table.norm_version)
+
+        total = queryset.count()
+        self.stdout.write(
+            f'Normative data version {table.norm_version}: {total} snapshots to refresh'
+        )
+        if options['dry_run'] or not total:
+            return
+
+        refreshed = 0
+        last_id = 0
+        while True:
+            chunk = list(queryset.filter(id__gt=last_id).order_by('id')[:chunk_size])
+            if not chunk:
+                break
+
+            rankings = norms_table.rank_assessments(chunk, table=table)
+            for assessment in chunk:
+                assessment.refresh_norm_snapshot(table=table, rankings=rankings[assessment.pk])
+
+            with transaction.atomic():
+                Assessment.objects.bulk_update(chunk, SNAPSHOT_FIELDS)
+
+            refreshed += len(chunk)
+            last_id = chunk[-1].pk
+            self.stdout.write(f'Refreshed {refreshed}/{total} snapshots')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully refreshed {refreshed} snapshots')
+        )
@@ -0,0 +1,84 @@
+"""
+Queue rescoring of the assessments affected by specific standards or norms.
+
+Maps each TestStandard / NormativeData row to the cohort of assessments that
+can resolve it (test type, gender, age range, variation, conditions) and
+queues only those for `recalculate_scores --pending`. Saving a standard or
+normative row through the ORM already queues its cohort; this command is for
+previewing the impact of an edit and for changes made outside the ORM.
+
+Usage:
+    python manage.py rescore_affected --standard 12 --dry-run
+    python manage.py rescore_affected --standard 12 --standard 13
+    python manage.py rescore_affected --norm 4 --run
+"""
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.assessments import score_dependencies
+from apps.assessments.models import NormativeData, TestStandard
+
+
+class Command(BaseCommand):
+    help = 'Queue rescoring of only the assessments affected by given standards or normative data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--standard',
+            type=int,
+            action='append',
+            default=[],
+            help='TestStandard ID (can be repeated)',
+        )
+        parser.add_argument(
+            '--norm',
+            type=int,
+            action='append',
+            default=[],
+            help='NormativeData ID (can be repeated)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many assessments and which organizations would change',
+        )
+        parser.add_argument(
+            '--run',
+            action='store_true',
+            help='Rescore the queued assessments immediately',
+        )
+
+    def handle(self, *args, **options):
+        if not options['standard'] and not options['norm']:
+            raise CommandError('Specify at least one --standard or --norm ID')
+
+        standards = list(TestStandard.objects.filter(pk__in=options['standard']))
+        norms = list(NormativeData.objects.filter(pk__in=options['norm']))
+
+        missing = (
+            set(options['standard']) - {standard.pk for standard in standards}
+        ) | (
+            set(options['norm']) - {norm.pk for norm in norms}
+        )
+        if missing:
+            raise CommandError(f"Not found: {', '.join(str(pk) for pk in sorted(missing))}")
+
+        queryset = score_dependencies.affected_assessments(standards=standards, norms=norms)
+        report = score_dependencies.impact_report(queryset)
+
+        self.stdout.write(f"{report['assessments']} assessments affected")
+        for name, count in report['organizations']:
+            self.stdout.write(f"  {name}: {count}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing was queued.'))
+            return
+
+        queued = score_dependencies.enqueue(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} assessments for rescoring'))
+
+        if options['run']:
+            call_command('recalculate_scores', pending=True, stdout=self.stdout)
+        elif queued:
+            self.stdout.write('Run `python manage.py recalculate_scores --pending` to rescore them.')
@@ -0,0 +1,239 @@
+"""
+Versioned snapshot of the active MCQ question catalog.
+
+The MCQ form, save and print views and the MCQ API used to query
+categories, questions, choices and `depends_on` on every request, although
+the catalog only changes when an admin edits or imports questions.
+
+This module loads the active catalog once (categories -> questions ->
+choices, with prefetch caches populated so templates and serializers can
+use the usual `question.choices.all`) and precomputes the dependency graph
+and maximum points. Like the standards index, the snapshot is immutable and
+swapped atomically, and workers stay consistent through a version stamp in
+the shared cache. The pickled snapshot itself is also stored in the shared
+cache under that stamp, so only one worker per version hits the database.
+
+`content_version` is a digest of the catalog contents and is used as the
+API ETag; it is identical in every worker that loads the same data.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Prefetch
+from django.forms.models import model_to_dict
+
+
+VERSION_CACHE_KEY = 'mcq_catalog_version'
+PAYLOAD_CACHE_KEY = 'mcq_catalog:{version}'
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+VERSION_CHECK_INTERVAL = getattr(settings, 'MCQ_CATALOG_CHECK_INTERVAL', 5)
+
+
+def _max_points(question):
+    """Highest number of points an answer to `question` can earn."""
+    points = [choice.points for choice in question.choices.all()]
+    if question.question_type == 'multiple':
+        return sum(p for p in points if p > 0)
+    if question.question_type == 'text' or not points:
+        return question.points
+    return max(points)
+
+
+class MCQCatalog:
+    """
+    Immutable snapshot of the active categories, questions and choices.
+
+    Categories carry a prefetched `questions` relation (active questions in
+    display order) and every question a prefetched `choices` relation.
+    """
+
+    __slots__ = (
+        'version', 'content_version', 'categories', 'questions',
+        '_questions_by_id', '_questions_by_category', 'dependents',
+        'max_points', 'category_max_points',
+    )
+
+    def __init__(self, categories, version=None):
+        self.version = version
+        self.categories = tuple(categories)
+        self.questions = tuple(
+            question for category in self.categories for question in category.questions.all()
+        )
+        self._questions_by_id = {question.id: question for question in self.questions}
+        self._questions_by_category = {
+            category.id: tuple(category.questions.all()) for category in self.categories
+        }
+
+        dependents = {}
+        for question in self.questions:
+            if question.depends_on_id:
+                dependents.setdefault(question.depends_on_id, []).append(question.id)
+        self.dependents = {pk: tuple(ids) for pk, ids in dependents.items()}
+
+        self.max_points = {question.id: _max_points(question) for question in self.questions}
+        self.category_max_points = {
+            category_id: sum(self.max_points[question.id] for question in questions)
+            for category_id, questions in self._questions_by_category.items()
+        }
+
+        digest = hashlib.sha1()
+        for category in self.categories:
+            digest.update(repr(sorted(model_to_dict(category).items())).encode())
+            for question in category.questions.all():
+                digest.update(repr(sorted(model_to_dict(question).items())).encode())
+                for choice in question.choices.all():
+                    digest.update(repr(sorted(model_to_dict(choice).items())).encode())
+        self.content_version = digest.hexdigest()[:12]
+
+    def __reduce__(self):
+        # Derived indexes are rebuilt on unpickling
+        return (MCQCatalog, (self.categories, self.version))
+
+    def __len__(self):
+        return len(self.questions)
+
+    @property
+    def etag(self):
+        """Quoted ETag header value for responses built from this snapshot."""
+        return f'"mcq-{self.content_version}"'
+
+    def question(self, question_id):
+        """Active question by id, or None."""
+        return self._questions_by_id.get(question_id)
+
+    def questions_for(self, category_id):
+        """Active questions of an active category, in display order."""
+        return self._questions_by_category.get(category_id)
+
+    def has_category(self, category_id):
+        return category_id in self._questions_by_category
+
+
+_catalog = None
+_last_version_check = 0.0
+# Set between a local invalidation and its commit; the rebuilt snapshot may
+# contain uncommitted rows and must not be shared with other workers
+_dirty = False
+_lock = threading.Lock()
+
+
+def _shared_version():
+    try:
+        return cache.get(VERSION_CACHE_KEY)
+    except Exception:
+        return None
+
+
+def build_catalog(version=None):
+    """Load the active catalog from the database into a new MCQCatalog."""
+    from .models import MultipleChoiceQuestion, QuestionCategory
+
+    questions = (
+        MultipleChoiceQuestion.objects.filter(is_active=True)
+        .select_related('category', 'depends_on', 'depends_on_answer')
+        .prefetch_related('choices')
+        .order_by('order', 'id')
+    )
+    categories = (
+        QuestionCategory.objects.filter(is_active=True)
+        .order_by('order', 'id')
+        .prefetch_related(Prefetch('questions', queryset=questions))
+    )
+    return MCQCatalog(list(categories), version=version)
+
+
+def get_catalog():
+    """
+    Return the current catalog snapshot, reloading it when out of date.
+
+    Returns None if the MCQ tables cannot be read.
+    """
+    global _catalog, _last_version_check
+
+    catalog = _catalog
+    now = time.monotonic()
+
+    if catalog is not None and now - _last_version_check < VERSION_CHECK_INTERVAL:
+        return catalog
+
+    shared = _shared_version()
+    _last_version_check = now
+    if catalog is not None and (shared is None or shared == catalog.version):
+        return catalog
+
+    with _lock:
+        if _catalog is not None and _catalog is not catalog:
+            return _catalog
+
+        if _dirty:
+            try:
+                _catalog = build_catalog(version=shared)
+            except DatabaseError:
+                return None
+            return _catalog
+
+        if shared is None:
+            shared = uuid.uuid4().hex
+            try:
+                cache.add(VERSION_CACHE_KEY, shared, None)
+                shared = cache.get(VERSION_CACHE_KEY) or shared
+            except Exception:
+                pass
+
+        payload_key = PAYLOAD_CACHE_KEY.format(version=shared)
+        try:
+            loaded = cache.get(payload_key)
+        except Exception:
+            loaded = None
+
+        if isinstance(loaded, MCQCatalog):
+            _catalog = loaded
+            return _catalog
+
+        try:
+            _catalog = build_catalog(version=shared)
+        except DatabaseError:
+            return None
+        try:
+            cache.set(payload_key, _catalog, PAYLOAD_TIMEOUT)
+        except Exception:
+            pass
+        return _catalog
+
+
+def reset():
+    """Drop this process's snapshot so the next read reloads it."""
+    global _catalog, _last_version_check, _dirty
+    with _lock:
+        _catalog = None
+        _last_version_check = 0.0
+        _dirty = False
+
+
+def invalidate():
+    """
+    Mark the catalog stale here immediately and in other workers after commit.
+    """
+    global _catalog, _last_version_check, _dirty
+    from django.db import transaction
+
+    with _lock:
+        _catalog = None
+        _last_version_check = 0.0
+        _dirty = True
+
+    def _publish():
+        try:
+            cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        except Exception:
+            pass
+        reset()
+
+    transaction.on_commit(_publish)
@@ -0,0 +1,338 @@
+"""
+Daily MCQ analytics rollups.
+
+Organization-wide MCQ analytics used to scan every QuestionResponse and its
+selected choices on each request. The two rollup tables keep, per
+organization and assessment day,
+
+- MCQQuestionDailyRollup: responses, points earned and risk selections per
+  question
+- MCQChoiceDailyRollup: selections, points and risk selections per choice
+
+Writes never adjust counters by deltas. Instead the (organization, day)
+buckets touched by a write are recomputed from their raw rows with two
+grouped queries, inside the caller's transaction. A bucket holds one
+organization's responses for one day, so the cost of a refresh does not
+grow with the total response volume, and a refresh is always correct no
+matter which path changed the responses.
+
+Single-response writes refresh through the QuestionResponse signals; the
+bulk submission service writes inside `deferred()` and calls
+`refresh_for_assessment` once itself. Changes that move responses between
+buckets without touching them (editing an assessment's date or trainer, or
+moving a trainer to another organization) are picked up by
+`python manage.py rebuild_mcq_rollups`.
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+
+REBUILD_BATCH_SIZE = 2000
+
+Bucket = Tuple[Optional[int], object]
+
+_state = threading.local()
+
+
+def _models():
+    from .models import (
+        Assessment, MCQChoiceDailyRollup, MCQQuestionDailyRollup, QuestionResponse
+    )
+    return Assessment, MCQChoiceDailyRollup, MCQQuestionDailyRollup, QuestionResponse
+
+
+def _day(value):
+    """Calendar day of an assessment datetime in the current time zone."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def _day_range(day):
+    """[start, end) datetimes of a calendar day in the current time zone."""
+    start = datetime.combine(day, time.min)
+    if settings.USE_TZ:
+        start = timezone.make_aware(start)
+    return start, start + timedelta(days=1)
+
+
+def _organization_q(prefix: str, organization_id: Optional[int]) -> Q:
+    if organization_id is None:
+        return Q(**{f'{prefix}trainer__organization__isnull': True})
+    return Q(**{f'{prefix}trainer__organization_id': organization_id})
+
+
+def _question_rows(response_filter: Q):
+    """Grouped per-question rows for the responses matching `response_filter`."""
+    _, _, _, QuestionResponse = _models()
+    SelectedChoice = QuestionResponse.selected_choices.through
+
+    risk_selections = (
+        SelectedChoice.objects
+        .filter(questionresponse=OuterRef('pk'), questionchoice__contributes_to_risk=True)
+        .order_by()
+        .values('questionresponse')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return (
+        QuestionResponse.objects
+        .filter(response_filter)
+        .annotate(risk=Coalesce(Subquery(risk_selections), 0))
+        .order_by()
+        .values(
+            'question_id', 'question__category_id',
+            organization_id=F('assessment__trainer__organization_id'),
+            day=TruncDate('assessment__date'),
+        )
+        .annotate(
+            responses=Count('id'),
+            points=Coalesce(Sum('points_earned'), 0),
+            risk_selections=Coalesce(Sum('risk'), 0),
+        )
+    )
+
+
+def _choice_rows(selection_filter: Q):
+    """Grouped per-choice rows for the selections matching `selection_filter`."""
+    _, _, _, QuestionResponse = _models()
+    SelectedChoice = QuestionResponse.selected_choices.through
+
+    return (
+        SelectedChoice.objects
+        .filter(selection_filter)
+        .order_by()
+        .values(
+            'questionchoice_id',
+            question_id=F('questionchoice__question_id'),
+            category_id=F('questionchoice__question__category_id'),
+            organization_id=F('questionresponse__assessment__trainer__organization_id'),
+            day=TruncDate('questionresponse__assessment__date'),
+        )
+        .annotate(
+            responses=Count('id'),
+            points=Coalesce(Sum('questionchoice__points'), 0),
+            risk=Count('id', filter=Q(questionchoice__contributes_to_risk=True)),
+        )
+    )
+
+
+def _question_rollup(row):
+    _, _, MCQQuestionDailyRollup, _ = _models()
+    return MCQQuestionDailyRollup(
+        organization_id=row['organization_id'],
+        category_id=row['question__category_id'],
+        question_id=row['question_id'],
+        day=row['day'],
+        response_count=row['responses'],
+        points_sum=row['points'],
+        risk_count=row['risk_selections'],
+    )
+
+
+def _choice_rollup(row):
+    _, MCQChoiceDailyRollup, _, _ = _models()
+    return MCQChoiceDailyRollup(
+        organization_id=row['organization_id'],
+        category_id=row['category_id'],
+        question_id=row['question_id'],
+        choice_id=row['questionchoice_id'],
+        day=row['day'],
+        response_count=row['responses'],
+        points_sum=row['points'],
+        risk_count=row['risk'],
+    )
+
+
+def _refresh_bucket(organization_id: Optional[int], day, question_ids: Optional[Set[int]]):
+    _, MCQChoiceDailyRollup, MCQQuestionDailyRollup, _ = _models()
+
+    start, end = _day_range(day)
+    response_filter = _organization_q('assessment__', organization_id) & Q(
+        assessment__date__gte=start, assessment__date__lt=end
+    )
+    selection_filter = _organization_q('questionresponse__assessment__', organization_id) & Q(
+        questionresponse__assessment__date__gte=start,
+        questionresponse__assessment__date__lt=end,
+    )
+    rollup_filter = Q(day=day) & (
+        Q(organization__isnull=True) if organization_id is None
+        else Q(organization_id=organization_id)
+    )
+    if question_ids is not None:
+        response_filter &= Q(question_id__in=question_ids)
+        selection_filter &= Q(questionchoice__question_id__in=question_ids)
+        rollup_filter &= Q(question_id__in=question_ids)
+
+    MCQQuestionDailyRollup.objects.filter(rollup_filter).delete()
+    MCQChoiceDailyRollup.objects.filter(rollup_filter).delete()
+    MCQQuestionDailyRollup.objects.bulk_create(
+        [_question_rollup(row) for row in _question_rows(response_filter)]
+    )
+    MCQChoiceDailyRollup.objects.bulk_create(
+        [_choice_rollup(row) for row in _choice_rows(selection_filter)]
+    )
+
+
+def refresh(buckets: Dict[Bucket, Optional[Set[int]]]):
+    """
+    Recompute rollup buckets from their raw responses.
+
+    Args:
+        buckets: Mapping of (organization id, day) to the question ids to
+            recompute in that bucket, or None for every question
+    """
+    for (organization_id, day), question_ids in buckets.items():
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    _refresh_bucket(organization_id, day, question_ids)
+                break
+            except IntegrityError:
+                # A concurrent refresh of the same bucket committed first;
+                # recomputing now sees its rows and replaces them
+                if attempt:
+                    raise
+
+
+@contextmanager
+def deferred():
+    """
+    Skip signal-driven refreshes inside the block.
+
+    For bulk writers that refresh the affected buckets once afterwards.
+    """
+    depth = getattr(_state, 'deferred', 0)
+    _state.deferred = depth + 1
+    try:
+        yield
+    finally:
+        _state.deferred = depth
+
+
+def refresh_for_assessment(assessment, question_ids: Optional[Iterable[int]] = None):
+    """
+    Recompute the rollups an assessment's responses contribute to.
+
+    Args:
+        assessment: Assessment whose responses changed
+        question_ids: Questions whose responses changed; all when omitted
+    """
+    organization_id = assessment.trainer.organization_id if assessment.trainer_id else None
+    questions = set(question_ids) if question_ids is not None else None
+    refresh({(organization_id, _day(assessment.date)): questions})
+
+
+def refresh_for_responses(responses: Iterable):
+    """Recompute the rollups the given QuestionResponse rows belong to."""
+    if getattr(_state, 'deferred', 0):
+        return
+    Assessment, _, _, _ = _models()
+
+    questions_by_assessment = {}
+    for response in responses:
+        questions_by_assessment.setdefault(response.assessment_id, set()).add(response.question_id)
+
+    buckets = {}
+    assessments = Assessment.objects.filter(
+        pk__in=questions_by_assessment
+    ).values_list('pk', 'trainer__organization_id', 'date')
+    for pk, organization_id, date in assessments:
+        buckets.setdefault((organization_id, _day(date)), set()).update(
+            questions_by_assessment[pk]
+        )
+    if buckets:
+        refresh(buckets)
+
+
+def reprice_choice(choice):
+    """
+    Apply a choice's current points and risk flag to its existing rows.
+
+    Also recomputes the risk selections of the question rows the choice
+    contributes to.
+    """
+    _, MCQChoiceDailyRollup, MCQQuestionDailyRollup, _ = _models()
+
+    with transaction.atomic():
+        updated = MCQChoiceDailyRollup.objects.filter(choice=choice).update(
+            points_sum=F('response_count') * choice.points,
+            risk_count=F('response_count') if choice.contributes_to_risk else 0,
+        )
+        if not updated:
+            return
+
+        risk = (
+            MCQChoiceDailyRollup.objects
+            .filter(
+                question_id=OuterRef('question_id'),
+                day=OuterRef('day'),
+                organization_id=OuterRef('organization_id'),
+            )
+            .order_by()
+            .values('question_id')
+            .annotate(total=Sum('risk_count'))
+            .values('total')
+        )
+        days = MCQChoiceDailyRollup.objects.filter(choice=choice).values('day')
+        questions = MCQQuestionDailyRollup.objects.filter(question_id=choice.question_id, day__in=days)
+        # Rows of organization-less assessments cannot be matched through
+        # OuterRef('organization_id') = NULL
+        questions.filter(organization__isnull=False).update(
+            risk_count=Coalesce(Subquery(risk), 0)
+        )
+        questions.filter(organization__isnull=True).update(
+            risk_count=Coalesce(Subquery(
+                MCQChoiceDailyRollup.objects
+                .filter(
+                    question_id=OuterRef('question_id'),
+                    day=OuterRef('day'),
+                    organization__isnull=True,
+                )
+                .order_by()
+                .values('question_id')
+                .annotate(total=Sum('risk_count'))
+                .values('total')
+            ), 0)
+        )
+
+
+def rebuild() -> Tuple[int, int]:
+    """
+    Replace all rollup rows with ones computed from every response.
+
+    Returns:
+        Tuple of (question rows, choice rows) written
+    """
+    _, MCQChoiceDailyRollup, MCQQuestionDailyRollup, _ = _models()
+
+    with transaction.atomic():
+        MCQQuestionDailyRollup.objects.all().delete()
+        MCQChoiceDailyRollup.objects.all().delete()
+
+        counts = []
+        for rows, build, model in (
+            (_question_rows(Q()), _question_rollup, MCQQuestionDailyRollup),
+            (_choice_rows(Q()), _choice_rollup, MCQChoiceDailyRollup),
+        ):
+            batch, written = [], 0
+            for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+                batch.append(build(row))
+                if len(batch) >= REBUILD_BATCH_SIZE:
+                    model.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_create(batch)
+                written += len(batch)
+            counts.append(written)
+    return tuple(counts)
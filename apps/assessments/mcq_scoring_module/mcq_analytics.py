@@ -0,0 +1,194 @@
+"""
+Organization-level MCQ analytics computed with grouped queries.
+
+The analytics API used to loop categories x assessments with a COUNT per
+pair for completion rates, run one aggregate per category for average
+scores and materialize every response and its choices in Python to count
+risk factors. Each function here answers its endpoint with a fixed number
+of queries regardless of how many assessments the organization has:
+
+- completion: responses grouped by (assessment, category) with HAVING
+  answered = active questions in the category, counted per category in an
+  outer aggregate
+- category scores: one multi-aggregate over the assessments
+- risk factors: the daily choice rollups (see `apps.assessments.mcq_rollups`)
+  grouped by risk label, so the cost follows the number of days rather
+  than the number of responses
+
+The results keep the JSON shape of the original endpoints.
+"""
+
+from typing import Dict, List
+
+from django.db.models import Avg, Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, NullIf
+from django.utils.text import slugify
+
+from apps.assessments.models import (
+    Assessment, MCQChoiceDailyRollup, MCQQuestionDailyRollup,
+    QuestionCategory, QuestionResponse,
+)
+
+
+# Category slug -> Assessment field holding that category's score
+CATEGORY_SCORE_FIELDS = {
+    'knowledge': 'knowledge_score',
+    'lifestyle': 'lifestyle_score',
+    'readiness': 'readiness_score',
+}
+
+TOP_RISK_FACTORS = 10
+
+
+def category_slug(category) -> str:
+    """Slug used for a category in API output, as QuestionCategorySerializer."""
+    return slugify(category.name)
+
+
+def category_scores(organization) -> List[Dict]:
+    """
+    Average MCQ score per active category for scored assessments.
+
+    Args:
+        organization: Organization whose trainers' assessments are included
+
+    Returns:
+        List of dicts with category, slug, average_score and assessment_count
+    """
+    categories = list(QuestionCategory.objects.filter(is_active=True))
+
+    assessments = Assessment.objects.filter(
+        trainer__organization=organization
+    ).exclude(
+        comprehensive_score__isnull=True
+    )
+    totals = assessments.aggregate(
+        assessment_count=Count('id'),
+        **{slug: Avg(field) for slug, field in CATEGORY_SCORE_FIELDS.items()}
+    )
+
+    results = []
+    for category in categories:
+        slug = category_slug(category)
+        avg_score = totals.get(slug) if slug in CATEGORY_SCORE_FIELDS else 0
+        results.append({
+            'category': category.name_ko,
+            'slug': slug,
+            'average_score': round(avg_score or 0, 1),
+            'assessment_count': totals['assessment_count'],
+        })
+    return results
+
+
+def risk_factors(organization, limit: int = TOP_RISK_FACTORS) -> List[Dict]:
+    """
+    Most frequently selected risk-contributing choices.
+
+    Read from the daily rollups. A risk factor is labelled by the Korean
+    text of the choice (the English text when no translation exists);
+    choices with the same label are counted together.
+
+    Args:
+        organization: Organization whose trainers' assessments are included
+        limit: Number of risk factors to return
+
+    Returns:
+        List of dicts with risk_factor, count and percentage of responses
+    """
+    response_count = MCQQuestionDailyRollup.objects.filter(
+        organization=organization
+    ).aggregate(total=Sum('response_count'))['total']
+    if not response_count:
+        return []
+
+    counts = (
+        MCQChoiceDailyRollup.objects
+        .filter(organization=organization, risk_count__gt=0)
+        .annotate(
+            risk_factor=Coalesce(
+                NullIf('choice__choice_text_ko', Value('')),
+                'choice__choice_text',
+            )
+        )
+        .order_by()
+        .values('risk_factor')
+        .annotate(count=Sum('risk_count'))
+        .order_by('-count', 'risk_factor')[:limit]
+    )
+
+    return [
+        {
+            'risk_factor': row['risk_factor'],
+            'count': row['count'],
+            'percentage': round(row['count'] / response_count * 100, 1),
+        }
+        for row in counts
+    ]
+
+
+def completion_rates(organization) -> List[Dict]:
+    """
+    Share of the organization's assessments that answered every active
+    question of each active category.
+
+    Args:
+        organization: Organization whose trainers' assessments are included
+
+    Returns:
+        List of dicts with category, slug, total_questions, completion_rate,
+        complete_count and total_assessments; categories without active
+        questions are omitted
+    """
+    categories = [
+        category
+        for category in QuestionCategory.objects.filter(is_active=True).annotate(
+            total_questions=Count('questions', filter=Q(questions__is_active=True))
+        )
+        if category.total_questions
+    ]
+    if not categories:
+        return []
+
+    total_assessments = Assessment.objects.filter(trainer__organization=organization).count()
+
+    complete = {}
+    if total_assessments:
+        # HAVING answered = CASE category WHEN ... THEN total_questions END
+        required = Case(
+            *[
+                When(question__category_id=category.id, then=Value(category.total_questions))
+                for category in categories
+            ],
+            default=Value(None),
+            output_field=IntegerField(),
+        )
+        complete_pairs = (
+            QuestionResponse.objects
+            .filter(
+                assessment__trainer__organization=organization,
+                question__category_id__in=[category.id for category in categories],
+            )
+            .order_by()
+            .values('assessment_id', 'question__category_id')
+            .annotate(answered=Count('id'), category_id=F('question__category_id'))
+            .filter(answered=required)
+        )
+        complete = complete_pairs.aggregate(**{
+            str(category.id): Count('assessment_id', filter=Q(category_id=category.id))
+            for category in categories
+        })
+
+    results = []
+    for category in categories:
+        complete_count = complete.get(str(category.id)) or 0
+        results.append({
+            'category': category.name_ko,
+            'slug': category_slug(category),
+            'total_questions': category.total_questions,
+            'completion_rate': round(
+                complete_count / total_assessments * 100, 1
+            ) if total_assessments > 0 else 0,
+            'complete_count': complete_count,
+            'total_assessments': total_assessments,
+        })
+    return results
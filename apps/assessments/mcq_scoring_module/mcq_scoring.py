@@ -9,7 +9,7 @@ This module handles scoring for Multiple Choice Questions across three categorie
 Physical assessments contribute the remaining 60% of the comprehensive score.
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 from django.db.models import Sum, Q, F
 from decimal import Decimal
 
@@ -45,28 +45,28 @@ class MCQScoringEngine:
         Returns:
             Dict with category scores and comprehensive score
         """
-        # Get all question responses for this assessment
-        responses = self.assessment.question_responses.select_related(
-            'question__category'
-        ).prefetch_related('selected_choices')
-        
-        # Group responses by category
-        category_responses = {}
-        for response in responses:
-            category_name = response.question.category.name.lower()
-            if category_name not in category_responses:
-                category_responses[category_name] = []
-            category_responses[category_name].append(response)
-        
-        # Calculate score for each category
+        inputs = _aggregate_mcq_inputs([self.assessment.pk])
+        return self._apply_scores(*inputs.get(self.assessment.pk, ({}, [])))
+    
+    def _apply_scores(self, category_points: Dict[str, List[int]],
+                      risk_factors: List[Dict]) -> Dict[str, float]:
+        """
+        Turn aggregated points into category scores and store them on the assessment.
+        
+        Args:
+            category_points: Mapping of lowercase category name to
+                [possible points, earned points]
+            risk_factors: Risk factors contributed by selected choices
+            
+        Returns:
+            Dict with category scores and comprehensive score
+        """
         scores = {}
-        for category_name, cat_responses in category_responses.items():
+        for category_name, (possible, earned) in category_points.items():
             scores[category_name] = self._calculate_category_score(
-                category_name, cat_responses
+                category_name, possible, earned
             )
-        
-        # Debug: Print category names and scores
-        print(f"DEBUG - MCQ Category scores: {scores}")
+        self._risk_factors = risk_factors
         
         # Store individual category scores
         # Handle both with and without "assessment" suffix
@@ -86,39 +86,22 @@ class MCQScoringEngine:
             'mcq_risk_factors': self._risk_factors
         }
     
-    def _calculate_category_score(self, category_name: str, 
-                                  responses: List) -> float:
+    def _calculate_category_score(self, category_name: str,
+                                  possible_points: int, earned_points: int) -> float:
         """
         Calculate score for a single category.
         
         Args:
             category_name: Name of the category
-            responses: List of QuestionResponse instances for this category
+            possible_points: Sum of maximum points of the answered questions
+            earned_points: Sum of points earned on those questions
             
         Returns:
             Score as percentage (0-100)
         """
-        if not responses:
-            return 0.0
-        
-        total_possible_points = 0
-        total_earned_points = 0
-        
-        for response in responses:
-            # Get maximum possible points for this question
-            max_points = response.question.points
-            total_possible_points += max_points
-            
-            # Get earned points (already calculated in QuestionResponse.save())
-            earned_points = response.points_earned
-            total_earned_points += earned_points
-            
-            # Check for risk factors
-            self._extract_risk_factors(response)
-        
         # Calculate percentage score
-        if total_possible_points > 0:
-            score = (total_earned_points / total_possible_points) * 100
+        if possible_points > 0:
+            score = (earned_points / possible_points) * 100
         else:
             score = 0.0
         
@@ -127,24 +110,6 @@ class MCQScoringEngine:
         
         return round(score, 1)
     
-    def _extract_risk_factors(self, response) -> None:
-        """
-        Extract risk factors from question responses.
-        
-        Args:
-            response: QuestionResponse instance
-        """
-        for choice in response.selected_choices.all():
-            if choice.contributes_to_risk and choice.risk_weight > 0:
-                risk_factor = {
-                    'category': response.question.category.name,
-                    'question': response.question.question_text,
-                    'answer': choice.choice_text,
-                    'risk_weight': float(choice.risk_weight),
-                    'risk_type': 'mcq_response'
-                }
-                self._risk_factors.append(risk_factor)
-    
     def _calculate_comprehensive_score(self, mcq_scores: Dict[str, float]) -> float:
         """
         Calculate comprehensive score combining physical and MCQ assessments.
@@ -348,6 +313,105 @@ class MCQScoringEngine:
         return recommendations
 
 
+def _aggregate_mcq_inputs(assessment_ids: Iterable[int]) -> Dict[int, Tuple[Dict, List[Dict]]]:
+    """
+    Collect everything MCQ scoring needs for many assessments in two queries.
+    
+    Earned and possible points are summed per assessment and category in one
+    grouped query over the responses. Risk-contributing choices come from a
+    second query over the `selected_choices` through table, ordered like the
+    responses and choices they belong to.
+    
+    Args:
+        assessment_ids: Primary keys of the assessments to score
+        
+    Returns:
+        Dict mapping assessment id to (category_points, risk_factors), where
+        category_points maps lowercase category name to [possible, earned]
+    """
+    from apps.assessments.models import QuestionResponse
+    
+    assessment_ids = [pk for pk in assessment_ids if pk is not None]
+    if not assessment_ids:
+        return {}
+    
+    results = {pk: ({}, []) for pk in assessment_ids}
+    
+    totals = (
+        QuestionResponse.objects
+        .filter(assessment_id__in=assessment_ids)
+        .order_by()
+        .values('assessment_id', 'question__category__name')
+        .annotate(possible=Sum('question__points'), earned=Sum('points_earned'))
+    )
+    for row in totals:
+        # Category names are matched case-insensitively
+        points = results[row['assessment_id']][0].setdefault(
+            row['question__category__name'].lower(), [0, 0]
+        )
+        points[0] += row['possible'] or 0
+        points[1] += row['earned'] or 0
+    
+    SelectedChoice = QuestionResponse.selected_choices.through
+    risky_choices = (
+        SelectedChoice.objects
+        .filter(
+            questionresponse__assessment_id__in=assessment_ids,
+            questionchoice__contributes_to_risk=True,
+            questionchoice__risk_weight__gt=0,
+        )
+        .order_by(
+            'questionresponse__assessment_id',
+            'questionresponse__question__category__order',
+            'questionresponse__question__category__name',
+            'questionresponse__question__order',
+            'questionresponse_id',
+            'questionchoice__order',
+            'questionchoice_id',
+        )
+        .values_list(
+            'questionresponse__assessment_id',
+            'questionresponse__question__category__name',
+            'questionresponse__question__question_text',
+            'questionchoice__choice_text',
+            'questionchoice__risk_weight',
+        )
+    )
+    for assessment_id, category, question, answer, risk_weight in risky_choices:
+        results[assessment_id][1].append({
+            'category': category,
+            'question': question,
+            'answer': answer,
+            'risk_weight': float(risk_weight),
+            'risk_type': 'mcq_response'
+        })
+    
+    return results
+
+
+def calculate_mcq_scores_batch(assessments) -> Dict[int, Dict[str, float]]:
+    """
+    Calculate MCQ scores for many assessments with two queries in total.
+    
+    Scores are stored on each assessment instance (not saved), exactly as
+    MCQScoringEngine.calculate_mcq_scores does for a single assessment.
+    
+    Args:
+        assessments: Iterable of Assessment model instances
+        
+    Returns:
+        Dict mapping assessment pk to the calculate_mcq_scores result
+    """
+    assessments = list(assessments)
+    inputs = _aggregate_mcq_inputs(assessment.pk for assessment in assessments)
+    return {
+        assessment.pk: MCQScoringEngine(assessment)._apply_scores(
+            *inputs.get(assessment.pk, ({}, []))
+        )
+        for assessment in assessments
+    }
+
+
 def calculate_mcq_scores_for_assessment(assessment) -> Dict[str, float]:
     """
     Convenience function to calculate MCQ scores for an assessment.
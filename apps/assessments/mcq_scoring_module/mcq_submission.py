@@ -0,0 +1,180 @@
+"""
+Bulk write path for MCQ submissions.
+
+Saving a questionnaire one answer at a time costs a get_or_create, a
+clear() and an add() per question, and every M2M change fires the
+`update_question_response_points` signal with another UPDATE. This module
+validates a whole submission against one prefetched question/choice map,
+computes points in memory and writes responses and `selected_choices`
+rows with bulk operations, then recomputes the MCQ scores and the analytics
+rollups once, all in a single transaction.
+
+Bulk operations do not send post_save or m2m_changed, so the per-response
+signal handlers are not involved; points are computed here with the same
+rules as `QuestionResponse.calculate_points`.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.assessments import mcq_rollups
+from apps.assessments.models import MultipleChoiceQuestion, QuestionResponse
+from .mcq_scoring import MCQScoringEngine
+
+
+# Assessment fields written by MCQScoringEngine.calculate_mcq_scores
+MCQ_SCORE_FIELDS = ['knowledge_score', 'lifestyle_score', 'readiness_score', 'comprehensive_score']
+
+
+class MCQSubmissionError(ValueError):
+    """Raised when a submission references an unknown question."""
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MCQSubmissionService:
+    """
+    Save all MCQ answers for an assessment in one transaction.
+
+    Each answer is a dict with `question_id`, optional `selected_choices`
+    (choice ids) and optional `response_text`. Choice ids that do not belong
+    to the question are ignored, like the per-answer code paths did.
+    """
+
+    def __init__(self, assessment, questions: Optional[Iterable] = None):
+        """
+        Args:
+            assessment: Assessment the answers belong to
+            questions: Optional questions already loaded with
+                prefetch_related('choices'); loaded on demand otherwise
+        """
+        self.assessment = assessment
+        self._questions = None
+        if questions is not None:
+            self._questions = {question.id: question for question in questions}
+
+    def _load_questions(self, question_ids: List[int]) -> Dict[int, MultipleChoiceQuestion]:
+        if self._questions is not None:
+            return self._questions
+        return {
+            question.id: question
+            for question in MultipleChoiceQuestion.objects.filter(
+                id__in=question_ids, is_active=True
+            ).prefetch_related('choices')
+        }
+
+    @staticmethod
+    def _points(question, choices) -> int:
+        """Points for the selected choices, as QuestionResponse.calculate_points."""
+        if question.question_type == 'multiple':
+            return sum(choice.points for choice in choices)
+        # Single choice and scale use the first choice in display order
+        first = min(choices, key=lambda choice: (choice.order, choice.id), default=None)
+        return first.points if first else 0
+
+    def submit(self, answers: Iterable[Dict], replace: bool = False) -> List[QuestionResponse]:
+        """
+        Write a submission and recompute the assessment's MCQ scores.
+
+        Args:
+            answers: Iterable of answer dicts
+            replace: Delete all existing responses of the assessment first;
+                otherwise responses to the submitted questions are updated
+                in place and other responses are kept
+
+        Returns:
+            List of saved QuestionResponse instances in submission order
+
+        Raises:
+            MCQSubmissionError: If an answer references an unknown or
+                inactive question
+        """
+        answers = list(answers)
+        question_ids = [_to_int(answer.get('question_id')) for answer in answers]
+        questions = self._load_questions([pk for pk in question_ids if pk is not None])
+
+        # Validate everything before writing anything. A question answered
+        # twice keeps its last answer.
+        resolved = {}
+        for answer, question_id in zip(answers, question_ids):
+            question = questions.get(question_id)
+            if question is None:
+                raise MCQSubmissionError(
+                    f"질문 ID {answer.get('question_id')}를 찾을 수 없습니다."
+                )
+            choices_by_id = {choice.id: choice for choice in question.choices.all()}
+            choices = []
+            for choice_id in answer.get('selected_choices') or []:
+                choice = choices_by_id.get(_to_int(choice_id))
+                if choice is not None and choice not in choices:
+                    choices.append(choice)
+            resolved[question.id] = (question, choices, answer.get('response_text'))
+        resolved = list(resolved.values())
+
+        SelectedChoice = QuestionResponse.selected_choices.through
+        now = timezone.now()
+
+        with transaction.atomic(), mcq_rollups.deferred():
+            if replace:
+                QuestionResponse.objects.filter(assessment=self.assessment).delete()
+                existing = {}
+            else:
+                existing = {
+                    response.question_id: response
+                    for response in QuestionResponse.objects.filter(
+                        assessment=self.assessment,
+                        question_id__in=[question.id for question, _, _ in resolved]
+                    )
+                }
+
+            responses, to_create, to_update = [], [], []
+            for question, choices, response_text in resolved:
+                response = existing.get(question.id)
+                if response is None:
+                    response = QuestionResponse(
+                        assessment=self.assessment,
+                        question=question,
+                        response_text=response_text or '',
+                    )
+                    to_create.append(response)
+                else:
+                    if response_text is not None:
+                        response.response_text = response_text
+                    response.updated = now
+                    to_update.append(response)
+                response.points_earned = self._points(question, choices)
+                responses.append((response, choices))
+
+            if to_update:
+                QuestionResponse.objects.bulk_update(
+                    to_update, ['response_text', 'points_earned', 'updated']
+                )
+                SelectedChoice.objects.filter(
+                    questionresponse_id__in=[response.pk for response in to_update]
+                ).delete()
+            if to_create:
+                QuestionResponse.objects.bulk_create(to_create)
+
+            SelectedChoice.objects.bulk_create([
+                SelectedChoice(questionresponse_id=response.pk, questionchoice_id=choice.pk)
+                for response, choices in responses
+                for choice in choices
+            ])
+
+            # One recompute for the whole submission
+            MCQScoringEngine(self.assessment).calculate_mcq_scores()
+            self.assessment.save(update_fields=MCQ_SCORE_FIELDS)
+
+            mcq_rollups.refresh_for_assessment(
+                self.assessment,
+                None if replace else [question.id for question, _, _ in resolved]
+            )
+
+        return [response for response, _ in responses]
@@ -0,0 +1,289 @@
+"""
+Single-pass MCQ response statistics.
+
+`mcq_statistics` used to answer each report section with its own family of
+queries, several of them per question or per assessment. The collector
+here streams the responses of a date range once, ordered by assessment,
+and folds them into compact counters:
+
+- responses and points per question
+- answered questions per type, flushed per assessment so the average over
+  assessments needs no per-assessment rows
+- a comprehensive-score histogram of correct answers per question, from
+  which the discrimination index is read without ranking assessments
+
+Selections per choice come from one grouped query over the same range.
+The memory held grows with the size of the question catalog, not with the
+number of responses.
+
+A range can be split into date shards. Every assessment falls in exactly
+one shard, so shard results merge by addition and may be collected in a
+pool of worker processes.
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connections
+from django.db.models import Avg, Count, Q
+
+
+STREAM_CHUNK_SIZE = 2000
+
+# Histogram bins for comprehensive scores (0-100, one point wide)
+SCORE_BINS = 101
+
+# Share of ranked assessments compared at each end for discrimination
+DISCRIMINATION_GROUP = 0.27
+
+
+def _models():
+    from .models import Assessment, MultipleChoiceQuestion, QuestionResponse
+    return Assessment, MultipleChoiceQuestion, QuestionResponse
+
+
+def _score_bin(score: float) -> int:
+    return min(SCORE_BINS - 1, max(0, int(round(score))))
+
+
+def date_shards(start, end, shards: int) -> List[Tuple[object, object, bool]]:
+    """
+    Split the inclusive range [start, end] into contiguous shards.
+
+    Returns:
+        List of (start, end, end_inclusive) tuples; only the last shard
+        includes its end
+    """
+    shards = max(1, shards)
+    step = (end - start) / shards
+    bounds = [start + step * index for index in range(shards)] + [end]
+    return [
+        (bounds[index], bounds[index + 1], index == shards - 1)
+        for index in range(shards)
+    ]
+
+
+def date_filter(prefix: str, start, end, end_inclusive: bool = True,
+                trainer_id: Optional[int] = None) -> Q:
+    """Q for rows whose assessment falls in a shard, optionally for one trainer."""
+    end_lookup = 'lte' if end_inclusive else 'lt'
+    condition = Q(**{f'{prefix}date__gte': start, f'{prefix}date__{end_lookup}': end})
+    if trainer_id:
+        condition &= Q(**{f'{prefix}trainer_id': trainer_id})
+    return condition
+
+
+class ResponseStats:
+    """
+    Counters accumulated over a stream of responses.
+
+    Feed responses with `add()` grouped by assessment and call `flush()`
+    after each assessment. Instances from disjoint assessments combine
+    with `merge()`.
+    """
+
+    def __init__(self):
+        self.total_responses = 0
+        self.assessments_with_responses = 0
+        self.question_responses = Counter()
+        self.question_points = Counter()
+        self.choice_selections = Counter()
+        # Question type -> responses / assessments answering at least one
+        self.type_responses = Counter()
+        self.type_assessments = Counter()
+        # Question id -> [responses per score bin] + [correct per score bin]
+        self.score_histograms: Dict[int, List[int]] = {}
+        self._current_types = set()
+
+    def add(self, question_id: int, question_type: str, points_earned: int,
+            comprehensive_score: Optional[float]):
+        """Count one response of the current assessment."""
+        self.total_responses += 1
+        self.question_responses[question_id] += 1
+        self.question_points[question_id] += points_earned or 0
+        self.type_responses[question_type] += 1
+        self._current_types.add(question_type)
+
+        if comprehensive_score is not None:
+            histogram = self.score_histograms.get(question_id)
+            if histogram is None:
+                histogram = self.score_histograms[question_id] = [0] * (2 * SCORE_BINS)
+            score_bin = _score_bin(comprehensive_score)
+            histogram[score_bin] += 1
+            if points_earned and points_earned > 0:
+                histogram[SCORE_BINS + score_bin] += 1
+
+    def flush(self):
+        """Close the current assessment."""
+        if not self._current_types:
+            return
+        self.assessments_with_responses += 1
+        self.type_assessments.update(self._current_types)
+        self._current_types = set()
+
+    def merge(self, other: 'ResponseStats'):
+        """Add the counters of a disjoint set of assessments."""
+        self.total_responses += other.total_responses
+        self.assessments_with_responses += other.assessments_with_responses
+        self.question_responses.update(other.question_responses)
+        self.question_points.update(other.question_points)
+        self.choice_selections.update(other.choice_selections)
+        self.type_responses.update(other.type_responses)
+        self.type_assessments.update(other.type_assessments)
+        for question_id, histogram in other.score_histograms.items():
+            mine = self.score_histograms.get(question_id)
+            if mine is None:
+                self.score_histograms[question_id] = list(histogram)
+            else:
+                for index, count in enumerate(histogram):
+                    mine[index] += count
+        return self
+
+    def totals(self, question_id: int) -> Tuple[int, int]:
+        """(responses, points earned) for a question."""
+        return self.question_responses.get(question_id, 0), self.question_points.get(question_id, 0)
+
+    def average_answered(self, question_type: str) -> float:
+        """Average answered questions of a type per assessment answering any."""
+        assessments = self.type_assessments.get(question_type, 0)
+        return self.type_responses.get(question_type, 0) / assessments if assessments else 0
+
+    def discrimination_index(self, question_id: int) -> Optional[float]:
+        """
+        Correct answers in the top minus the bottom 27% of assessments by
+        comprehensive score, per assessment in a group.
+
+        Responses of unscored assessments are not ranked. Assessments tied
+        on the group boundary count pro rata.
+        """
+        histogram = self.score_histograms.get(question_id)
+        if histogram is None:
+            return None
+        counts, correct = histogram[:SCORE_BINS], histogram[SCORE_BINS:]
+        group = int(sum(counts) * DISCRIMINATION_GROUP)
+        if group == 0:
+            return 0
+
+        def correct_in(bins):
+            remaining, total = group, 0.0
+            for score_bin in bins:
+                if not counts[score_bin]:
+                    continue
+                taken = min(remaining, counts[score_bin])
+                total += correct[score_bin] * taken / counts[score_bin]
+                remaining -= taken
+                if not remaining:
+                    break
+            return total
+
+        top = correct_in(range(SCORE_BINS - 1, -1, -1))
+        bottom = correct_in(range(SCORE_BINS))
+        return (top - bottom) / group
+
+
+def collect_shard(start, end, end_inclusive: bool = True,
+                  trainer_id: Optional[int] = None,
+                  chunk_size: int = STREAM_CHUNK_SIZE) -> ResponseStats:
+    """Stream the responses of one date shard into a ResponseStats."""
+    _, MultipleChoiceQuestion, QuestionResponse = _models()
+    SelectedChoice = QuestionResponse.selected_choices.through
+
+    question_types = dict(MultipleChoiceQuestion.objects.values_list('id', 'question_type'))
+    stats = ResponseStats()
+
+    responses = (
+        QuestionResponse.objects
+        .filter(date_filter('assessment__', start, end, end_inclusive, trainer_id))
+        .order_by('assessment_id')
+        .values_list('assessment_id', 'question_id', 'points_earned', 'assessment__comprehensive_score')
+    )
+    current = None
+    for assessment_id, question_id, points_earned, score in responses.iterator(chunk_size=chunk_size):
+        if assessment_id != current:
+            stats.flush()
+            current = assessment_id
+        stats.add(question_id, question_types.get(question_id), points_earned, score)
+    stats.flush()
+
+    selections = (
+        SelectedChoice.objects
+        .filter(date_filter('questionresponse__assessment__', start, end, end_inclusive, trainer_id))
+        .order_by()
+        .values_list('questionchoice_id')
+        .annotate(count=Count('id'))
+    )
+    stats.choice_selections.update(dict(selections))
+    return stats
+
+
+def _init_worker():
+    """Make sure Django is configured in spawned worker processes."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _collect_shard(args) -> ResponseStats:
+    return collect_shard(*args)
+
+
+def collect(start, end, trainer_id: Optional[int] = None, shards: int = 1,
+            workers: int = 1, chunk_size: int = STREAM_CHUNK_SIZE) -> ResponseStats:
+    """
+    Response statistics for assessments dated within [start, end].
+
+    Args:
+        start: First assessment datetime included
+        end: Last assessment datetime included
+        trainer_id: Restrict to one trainer's assessments
+        shards: Number of date shards the range is split into
+        workers: Worker processes collecting shards; 1 collects in-process
+        chunk_size: Rows fetched per round trip while streaming
+
+    Returns:
+        ResponseStats merged over all shards
+    """
+    jobs = [
+        (shard_start, shard_end, inclusive, trainer_id, chunk_size)
+        for shard_start, shard_end, inclusive in date_shards(start, end, shards)
+    ]
+
+    if workers > 1 and len(jobs) > 1:
+        # Children must open their own connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(_collect_shard, jobs))
+    else:
+        results = [_collect_shard(job) for job in jobs]
+
+    stats = ResponseStats()
+    for result in results:
+        stats.merge(result)
+    return stats
+
+
+def assessment_summary(start, end, trainer_id: Optional[int] = None) -> Dict:
+    """
+    Assessment-level counts and MCQ score averages in one aggregate.
+
+    Returns:
+        Dict with total, scored (assessments with a knowledge score),
+        aligned (scored with comprehensive and overall scores of 70+) and
+        the avg_knowledge/lifestyle/readiness/comprehensive averages of
+        scored assessments
+    """
+    Assessment, _, _ = _models()
+
+    scored = Q(knowledge_score__isnull=False)
+    return Assessment.objects.filter(date_filter('', start, end, True, trainer_id)).aggregate(
+        total=Count('id'),
+        scored=Count('id', filter=scored),
+        aligned=Count('id', filter=scored & Q(comprehensive_score__gte=70, overall_score__gte=70)),
+        avg_knowledge=Avg('knowledge_score', filter=scored),
+        avg_lifestyle=Avg('lifestyle_score', filter=scored),
+        avg_readiness=Avg('readiness_score', filter=scored),
+        avg_comprehensive=Avg('comprehensive_score', filter=scored),
+    )
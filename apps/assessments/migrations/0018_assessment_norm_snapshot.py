@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-16 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0017_farmerscarrytest_harvardsteptest_overheadsquattest_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='norm_version',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='Version of the normative data used for the snapshot', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='percentile_rankings_snapshot',
+            field=models.JSONField(blank=True, help_text='Percentile rankings per test at the time of scoring', null=True),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='performance_age_snapshot',
+            field=models.JSONField(blank=True, help_text='Performance age data at the time of scoring', null=True),
+        ),
+    ]
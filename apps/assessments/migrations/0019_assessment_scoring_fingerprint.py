@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0018_assessment_norm_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='scoring_fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Hash of the scoring inputs the stored scores were computed from', max_length=40),
+        ),
+    ]
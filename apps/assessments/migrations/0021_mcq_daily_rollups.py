@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-16 20:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0020_scoring_fingerprint_index'),
+        ('trainers', '0004_auditlog_notification_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MCQChoiceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Assessment date')),
+                ('response_count', models.PositiveIntegerField(default=0, help_text='Responses that selected this choice')),
+                ('points_sum', models.IntegerField(default=0)),
+                ('risk_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assessments.questioncategory')),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assessments.questionchoice')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trainers.organization')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assessments.multiplechoicequestion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'day'], name='assessments_organiz_54b32b_idx'), models.Index(fields=['day'], name='assessments_day_9e8fdf_idx')],
+                'unique_together': {('organization', 'choice', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MCQQuestionDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Assessment date')),
+                ('response_count', models.PositiveIntegerField(default=0)),
+                ('points_sum', models.IntegerField(default=0, help_text='Sum of points earned by the responses')),
+                ('risk_count', models.PositiveIntegerField(default=0, help_text='Selected choices that contribute to risk')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assessments.questioncategory')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trainers.organization')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assessments.multiplechoicequestion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'day'], name='assessments_organiz_585c66_idx'), models.Index(fields=['day'], name='assessments_day_e9f62a_idx')],
+                'unique_together': {('organization', 'question', 'day')},
+            },
+        ),
+    ]
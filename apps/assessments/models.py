@@ -2,7 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from django.db.models.signals import m2m_changed
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
 from django.dispatch import receiver
 from datetime import date
 
@@ -23,6 +23,37 @@ from apps.assessments.scoring import (
 from .risk_calculator import calculate_injury_risk
 
 
+# Assessment fields that feed into score calculation
+SCORING_INPUT_FIELDS = [
+    'overhead_squat_score', 'overhead_squat_knee_valgus', 'overhead_squat_forward_lean',
+    'overhead_squat_heel_lift', 'overhead_squat_arm_drop', 'overhead_squat_quality',
+    'push_up_reps', 'push_up_score', 'push_up_type',
+    'single_leg_balance_right_eyes_open', 'single_leg_balance_left_eyes_open',
+    'single_leg_balance_right_eyes_closed', 'single_leg_balance_left_eyes_closed',
+    'toe_touch_distance', 'toe_touch_score', 'toe_touch_flexibility',
+    'shoulder_mobility_right', 'shoulder_mobility_left', 'shoulder_mobility_score',
+    'shoulder_mobility_pain', 'shoulder_mobility_asymmetry', 'shoulder_mobility_category',
+    'farmer_carry_weight', 'farmer_carry_distance', 'farmer_carry_time',
+    'farmer_carry_score', 'farmer_carry_percentage',
+    'harvard_step_test_hr1', 'harvard_step_test_hr2', 'harvard_step_test_hr3',
+    'harvard_step_test_duration',
+    'test_environment', 'temperature',
+    'overhead_squat_score_manual_override', 'push_up_score_manual_override',
+    'toe_touch_score_manual_override', 'shoulder_mobility_score_manual_override',
+    'farmer_carry_score_manual_override',
+    'single_leg_balance_score_manual', 'single_leg_balance_score_manual_override',
+    'harvard_step_test_score_manual', 'harvard_step_test_score_manual_override',
+    'overall_score_manual_override', 'strength_score_manual_override',
+    'mobility_score_manual_override', 'balance_score_manual_override',
+    'cardio_score_manual_override',
+]
+
+# Category scores that become scoring inputs when manually overridden
+OVERRIDABLE_CATEGORY_FIELDS = [
+    'overall_score', 'strength_score', 'mobility_score', 'balance_score', 'cardio_score',
+]
+
+
 class Assessment(models.Model):
     """
     Assessment model for storing fitness assessment results.
@@ -344,6 +375,24 @@ class Assessment(models.Model):
         help_text="Detailed risk factors identified in the assessment"
     )
     
+    # Normative Snapshot Fields (computed during scoring)
+    percentile_rankings_snapshot = models.JSONField(
+        null=True, blank=True,
+        help_text="Percentile rankings per test at the time of scoring"
+    )
+    performance_age_snapshot = models.JSONField(
+        null=True, blank=True,
+        help_text="Performance age data at the time of scoring"
+    )
+    norm_version = models.CharField(
+        max_length=32, blank=True, default='', db_index=True,
+        help_text="Version of the normative data used for the snapshot"
+    )
+    scoring_fingerprint = models.CharField(
+        max_length=40, blank=True, default='', editable=False, db_index=True,
+        help_text="Hash of the scoring inputs the stored scores were computed from"
+    )
+    
     # MCQ Score Fields
     knowledge_score = models.FloatField(
         null=True, blank=True,
@@ -412,6 +461,15 @@ class Assessment(models.Model):
                 self.balance_score = 0
             if self.cardio_score is None:
                 self.cardio_score = 0
+        
+        # Snapshot percentile rankings and performance age for readers
+        try:
+            self.refresh_norm_snapshot()
+        except Exception as e:
+            print(f"Error calculating normative snapshot: {e}")
+        
+        # Remember which inputs these scores were computed from
+        self.scoring_fingerprint = self.compute_scoring_fingerprint()
     
     def _legacy_calculate_scores(self):
         """
@@ -498,6 +556,38 @@ class Assessment(models.Model):
         
         self.injury_risk_score, self.risk_factors = calculate_injury_risk(risk_data)
     
+    def compute_scoring_fingerprint(self):
+        """
+        Deterministic hash over everything that affects the calculated scores.
+        
+        Covers raw test values, manual overrides, client age/gender and the
+        test standards and normative bands this assessment resolves. If the
+        result matches `scoring_fingerprint`, the stored scores are current.
+        """
+        import hashlib
+        import json
+        from . import norms_table, score_dependencies, standards_index
+        
+        inputs = {field: getattr(self, field) for field in SCORING_INPUT_FIELDS}
+        for field in OVERRIDABLE_CATEGORY_FIELDS:
+            if getattr(self, f'{field}_manual_override', False):
+                inputs[field] = getattr(self, field)
+        
+        client = self.client if self.client_id else None
+        inputs['client'] = [client.gender, client.age] if client else None
+        
+        # Only the reference rows this assessment depends on, so editing an
+        # unrelated standard does not mark it stale
+        inputs['standards'] = score_dependencies.standard_keys(self, standards_index.get_index())
+        inputs['norms'] = score_dependencies.norm_keys(self, norms_table.get_table())
+        
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+    
+    def scoring_is_stale(self):
+        """Whether the stored scores were computed from different inputs."""
+        return self.compute_scoring_fingerprint() != self.scoring_fingerprint
+    
     def _calculate_client_age(self):
         """Get client age."""
         if self.client and self.client.age:
@@ -514,11 +604,13 @@ class Assessment(models.Model):
                 self.toe_touch_score, self.shoulder_mobility_score,
                 self.farmer_carry_score
             ]):
-                self._calculating_scores = True
-                try:
-                    self.calculate_scores()
-                finally:
-                    self._calculating_scores = False
+                # Skip rescoring when nothing that affects the scores changed
+                if self.scoring_is_stale():
+                    self._calculating_scores = True
+                    try:
+                        self.calculate_scores()
+                    finally:
+                        self._calculating_scores = False
         super().save(*args, **kwargs)
     
     @property
@@ -530,158 +622,54 @@ class Assessment(models.Model):
         """
         Calculate percentile rankings for all test scores based on normative data.
         Returns a dictionary of test names and their percentile rankings.
-        """
-        rankings = {}
-        
-        # Get client info for normative data lookup
-        age = self._calculate_client_age()
-        # Map gender from model format to normative data format
-        gender_map = {'male': 'M', 'female': 'F'}
-        gender = gender_map.get(self.client.gender, 'A') if self.client else 'A'
-        
-        if not age:
-            return rankings
-        
-        # Map of test fields to normative data test types
-        test_mappings = {
-            'overhead_squat_score': 'overhead_squat',
-            'push_up_score': 'push_up',
-            'farmer_carry_score': 'farmer_carry',
-            'toe_touch_score': 'toe_touch',
-            'shoulder_mobility_score': 'shoulder_mobility',
-            'harvard_step_test_score': 'harvard_step',
-            'overall_score': 'overall',
-            'strength_score': 'strength',
-            'mobility_score': 'mobility',
-            'balance_score': 'balance',
-            'cardio_score': 'cardio',
-        }
         
-        # Calculate percentiles for each test
-        for field_name, test_type in test_mappings.items():
-            score = getattr(self, field_name, None)
-            if score is not None:
-                # Try to find matching normative data
-                norm_data = NormativeData.objects.filter(
-                    test_type=test_type,
-                    age_min__lte=age,
-                    age_max__gte=age,
-                    gender__in=[gender, 'A']  # Use gender-specific or average
-                ).order_by('gender').first()  # Prefer gender-specific over average
-                
-                if norm_data:
-                    percentile = norm_data.get_percentile(score)
-                    rankings[test_type] = {
-                        'score': score,
-                        'percentile': round(percentile, 1),
-                        'upper_percentile': round(100 - percentile, 1),
-                        'source': norm_data.source,
-                        'year': norm_data.year
-                    }
-                else:
-                    rankings[test_type] = {
-                        'score': score,
-                        'percentile': None,
-                        'upper_percentile': None,
-                        'source': 'No normative data available',
-                        'year': None
-                    }
-        
-        # Add single leg balance average if available
-        balance_scores = []
-        for side in ['right', 'left']:
-            for condition in ['eyes_open', 'eyes_closed']:
-                field = f'single_leg_balance_{side}_{condition}'
-                value = getattr(self, field, None)
-                if value is not None:
-                    balance_scores.append(value)
-        
-        if balance_scores:
-            avg_balance = sum(balance_scores) / len(balance_scores)
-            norm_data = NormativeData.objects.filter(
-                test_type='single_leg_balance',
-                age_min__lte=age,
-                age_max__gte=age,
-                gender__in=[gender, 'A']
-            ).order_by('gender').first()
-            
-            if norm_data:
-                percentile = norm_data.get_percentile(avg_balance)
-                rankings['single_leg_balance'] = {
-                    'score': round(avg_balance, 1),
-                    'percentile': round(percentile, 1),
-                    'upper_percentile': round(100 - percentile, 1),
-                    'source': norm_data.source,
-                    'year': norm_data.year
-                }
-        
-        return rankings
+        Rankings are computed against the per-process normative table (see
+        apps.assessments.norms_table), so no queries are issued per field.
+        """
+        from .norms_table import rank_assessment
+        return rank_assessment(self)
     
     def calculate_performance_age(self):
         """
         Calculate performance age based on overall fitness percentile.
         Returns the age at which the client's performance would be average (50th percentile).
         """
-        if not self.overall_score:
-            return None
-            
-        # Get client info
-        # Map gender from model format to normative data format
-        gender_map = {'male': 'M', 'female': 'F'}
-        gender = gender_map.get(self.client.gender, 'A') if self.client else 'A'
-        chronological_age = self._calculate_client_age()
-        
-        if not chronological_age:
-            return None
+        from .norms_table import performance_age
+        return performance_age(self)
+    
+    def refresh_norm_snapshot(self, table=None, rankings=None):
+        """
+        Recompute the persisted percentile/performance-age snapshot.
         
-        # Find all normative data for overall score
-        norm_data_list = NormativeData.objects.filter(
-            test_type='overall',
-            gender__in=[gender, 'A']
-        ).order_by('age_min')
+        Args:
+            table: Optional NormsTable to use (defaults to the cached table)
+            rankings: Optional precomputed percentile rankings
+        """
+        from . import norms_table
         
-        if not norm_data_list.exists():
-            return None
+        table = table or norms_table.get_table()
+        if table is None:
+            return
         
-        # Find the age range where this score would be at 50th percentile
-        performance_age = None
+        if rankings is None:
+            rankings = norms_table.rank_assessments([self], table=table)[self.pk]
+        self.percentile_rankings_snapshot = rankings
+        self.performance_age_snapshot = norms_table.performance_age(self, table=table)
+        self.norm_version = table.norm_version
+    
+    def get_norm_snapshot(self):
+        """
+        Get percentile rankings and performance age for display.
         
-        for norm_data in norm_data_list:
-            # Check if the score is close to the 50th percentile for this age group
-            if abs(self.overall_score - norm_data.percentile_50) < 5:  # Within 5 points
-                # Calculate the midpoint of the age range
-                performance_age = (norm_data.age_min + norm_data.age_max) / 2
-                break
-            
-            # If score is between percentiles, interpolate
-            if norm_data.percentile_25 <= self.overall_score <= norm_data.percentile_75:
-                # This score falls in the middle range for this age group
-                performance_age = (norm_data.age_min + norm_data.age_max) / 2
-                break
-        
-        # If not found in middle ranges, check extremes
-        if performance_age is None:
-            # Check if score is better than youngest group's 75th percentile
-            youngest = norm_data_list.first()
-            if self.overall_score > youngest.percentile_75:
-                performance_age = youngest.age_min
-            # Check if score is worse than oldest group's 25th percentile
-            else:
-                oldest = norm_data_list.last()
-                if self.overall_score < oldest.percentile_25:
-                    performance_age = oldest.age_max
-        
-        # Return performance age data
-        if performance_age is not None:
-            age_difference = chronological_age - performance_age
-            return {
-                'chronological_age': chronological_age,
-                'performance_age': round(performance_age, 1),
-                'age_difference': round(age_difference, 1),
-                'interpretation': self._interpret_age_difference(age_difference)
-            }
+        Returns the persisted snapshot; assessments scored before snapshots
+        existed are computed on the fly.
         
-        return None
+        Returns:
+            Tuple of (percentile rankings dict, performance age dict or None)
+        """
+        if self.norm_version:
+            return self.percentile_rankings_snapshot or {}, self.performance_age_snapshot
+        return self.get_percentile_rankings(), self.calculate_performance_age()
     
     def _interpret_age_difference(self, age_difference):
         """
@@ -937,6 +925,34 @@ class NormativeData(models.Model):
         return status
 
 
+# Signal handlers keeping the cached normative table in sync
+@receiver(post_save, sender=NormativeData)
+@receiver(post_delete, sender=NormativeData)
+def invalidate_normative_table(sender, instance, **kwargs):
+    """Reload the cached normative table when normative data changes."""
+    from .norms_table import invalidate
+    invalidate()
+
+
+@receiver(pre_save, sender=NormativeData)
+def remember_normative_state(sender, instance, **kwargs):
+    """Keep the stored row so post_save can tell which cohorts changed."""
+    from .score_dependencies import norm_state
+    previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._previous_dependency_state = norm_state(previous) if previous else None
+
+
+@receiver(post_save, sender=NormativeData)
+@receiver(post_delete, sender=NormativeData)
+def enqueue_normative_dependents(sender, instance, **kwargs):
+    """Queue snapshots of assessments that use a changed normative row."""
+    from .score_dependencies import enqueue_changed, norm_state
+    if 'created' in kwargs:
+        enqueue_changed(getattr(instance, '_previous_dependency_state', None), norm_state(instance))
+    else:
+        enqueue_changed(norm_state(instance), None)
+
+
 class TestStandard(models.Model):
     """
     Configurable test standards and thresholds for fitness assessments.
@@ -1185,6 +1201,34 @@ class TestStandard(models.Model):
         super().save(*args, **kwargs)
 
 
+# Signal handlers keeping the in-memory standards index in sync
+@receiver(post_save, sender=TestStandard)
+@receiver(post_delete, sender=TestStandard)
+def invalidate_test_standard_index(sender, instance, **kwargs):
+    """Rebuild the compiled standards index when a standard changes."""
+    from .standards_index import invalidate
+    invalidate()
+
+
+@receiver(pre_save, sender=TestStandard)
+def remember_test_standard_state(sender, instance, **kwargs):
+    """Keep the stored row so post_save can tell which cohorts changed."""
+    from .score_dependencies import standard_state
+    previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._previous_dependency_state = standard_state(previous) if previous else None
+
+
+@receiver(post_save, sender=TestStandard)
+@receiver(post_delete, sender=TestStandard)
+def enqueue_test_standard_dependents(sender, instance, **kwargs):
+    """Queue rescoring of assessments that may resolve a changed standard."""
+    from .score_dependencies import enqueue_changed, standard_state
+    if 'created' in kwargs:
+        enqueue_changed(getattr(instance, '_previous_dependency_state', None), standard_state(instance))
+    else:
+        enqueue_changed(standard_state(instance), None)
+
+
 class QuestionCategory(models.Model):
     """
     Categories for multiple choice questions.
@@ -1399,6 +1443,131 @@ def update_question_response_points(sender, instance, action, **kwargs):
         QuestionResponse.objects.filter(pk=instance.pk).update(
             points_earned=instance.points_earned
         )
+        from . import mcq_rollups
+        mcq_rollups.refresh_for_responses([instance])
+
+
+@receiver(post_save, sender=QuestionResponse)
+@receiver(post_delete, sender=QuestionResponse)
+def refresh_mcq_rollups(sender, instance, **kwargs):
+    """Keep the MCQ analytics rollups in step with single-response writes."""
+    from . import mcq_rollups
+    mcq_rollups.refresh_for_responses([instance])
+
+
+# Signal handlers keeping the MCQ catalog snapshot in sync
+@receiver(post_save, sender=QuestionCategory)
+@receiver(post_delete, sender=QuestionCategory)
+@receiver(post_save, sender=MultipleChoiceQuestion)
+@receiver(post_delete, sender=MultipleChoiceQuestion)
+@receiver(post_save, sender=QuestionChoice)
+@receiver(post_delete, sender=QuestionChoice)
+def invalidate_mcq_catalog(sender, instance, **kwargs):
+    """Reload the MCQ catalog snapshot when questions change."""
+    from .mcq_catalog import invalidate
+    invalidate()
+
+
+@receiver(post_save, sender=QuestionChoice)
+def reprice_mcq_choice_rollups(sender, instance, created, **kwargs):
+    """Apply a choice's current points and risk flag to its rollup rows."""
+    if not created:
+        from . import mcq_rollups
+        mcq_rollups.reprice_choice(instance)
+
+
+class MCQQuestionDailyRollup(models.Model):
+    """
+    MCQ responses per organization, question and assessment day.
+    
+    Maintained by `apps.assessments.mcq_rollups` whenever responses are
+    written and rebuilt from scratch by `rebuild_mcq_rollups`.
+    """
+    organization = models.ForeignKey(
+        'trainers.Organization',
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    category = models.ForeignKey(
+        QuestionCategory,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    question = models.ForeignKey(
+        MultipleChoiceQuestion,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    day = models.DateField(help_text="Assessment date")
+    response_count = models.PositiveIntegerField(default=0)
+    points_sum = models.IntegerField(
+        default=0,
+        help_text="Sum of points earned by the responses"
+    )
+    risk_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Selected choices that contribute to risk"
+    )
+    
+    class Meta:
+        unique_together = ['organization', 'question', 'day']
+        indexes = [
+            models.Index(fields=['organization', 'day']),
+            models.Index(fields=['day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.question_id} @ {self.day}: {self.response_count}"
+
+
+class MCQChoiceDailyRollup(models.Model):
+    """
+    Selections of each MCQ choice per organization and assessment day.
+    
+    `points_sum` and `risk_count` use the choice's current points and risk
+    flag; editing a choice reprices its rows.
+    """
+    organization = models.ForeignKey(
+        'trainers.Organization',
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    category = models.ForeignKey(
+        QuestionCategory,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    question = models.ForeignKey(
+        MultipleChoiceQuestion,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    choice = models.ForeignKey(
+        QuestionChoice,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    day = models.DateField(help_text="Assessment date")
+    response_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Responses that selected this choice"
+    )
+    points_sum = models.IntegerField(default=0)
+    risk_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['organization', 'choice', 'day']
+        indexes = [
+            models.Index(fields=['organization', 'day']),
+            models.Index(fields=['day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.choice_id} @ {self.day}: {self.response_count}"
 
 
 # =============================================================================
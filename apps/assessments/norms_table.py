@@ -0,0 +1,396 @@
+"""
+Per-process cache of NormativeData for percentile rankings.
+
+`Assessment.get_percentile_rankings` used to query NormativeData once per
+score field. This module loads every row once into an immutable table keyed
+by (test_type, gender) with age bands sorted for bisect lookup, and computes
+percentiles with `numpy.interp` over the 10/25/50/75/90 knots.
+
+Like the standards index, the table is swapped atomically on rebuild and
+kept consistent across workers through a version stamp in the shared cache.
+It is invalidated by NormativeData saves/deletes and by the
+`load_normative_data` command.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from types import MappingProxyType
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+
+
+VERSION_CACHE_KEY = 'normative_data_table_version'
+
+VERSION_CHECK_INTERVAL = getattr(settings, 'NORMATIVE_DATA_CHECK_INTERVAL', 5)
+
+PERCENTILE_KNOTS = np.array([10.0, 25.0, 50.0, 75.0, 90.0])
+
+# Assessment fields ranked against normative data, keyed by field name
+RANKED_FIELDS = {
+    'overhead_squat_score': 'overhead_squat',
+    'push_up_score': 'push_up',
+    'farmer_carry_score': 'farmer_carry',
+    'toe_touch_score': 'toe_touch',
+    'shoulder_mobility_score': 'shoulder_mobility',
+    'harvard_step_test_score': 'harvard_step',
+    'overall_score': 'overall',
+    'strength_score': 'strength',
+    'mobility_score': 'mobility',
+    'balance_score': 'balance',
+    'cardio_score': 'cardio',
+}
+
+BALANCE_FIELDS = [
+    f'single_leg_balance_{side}_{condition}'
+    for side in ['right', 'left']
+    for condition in ['eyes_open', 'eyes_closed']
+]
+
+GENDER_MAP = {'male': 'M', 'female': 'F'}
+
+
+class NormBand:
+    """One NormativeData row reduced to what ranking needs."""
+
+    __slots__ = ('pk', 'test_type', 'gender', 'age_min', 'age_max', 'knots', 'source', 'year',
+                 'percentile_25', 'percentile_50', 'percentile_75')
+
+    def __init__(self, norm):
+        self.pk = norm.pk
+        self.test_type = norm.test_type
+        self.gender = norm.gender
+        self.age_min = norm.age_min
+        self.age_max = norm.age_max
+        self.knots = np.array([
+            norm.percentile_10, norm.percentile_25, norm.percentile_50,
+            norm.percentile_75, norm.percentile_90,
+        ], dtype=np.float64)
+        self.knots.setflags(write=False)
+        self.percentile_25 = norm.percentile_25
+        self.percentile_50 = norm.percentile_50
+        self.percentile_75 = norm.percentile_75
+        self.source = norm.source
+        self.year = norm.year
+
+    def percentiles(self, scores):
+        """Vectorized NormativeData.get_percentile."""
+        return np.interp(scores, self.knots, PERCENTILE_KNOTS)
+
+
+class NormsTable:
+    """
+    Immutable snapshot of all NormativeData rows.
+
+    `norm_version` is a digest of the row contents, so every worker that
+    loads the same data reports the same version.
+    """
+
+    __slots__ = ('version', 'norm_version', '_bands', '_age_mins')
+
+    def __init__(self, norms, version=None):
+        bands = {}
+        digest = hashlib.sha1()
+        for norm in sorted(norms, key=lambda n: (n.test_type, n.gender, n.age_min, n.pk)):
+            band = NormBand(norm)
+            bands.setdefault((band.test_type, band.gender), []).append(band)
+            digest.update(repr((
+                norm.test_type, norm.gender, norm.age_min, norm.age_max,
+                norm.percentile_10, norm.percentile_25, norm.percentile_50,
+                norm.percentile_75, norm.percentile_90, norm.source, norm.year,
+            )).encode())
+
+        self.version = version
+        self.norm_version = digest.hexdigest()[:12]
+        self._bands = MappingProxyType({key: tuple(rows) for key, rows in bands.items()})
+        self._age_mins = MappingProxyType({
+            key: tuple(band.age_min for band in rows) for key, rows in self._bands.items()
+        })
+
+    def _find(self, test_type, gender, age):
+        rows = self._bands.get((test_type, gender))
+        if not rows:
+            return None
+        hi = bisect_right(self._age_mins[(test_type, gender)], age)
+        for band in rows[:hi]:
+            if band.age_max >= age:
+                return band
+        return None
+
+    def find(self, test_type, gender, age):
+        """
+        Resolve the band for a test, gender and age.
+
+        Mirrors the former `gender__in=[gender, 'A']` query ordered by gender,
+        so 'A' rows sort ahead of 'F'/'M' rows.
+        """
+        candidates = [
+            band for band in (self._find(test_type, g, age) for g in sorted({gender, 'A'}))
+            if band is not None
+        ]
+        return candidates[0] if candidates else None
+
+    def bands_for(self, test_type, gender):
+        """All bands for a test type and gender (or 'A'), ordered by age_min."""
+        rows = list(self._bands.get((test_type, gender), ()))
+        if gender != 'A':
+            rows += self._bands.get((test_type, 'A'), ())
+        return sorted(rows, key=lambda band: (band.age_min, band.pk))
+
+    def percentile(self, test_type, gender, age, score):
+        """Percentile for a single score, or None without normative data."""
+        band = self.find(test_type, gender, age)
+        if band is None:
+            return None
+        return float(band.percentiles(score))
+
+
+_table = None
+_last_version_check = 0.0
+_lock = threading.Lock()
+
+
+def _shared_version():
+    try:
+        return cache.get(VERSION_CACHE_KEY)
+    except Exception:
+        return None
+
+
+def build_table(version=None):
+    """Load all NormativeData rows into a new NormsTable."""
+    from .models import NormativeData
+
+    return NormsTable(list(NormativeData.objects.all()), version=version)
+
+
+def get_table():
+    """
+    Return the current table, reloading it when missing or out of date.
+
+    Returns None if the normative data table cannot be read.
+    """
+    global _table, _last_version_check
+
+    table = _table
+    now = time.monotonic()
+
+    if table is not None and now - _last_version_check < VERSION_CHECK_INTERVAL:
+        return table
+
+    shared = _shared_version()
+    _last_version_check = now
+    if table is not None and (shared is None or shared == table.version):
+        return table
+
+    with _lock:
+        if _table is not None and _table is not table:
+            return _table
+
+        if shared is None:
+            shared = uuid.uuid4().hex
+            try:
+                cache.add(VERSION_CACHE_KEY, shared, None)
+                shared = cache.get(VERSION_CACHE_KEY) or shared
+            except Exception:
+                pass
+
+        try:
+            _table = build_table(version=shared)
+        except DatabaseError:
+            return None
+        return _table
+
+
+def reset():
+    """Drop this process's table so the next read reloads it."""
+    global _table, _last_version_check
+    with _lock:
+        _table = None
+        _last_version_check = 0.0
+
+
+def invalidate():
+    """
+    Mark the table stale here immediately and in other workers after commit.
+    """
+    from django.db import transaction
+
+    reset()
+
+    def _publish():
+        try:
+            cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        except Exception:
+            pass
+        reset()
+
+    transaction.on_commit(_publish)
+
+
+def _ranking(score, percentile, band):
+    if band is None:
+        return {
+            'score': score,
+            'percentile': None,
+            'upper_percentile': None,
+            'source': 'No normative data available',
+            'year': None
+        }
+    percentile = float(percentile)
+    return {
+        'score': score,
+        'percentile': round(percentile, 1),
+        'upper_percentile': round(100 - percentile, 1),
+        'source': band.source,
+        'year': band.year
+    }
+
+
+def _ranking_inputs(assessment):
+    """Return (age, gender) used to look up norms for an assessment."""
+    client = assessment.client
+    age = assessment._calculate_client_age()
+    gender = GENDER_MAP.get(client.gender, 'A') if client else 'A'
+    return age, gender
+
+
+def rank_assessments(assessments, table=None):
+    """
+    Compute percentile rankings for many assessments in one pass.
+
+    Scores are grouped by normative band and interpolated with one
+    `numpy.interp` call per band.
+
+    Args:
+        assessments: Iterable of Assessment instances (ideally with
+            select_related('client'))
+        table: Optional NormsTable to use (defaults to the cached table)
+
+    Returns:
+        Dict mapping assessment pk to the same rankings dict that
+        Assessment.get_percentile_rankings returns.
+    """
+    assessments = list(assessments)
+    results = [{} for _ in assessments]
+    table = table or get_table()
+    if table is None:
+        return {assessment.pk: {} for assessment in assessments}
+
+    # band pk -> (band, [(position, test_type, score)])
+    groups = {}
+    unmatched = []
+
+    for position, assessment in enumerate(assessments):
+        age, gender = _ranking_inputs(assessment)
+        if not age:
+            continue
+
+        entries = []
+        for field_name, test_type in RANKED_FIELDS.items():
+            score = getattr(assessment, field_name, None)
+            if score is not None:
+                entries.append((test_type, score))
+
+        balance_scores = [
+            value for value in (getattr(assessment, field, None) for field in BALANCE_FIELDS)
+            if value is not None
+        ]
+        if balance_scores:
+            entries.append(('single_leg_balance', sum(balance_scores) / len(balance_scores)))
+
+        for test_type, score in entries:
+            band = table.find(test_type, gender, age)
+            if band is None:
+                # Balance averages without norms are omitted, like the original
+                if test_type != 'single_leg_balance':
+                    unmatched.append((position, test_type, score))
+                continue
+            groups.setdefault(band.pk, (band, []))[1].append((position, test_type, score))
+
+    for band, members in groups.values():
+        percentiles = band.percentiles(np.array([score for _, _, score in members], dtype=np.float64))
+        for (position, test_type, score), percentile in zip(members, percentiles):
+            if test_type == 'single_leg_balance':
+                score = round(score, 1)
+            results[position][test_type] = _ranking(score, percentile, band)
+
+    for position, test_type, score in unmatched:
+        results[position][test_type] = _ranking(score, None, None)
+
+    # Keep the field order of the original implementation
+    order = list(RANKED_FIELDS.values()) + ['single_leg_balance']
+    return {
+        assessment.pk: {
+            test_type: rankings[test_type] for test_type in order if test_type in rankings
+        }
+        for assessment, rankings in zip(assessments, results)
+    }
+
+
+def rank_assessment(assessment):
+    """Percentile rankings for one assessment."""
+    return rank_assessments([assessment])[assessment.pk]
+
+
+def performance_age(assessment, table=None):
+    """
+    Performance age for an assessment, computed against the normative table.
+
+    Returns the age at which the client's overall score would be average,
+    with the same rules as the original per-query implementation.
+    """
+    if not assessment.overall_score:
+        return None
+
+    chronological_age, gender = _ranking_inputs(assessment)
+    if not chronological_age:
+        return None
+
+    table = table or get_table()
+    if table is None:
+        return None
+
+    bands = table.bands_for('overall', gender)
+    if not bands:
+        return None
+
+    overall_score = assessment.overall_score
+    performance_age = None
+
+    for band in bands:
+        # Check if the score is close to the 50th percentile for this age group
+        if abs(overall_score - band.percentile_50) < 5:  # Within 5 points
+            performance_age = (band.age_min + band.age_max) / 2
+            break
+
+        # If score is between percentiles, this age group is a match
+        if band.percentile_25 <= overall_score <= band.percentile_75:
+            performance_age = (band.age_min + band.age_max) / 2
+            break
+
+    # If not found in middle ranges, check extremes
+    if performance_age is None:
+        youngest = bands[0]
+        if overall_score > youngest.percentile_75:
+            performance_age = youngest.age_min
+        else:
+            oldest = bands[-1]
+            if overall_score < oldest.percentile_25:
+                performance_age = oldest.age_max
+
+    if performance_age is not None:
+        age_difference = chronological_age - performance_age
+        return {
+            'chronological_age': chronological_age,
+            'performance_age': round(performance_age, 1),
+            'age_difference': round(age_difference, 1),
+            'interpretation': assessment._interpret_age_difference(age_difference)
+        }
+
+    return None
@@ -0,0 +1,287 @@
+"""
+Dependency index from scoring reference data to the assessments it affects.
+
+Stored scores depend on a handful of TestStandard rows (resolved through the
+fallback chain in `standards_index`) and on the NormativeData bands used for
+the percentile/performance-age snapshot. This module describes those
+dependencies in one place so that:
+
+- the scoring fingerprint only covers the rows an assessment actually uses,
+  and
+- a changed standard or normative row can be mapped back to the cohort of
+  assessments (test type, gender, age range, variation, conditions) whose
+  scores may change.
+
+Affected assessments are queued for rescoring by clearing their
+`scoring_fingerprint`; `recalculate_scores --pending` then rescores exactly
+those rows through the chunked bulk path.
+"""
+
+from collections import namedtuple
+
+from django.db.models import Count, Q
+
+from .norms_table import GENDER_MAP, RANKED_FIELDS
+
+
+# Age range used by the scoring functions when they clamp client ages
+SCORING_AGE_MAX = 120
+
+# Standards consulted for every assessment, regardless of the client.
+# Balance is scored with gender 'A' at age 30 for both eye conditions.
+FIXED_STANDARD_LOOKUPS = [
+    ('balance', 'A', 30, None, 'eyes_open'),
+    ('balance', 'A', 30, None, 'eyes_closed'),
+]
+
+# Test types ranked against normative data, in snapshot order
+NORM_TEST_TYPES = list(RANKED_FIELDS.values()) + ['single_leg_balance']
+
+StandardState = namedtuple('StandardState', [
+    'test_type', 'gender', 'age_min', 'age_max', 'variation_type', 'conditions',
+    'excellent_threshold', 'good_threshold', 'average_threshold',
+    'needs_improvement_threshold', 'is_active',
+])
+
+NormState = namedtuple('NormState', [
+    'test_type', 'gender', 'age_min', 'age_max',
+    'percentile_10', 'percentile_25', 'percentile_50', 'percentile_75',
+    'percentile_90', 'source', 'year',
+])
+
+
+def standard_state(standard):
+    """Capture the fields of a TestStandard that influence scoring."""
+    return StandardState(*(getattr(standard, field) for field in StandardState._fields))
+
+
+def norm_state(norm):
+    """Capture the fields of a NormativeData row that influence snapshots."""
+    return NormState(*(getattr(norm, field) for field in NormState._fields))
+
+
+def scoring_gender(client_gender):
+    """Standard gender code used when scoring push-ups for a client gender."""
+    return 'F' if (client_gender or '').title() == 'Female' else 'M'
+
+
+def _standard_key(standard):
+    if standard is None:
+        return None
+    return [
+        standard.pk, standard.excellent_threshold, standard.good_threshold,
+        standard.average_threshold, standard.needs_improvement_threshold,
+    ]
+
+
+def standard_lookups(assessment):
+    """
+    The (test_type, gender, age, variation_type, conditions) lookups that
+    scoring performs for an assessment.
+    """
+    lookups = []
+    client = assessment.client if assessment.client_id else None
+    age = assessment._calculate_client_age()
+
+    if (not assessment.push_up_score_manual_override and assessment.push_up_reps is not None
+            and client and client.gender and age is not None):
+        lookups.append((
+            'push_up', scoring_gender(client.gender), max(0, min(SCORING_AGE_MAX, age)),
+            assessment.push_up_type or 'standard', None,
+        ))
+
+    return lookups + FIXED_STANDARD_LOOKUPS
+
+
+def standard_keys(assessment, index):
+    """Identity and thresholds of every standard the assessment resolves."""
+    if index is None:
+        return None
+    return [_standard_key(index.lookup(*lookup)) for lookup in standard_lookups(assessment)]
+
+
+def norm_keys(assessment, table):
+    """Identity and knots of every normative band the assessment's snapshot uses."""
+    if table is None:
+        return None
+
+    client = assessment.client if assessment.client_id else None
+    age = assessment._calculate_client_age()
+    if not age:
+        return []
+    gender = GENDER_MAP.get(client.gender, 'A') if client else 'A'
+
+    bands = [table.find(test_type, gender, age) for test_type in NORM_TEST_TYPES]
+    # Performance age scans every overall band for the gender
+    bands += table.bands_for('overall', gender)
+    return [
+        [band.pk, band.knots.tolist(), band.source, band.year] if band else None
+        for band in bands
+    ]
+
+
+def _age_q(age_min, age_max, field='client__age', clamp=None):
+    if clamp is not None and age_max >= clamp:
+        return Q(**{f'{field}__gte': age_min})
+    return Q(**{f'{field}__gte': age_min, f'{field}__lte': age_max})
+
+
+def _could_resolve(state, gender, variation_type, conditions):
+    """
+    Whether `state` can be returned by the fallback chain for a lookup.
+
+    The chain tries the exact key, then gender 'A' with the same
+    variation/conditions, then either gender without variation/conditions.
+    """
+    if state.gender not in (gender, 'A'):
+        return False
+    if state.variation_type == variation_type and state.conditions == conditions:
+        return True
+    return state.variation_type is None and state.conditions is None
+
+
+def standard_cohort(state):
+    """
+    Q filter over Assessment for the rows whose scores may use a standard.
+
+    Args:
+        state: StandardState of the standard (active or not)
+
+    Returns:
+        Q object, or None when no assessment can resolve the standard.
+    """
+    for test_type, gender, age, variation_type, conditions in FIXED_STANDARD_LOOKUPS:
+        if (state.test_type == test_type and state.age_min <= age <= state.age_max
+                and _could_resolve(state, gender, variation_type, conditions)):
+            return Q()
+
+    if state.test_type != 'push_up' or state.conditions is not None:
+        return None
+
+    q = Q(push_up_score_manual_override=False, push_up_reps__isnull=False)
+    q &= _age_q(state.age_min, state.age_max, clamp=SCORING_AGE_MAX)
+
+    if state.gender == 'F':
+        q &= Q(client__gender__iexact='female')
+    elif state.gender == 'M':
+        q &= ~Q(client__gender__iexact='female')
+
+    if state.variation_type == 'standard':
+        # Assessments without a push-up type are scored as 'standard'
+        q &= Q(push_up_type='standard') | Q(push_up_type__isnull=True) | Q(push_up_type='')
+    elif state.variation_type is not None:
+        q &= Q(push_up_type=state.variation_type)
+
+    return q
+
+
+def norm_cohort(state):
+    """
+    Q filter over Assessment for the rows whose snapshot may use a norm row.
+
+    Overall bands feed performance age at every age, so they affect the
+    whole gender cohort.
+    """
+    q = Q()
+    if state.test_type != 'overall':
+        q &= _age_q(state.age_min, state.age_max)
+    else:
+        q &= Q(client__age__isnull=False)
+
+    client_genders = {code: gender for gender, code in GENDER_MAP.items()}
+    if state.gender in client_genders:
+        q &= Q(client__gender=client_genders[state.gender])
+
+    return q
+
+
+def affected_assessments(standards=(), norms=()):
+    """
+    Assessments affected by the given standards and/or normative rows.
+
+    Args:
+        standards: Iterable of TestStandard instances or StandardState tuples
+        norms: Iterable of NormativeData instances or NormState tuples
+
+    Returns:
+        Assessment queryset (empty if nothing is affected)
+    """
+    from .models import Assessment
+
+    filters = []
+    for standard in standards:
+        state = standard if isinstance(standard, StandardState) else standard_state(standard)
+        filters.append(standard_cohort(state))
+    for norm in norms:
+        state = norm if isinstance(norm, NormState) else norm_state(norm)
+        filters.append(norm_cohort(state))
+
+    filters = [q for q in filters if q is not None]
+    if not filters:
+        return Assessment.objects.none()
+
+    combined = filters[0]
+    for q in filters[1:]:
+        combined |= q
+    return Assessment.objects.filter(combined)
+
+
+def impact_report(queryset):
+    """
+    Summarize how many assessments would change, per organization.
+
+    Returns:
+        Dict with 'assessments' (total count) and 'organizations', a list of
+        (organization name, count) pairs ordered by count.
+    """
+    rows = (
+        queryset.order_by()
+        .values('trainer__organization__name')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'trainer__organization__name')
+    )
+    organizations = [
+        (row['trainer__organization__name'] or '소속 없음', row['count']) for row in rows
+    ]
+    return {
+        'assessments': sum(count for _, count in organizations),
+        'organizations': organizations,
+    }
+
+
+def enqueue(queryset):
+    """
+    Queue assessments for rescoring by clearing their scoring fingerprint.
+
+    Returns:
+        Number of assessments queued
+    """
+    return queryset.order_by().update(scoring_fingerprint='')
+
+
+def enqueue_changed(previous, current):
+    """
+    Queue the cohorts of a changed standard or normative row.
+
+    Args:
+        previous: State before the change (None for a new row)
+        current: State after the change (None for a deleted row)
+
+    Returns:
+        Number of assessments queued
+    """
+    if previous == current:
+        return 0
+
+    states = [state for state in (previous, current) if state is not None]
+    # Inactive standards are never resolved, so flipping thresholds on a
+    # standard that stays inactive cannot change any score
+    if states and isinstance(states[0], StandardState):
+        states = [state for state in states if state.is_active]
+        standards, norms = states, ()
+    else:
+        standards, norms = (), states
+
+    if not states:
+        return 0
+    return enqueue(affected_assessments(standards=standards, norms=norms))
@@ -1,7 +1,6 @@
 # assessment_scoring.py - Functions for scoring and evaluating fitness tests with improved validation
 
 from typing import Dict, Tuple, Any, Union, Optional
-from django.core.cache import cache
 
 # Scoring threshold constants
 PUSHUP_THRESHOLDS = {
@@ -58,7 +57,10 @@ STEP_TEST_THRESHOLDS = {
 def get_test_standard(test_type: str, gender: str = 'A', age: int = 30, 
                      variation_type: str = None, conditions: str = None):
     """
-    Get test standard from database with caching and fallback to hardcoded values.
+    Get test standard from the in-memory standards index.
+    
+    The index resolves the same fallback chain as TestStandard.get_standard
+    without issuing queries; see apps.assessments.standards_index.
     
     Args:
         test_type: Type of test (push_up, farmer_carry, etc.)
@@ -72,32 +74,18 @@ def get_test_standard(test_type: str, gender: str = 'A', age: int = 30,
     """
     # Import here to avoid circular imports
     try:
-        from .models import TestStandard
+        from . import standards_index
     except ImportError:
         return None
     
-    # Create cache key
-    cache_key = f"test_standard_{test_type}_{gender}_{age}_{variation_type}_{conditions}"
-    
-    # Try to get from cache first
-    standard = cache.get(cache_key)
-    if standard is not None:
-        return standard
-    
-    # Get from database
     try:
-        standard = TestStandard.get_standard(
+        return standards_index.lookup(
             test_type=test_type,
             gender=gender,
             age=age,
             variation_type=variation_type,
             conditions=conditions
         )
-        
-        # Cache for 1 hour
-        cache.set(cache_key, standard, 3600)
-        return standard
-        
     except Exception:
         # Database error or model not available - return None for fallback
         return None
@@ -156,8 +144,8 @@ def _get_fallback_score(test_type: str, value: float, gender: str = 'A',
             return 1
 
 
-def _fallback_pushup_score(gender: str, age: int, reps: int, push_up_type: str) -> int:
-    """Fallback push-up scoring using hardcoded thresholds."""
+def _fallback_pushup_thresholds(gender: str, age: int) -> Dict[str, int]:
+    """Find the hardcoded push-up thresholds for a gender and age."""
     # Convert gender format
     gender_map = {'M': 'Male', 'F': 'Female', 'A': 'Male'}
     gender_key = gender_map.get(gender, gender)
@@ -174,7 +162,12 @@ def _fallback_pushup_score(gender: str, age: int, reps: int, push_up_type: str)
     if age_range is None:
         age_range = max(thresholds_dict.keys())
     
-    thresholds = thresholds_dict[age_range]
+    return thresholds_dict[age_range]
+
+
+def _fallback_pushup_score(gender: str, age: int, reps: int, push_up_type: str) -> int:
+    """Fallback push-up scoring using hardcoded thresholds."""
+    thresholds = _fallback_pushup_thresholds(gender, age)
     
     # Calculate base score
     if reps >= thresholds['excellent']:
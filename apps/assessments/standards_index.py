@@ -0,0 +1,238 @@
+"""
+In-memory lookup index for TestStandard rows.
+
+`TestStandard.get_standard` walks a fallback chain of up to three filtered
+queries per call. Scoring a single assessment resolves a standard for every
+test, so a cold cache used to cost dozens of queries per save.
+
+This module compiles every active TestStandard into an immutable index
+keyed by (test_type, gender, variation_type, conditions), with the age
+ranges of each key sorted for bisect lookup. `lookup()` resolves the same
+fallback chain as `TestStandard.get_standard` without touching the database.
+
+The index is swapped atomically: a rebuild compiles a complete new index and
+then replaces the module-level reference in one assignment, so concurrent
+readers always see either the old or the new snapshot, never a mix.
+
+Workers (e.g. gunicorn processes) stay consistent through a version stamp in
+the shared cache. Any change to the standards writes a new stamp; a worker
+whose local stamp differs discards its index and rebuilds on the next lookup.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+
+
+VERSION_CACHE_KEY = 'test_standard_index_version'
+
+# How often (in seconds) a worker compares its local stamp with the shared one.
+# Lookups in between are served from memory without a cache round-trip.
+VERSION_CHECK_INTERVAL = getattr(settings, 'TEST_STANDARD_INDEX_CHECK_INTERVAL', 5)
+
+
+class StandardIndex:
+    """
+    Immutable snapshot of active TestStandard rows.
+
+    Each key maps to a tuple of standards ordered by (age_min, pk), which is
+    the order `.first()` returns them in under the model's Meta ordering.
+    `content_version` is a digest of the compiled rows.
+    """
+
+    __slots__ = ('version', 'content_version', '_buckets', '_age_mins', '_disjoint')
+
+    def __init__(self, standards, version=None):
+        buckets = {}
+        digest = hashlib.sha1()
+        for standard in sorted(standards, key=lambda s: s.pk or 0):
+            key = (standard.test_type, standard.gender,
+                   standard.variation_type, standard.conditions)
+            buckets.setdefault(key, []).append(standard)
+            digest.update(repr((
+                standard.pk, key, standard.age_min, standard.age_max,
+                standard.excellent_threshold, standard.good_threshold,
+                standard.average_threshold, standard.needs_improvement_threshold,
+            )).encode())
+
+        age_mins = {}
+        disjoint = {}
+        for key, rows in buckets.items():
+            rows.sort(key=lambda s: (s.age_min, s.pk))
+            buckets[key] = tuple(rows)
+            age_mins[key] = tuple(s.age_min for s in rows)
+            # Ranges that never overlap can be resolved with a single bisect;
+            # overlapping ranges need the first covering row in order.
+            disjoint[key] = all(
+                prev.age_max < cur.age_min for prev, cur in zip(rows, rows[1:])
+            )
+
+        self.version = version
+        # Digest of the compiled rows; identical in every worker with the same data
+        self.content_version = digest.hexdigest()[:12]
+        self._buckets = MappingProxyType(buckets)
+        self._age_mins = MappingProxyType(age_mins)
+        self._disjoint = MappingProxyType(disjoint)
+
+    def __len__(self):
+        return sum(len(rows) for rows in self._buckets.values())
+
+    def _find(self, key, age):
+        """Return the first standard under `key` whose range covers `age`."""
+        rows = self._buckets.get(key)
+        if not rows:
+            return None
+
+        hi = bisect_right(self._age_mins[key], age)
+        if hi == 0:
+            return None
+
+        if self._disjoint[key]:
+            candidate = rows[hi - 1]
+            return candidate if candidate.age_max >= age else None
+
+        for candidate in rows[:hi]:
+            if candidate.age_max >= age:
+                return candidate
+        return None
+
+    def lookup(self, test_type, gender='A', age=30, variation_type=None, conditions=None):
+        """
+        Resolve a standard using the same fallback chain as TestStandard.get_standard.
+
+        Args:
+            test_type: Type of test
+            gender: Gender ('M', 'F', or 'A')
+            age: Age in years
+            variation_type: Optional variation type
+            conditions: Optional conditions
+
+        Returns:
+            TestStandard instance or None
+        """
+        # Exact match
+        standard = self._find((test_type, gender, variation_type, conditions), age)
+
+        # Same variation/conditions for gender='A'
+        if standard is None and gender != 'A':
+            standard = self._find((test_type, 'A', variation_type, conditions), age)
+
+        # Without variation/conditions. get_standard orders this step by
+        # gender alone, so 'A' sorts ahead of 'F'/'M' and ties fall back to pk.
+        if standard is None:
+            candidates = [
+                found for found in (
+                    self._find((test_type, g, None, None), age)
+                    for g in {gender, 'A'}
+                ) if found is not None
+            ]
+            if candidates:
+                standard = min(candidates, key=lambda s: (s.gender, s.pk))
+
+        return standard
+
+
+_index = None
+_last_version_check = 0.0
+_lock = threading.Lock()
+
+
+def _shared_version():
+    try:
+        return cache.get(VERSION_CACHE_KEY)
+    except Exception:
+        return None
+
+
+def build_index(version=None):
+    """Compile a new StandardIndex from all active TestStandard rows."""
+    from .models import TestStandard
+
+    standards = list(TestStandard.objects.filter(is_active=True))
+    return StandardIndex(standards, version=version)
+
+
+def get_index():
+    """
+    Return the current index, rebuilding it when missing or out of date.
+
+    Returns None if the standards table cannot be read (e.g. before
+    migrations have run), so callers can fall back to hardcoded thresholds.
+    """
+    global _index, _last_version_check
+
+    index = _index
+    now = time.monotonic()
+
+    if index is not None and now - _last_version_check < VERSION_CHECK_INTERVAL:
+        return index
+
+    shared = _shared_version()
+    _last_version_check = now
+    if index is not None and (shared is None or shared == index.version):
+        return index
+
+    with _lock:
+        # Another thread may have rebuilt while we waited for the lock
+        if _index is not None and _index is not index:
+            return _index
+
+        if shared is None:
+            shared = uuid.uuid4().hex
+            try:
+                cache.add(VERSION_CACHE_KEY, shared, None)
+                shared = cache.get(VERSION_CACHE_KEY) or shared
+            except Exception:
+                pass
+
+        try:
+            _index = build_index(version=shared)
+        except DatabaseError:
+            return None
+        return _index
+
+
+def lookup(test_type, gender='A', age=30, variation_type=None, conditions=None):
+    """Resolve a TestStandard from the in-memory index."""
+    index = get_index()
+    if index is None:
+        return None
+    return index.lookup(test_type, gender, age, variation_type, conditions)
+
+
+def reset():
+    """Drop this process's index so the next lookup rebuilds it."""
+    global _index, _last_version_check
+    with _lock:
+        _index = None
+        _last_version_check = 0.0
+
+
+def invalidate():
+    """
+    Mark the index stale in this process and, once the current transaction
+    commits, in every other worker.
+
+    The local index is dropped immediately so this connection sees its own
+    uncommitted changes. The shared stamp is only written after commit, so
+    other workers never rebuild from data they cannot see yet.
+    """
+    from django.db import transaction
+
+    reset()
+
+    def _publish():
+        try:
+            cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        except Exception:
+            pass
+        reset()
+
+    transaction.on_commit(_publish)
@@ -0,0 +1,161 @@
+"""
+Tests for vectorized batch scoring.
+
+The batch functions must return exactly the same values as the scalar
+scoring functions, so comparisons here use equality rather than tolerances.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from apps.assessments.batch_scoring import (
+    batch_calculate_scores,
+    batch_category_scores,
+    batch_farmers_carry_scores,
+    batch_pushup_scores,
+    batch_single_leg_balance_scores,
+    batch_step_test_scores,
+    batch_temperature_adjustment,
+)
+from apps.assessments.models import TestStandard
+from apps.assessments.scoring import (
+    apply_temperature_adjustment,
+    calculate_category_scores,
+    calculate_farmers_carry_score,
+    calculate_pushup_score,
+    calculate_single_leg_balance_score,
+    calculate_step_test_score,
+)
+
+
+N = 400
+
+
+@pytest.fixture
+def columns():
+    rng = random.Random(1234)
+    return {
+        'gender': [rng.choice(['Male', 'Female', '남성', '여성', 'Other']) for _ in range(N)],
+        'age': [rng.randint(-5, 130) for _ in range(N)],
+        'reps': [rng.choice([rng.randint(-3, 60), rng.uniform(0, 60)]) for _ in range(N)],
+        'push_up_type': [rng.choice(['standard', 'modified', 'wall', None]) for _ in range(N)],
+        'balance': [[rng.uniform(-5, 130) for _ in range(N)] for _ in range(4)],
+        'hr': [[rng.randint(20, 240) for _ in range(N)] for _ in range(3)],
+        'time': [rng.uniform(0, 90) for _ in range(N)],
+        'bwp': [rng.choice([None, 0, rng.uniform(10, 200)]) for _ in range(N)],
+        'temperature': [rng.choice([None, rng.uniform(-10, 45)]) for _ in range(N)],
+        'environment': [rng.choice(['indoor', 'outdoor', None]) for _ in range(N)],
+        'toe_touch_score': [rng.randint(1, 4) for _ in range(N)],
+        'shoulder_mobility_score': [rng.randint(0, 3) for _ in range(N)],
+        'overhead_squat_score': [rng.randint(0, 3) for _ in range(N)],
+        'farmers_carry_score': [rng.uniform(1, 4) for _ in range(N)],
+    }
+
+
+@pytest.fixture(params=['fallback', 'standards'])
+def standards(request):
+    """Run every comparison against hardcoded thresholds and DB standards"""
+    if request.param == 'standards':
+        base = {'metric_type': 'repetitions', 'name': 'std'}
+        TestStandard.objects.create(test_type='push_up', gender='M', age_min=0, age_max=39,
+                                    excellent_threshold=35.5, good_threshold=25,
+                                    average_threshold=15, **base)
+        TestStandard.objects.create(test_type='push_up', gender='A', age_min=40, age_max=120,
+                                    variation_type='modified', excellent_threshold=20,
+                                    good_threshold=12, average_threshold=6, **base)
+        TestStandard.objects.create(test_type='balance', gender='A', age_min=0, age_max=120,
+                                    conditions='eyes_open', excellent_threshold=50,
+                                    good_threshold=35, average_threshold=12, **base)
+        TestStandard.objects.create(test_type='farmer_carry', gender='F', age_min=0, age_max=120,
+                                    excellent_threshold=50, good_threshold=35,
+                                    average_threshold=25, **base)
+    return request.param
+
+
+def test_pushup_scores_match_scalar(columns, standards):
+    batch = batch_pushup_scores(columns['gender'], columns['age'], columns['reps'],
+                                columns['push_up_type'])
+    expected = [
+        calculate_pushup_score(g, a, r, t)
+        for g, a, r, t in zip(columns['gender'], columns['age'], columns['reps'],
+                              columns['push_up_type'])
+    ]
+    assert batch.tolist() == expected
+
+
+def test_balance_scores_match_scalar(columns, standards):
+    batch = batch_single_leg_balance_scores(*columns['balance'])
+    expected = [calculate_single_leg_balance_score(*row) for row in zip(*columns['balance'])]
+    assert batch.tolist() == expected
+
+
+def test_farmers_carry_scores_match_scalar(columns, standards):
+    batch = batch_farmers_carry_scores(columns['gender'], columns['time'], columns['bwp'])
+    expected = [
+        calculate_farmers_carry_score(g, 20, 30, t, b)
+        for g, t, b in zip(columns['gender'], columns['time'], columns['bwp'])
+    ]
+    assert batch.tolist() == expected
+
+
+def test_step_test_scores_match_scalar(columns):
+    scores, pfi = batch_step_test_scores(*columns['hr'])
+    expected = [calculate_step_test_score(*row) for row in zip(*columns['hr'])]
+    assert scores.tolist() == [score for score, _ in expected]
+    assert pfi.tolist() == [value for _, value in expected]
+
+
+def test_temperature_adjustment_matches_scalar(columns):
+    base = np.linspace(0, 100, N)
+    batch = batch_temperature_adjustment(base, columns['temperature'], columns['environment'])
+    expected = [
+        apply_temperature_adjustment(s, t, e)
+        for s, t, e in zip(base.tolist(), columns['temperature'], columns['environment'])
+    ]
+    assert batch.tolist() == expected
+
+
+def test_category_scores_match_scalar(columns, standards):
+    data = {
+        'toe_touch_score': columns['toe_touch_score'],
+        'shoulder_mobility_score': columns['shoulder_mobility_score'],
+        'overhead_squat_score': columns['overhead_squat_score'],
+        'farmers_carry_score': columns['farmers_carry_score'],
+        'single_leg_balance_right_open': columns['balance'][0],
+        'single_leg_balance_left_open': columns['balance'][1],
+        'single_leg_balance_right_closed': columns['balance'][2],
+        'single_leg_balance_left_closed': columns['balance'][3],
+        'step_test_hr1': columns['hr'][0],
+        'step_test_hr2': columns['hr'][1],
+        'step_test_hr3': columns['hr'][2],
+    }
+    batch = batch_calculate_scores(
+        data, columns['gender'], columns['age'],
+        push_up_reps=columns['reps'], push_up_type=columns['push_up_type'],
+        temperature=columns['temperature'], test_environment=columns['environment']
+    )
+
+    for i in range(N):
+        row = {key: values[i] for key, values in data.items()}
+        row['push_up_score'] = calculate_pushup_score(
+            columns['gender'][i], columns['age'][i], columns['reps'][i],
+            columns['push_up_type'][i]
+        )
+        expected = calculate_category_scores(
+            row, {'gender': columns['gender'][i], 'age': columns['age'][i]}
+        )
+        expected['overall_score'] = apply_temperature_adjustment(
+            expected['overall_score'], columns['temperature'][i], columns['environment'][i]
+        )
+        for key, value in expected.items():
+            assert batch[key][i] == value, (key, i)
+
+
+def test_category_scores_use_scalar_defaults():
+    """Missing columns fall back to the same defaults as the scalar path"""
+    batch = batch_category_scores({'push_up_score': [3, 4]})
+    expected = calculate_category_scores({'push_up_score': 3}, {'gender': 'Male', 'age': 30})
+    for key, value in expected.items():
+        assert batch[key][0] == value
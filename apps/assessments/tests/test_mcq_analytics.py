@@ -0,0 +1,223 @@
+"""
+Tests for the grouped-query MCQ analytics behind the analytics API.
+"""
+
+import os
+import time
+
+import pytest
+from django.urls import reverse
+from django.utils.text import slugify
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.assessments import mcq_rollups
+from apps.assessments.factories import (
+    AssessmentFactory, MultipleChoiceQuestionFactory,
+    QuestionCategoryFactory, QuestionChoiceFactory, QuestionResponseFactory,
+)
+from apps.assessments.mcq_scoring_module import mcq_analytics
+from apps.assessments.models import Assessment, QuestionCategory, QuestionResponse
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+def reference_analytics(organization):
+    """The original per-category / per-assessment loops, kept as the oracle."""
+    assessments = Assessment.objects.filter(trainer__organization=organization)
+    scored = assessments.exclude(comprehensive_score__isnull=True)
+    categories = QuestionCategory.objects.filter(is_active=True)
+
+    scores = []
+    for category in categories:
+        field = mcq_analytics.CATEGORY_SCORE_FIELDS.get(slugify(category.name))
+        values = [getattr(a, field) for a in scored if getattr(a, field) is not None] if field else []
+        scores.append({
+            'category': category.name_ko,
+            'slug': slugify(category.name),
+            'average_score': round(sum(values) / len(values), 1) if values else 0,
+            'assessment_count': scored.count(),
+        })
+
+    responses = list(QuestionResponse.objects.filter(
+        assessment__trainer__organization=organization
+    ).prefetch_related('selected_choices'))
+    counts = {}
+    for response in responses:
+        for choice in response.selected_choices.all():
+            if choice.contributes_to_risk:
+                label = choice.choice_text_ko or choice.choice_text
+                counts[label] = counts.get(label, 0) + 1
+    risks = [
+        {'risk_factor': label, 'count': count,
+         'percentage': round(count / len(responses) * 100, 1)}
+        for label, count in sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:10]
+    ]
+
+    completion = []
+    for category in categories:
+        total = category.questions.filter(is_active=True).count()
+        if total == 0:
+            continue
+        complete = sum(
+            1 for a in assessments
+            if a.question_responses.filter(question__category=category).count() == total
+        )
+        completion.append({
+            'category': category.name_ko,
+            'slug': slugify(category.name),
+            'total_questions': total,
+            'completion_rate': round(complete / assessments.count() * 100, 1) if assessments.count() else 0,
+            'complete_count': complete,
+            'total_assessments': assessments.count(),
+        })
+    return scores, risks, completion
+
+
+@pytest.fixture
+def organization_data():
+    trainer = TrainerFactory()
+    knowledge = QuestionCategoryFactory(name='Knowledge', name_ko='지식', order=1)
+    lifestyle = QuestionCategoryFactory(name='Lifestyle', name_ko='생활습관', order=2)
+    QuestionCategoryFactory(name='Readiness', name_ko='준비도', order=3)
+
+    questions = {knowledge: [], lifestyle: []}
+    for category in questions:
+        for order in range(3):
+            question = MultipleChoiceQuestionFactory(category=category, order=order)
+            QuestionChoiceFactory(question=question, choice_text='Safe', choice_text_ko='안전', points=10)
+            QuestionChoiceFactory(
+                question=question, choice_text='Smoker', choice_text_ko='흡연' if order else '',
+                contributes_to_risk=True, points=0,
+            )
+            questions[category].append(question)
+    # Retired questions do not count towards the required total
+    MultipleChoiceQuestionFactory(category=knowledge, is_active=False)
+
+    scores = [(80.0, 60.0, 70.0), (90.0, None, 50.0), (None, None, None), (70.0, 40.0, 30.0)]
+    answered = [(3, 3), (3, 1), (0, 0), (2, 3)]
+    for (k, l, r), (k_count, l_count) in zip(scores, answered):
+        assessment = AssessmentFactory(
+            client=ClientFactory(trainer=trainer), trainer=trainer,
+        )
+        Assessment.objects.filter(pk=assessment.pk).update(
+            knowledge_score=k, lifestyle_score=l, readiness_score=r,
+            comprehensive_score=None if k is None else 75.0,
+        )
+        for category, count in ((knowledge, k_count), (lifestyle, l_count)):
+            for index, question in enumerate(questions[category][:count]):
+                choice = list(question.choices.all())[index % 2]
+                QuestionResponseFactory(assessment=assessment, question=question, selected_choices=[choice])
+
+    # Another organization's data is never counted
+    other = TrainerFactory()
+    foreign = AssessmentFactory(client=ClientFactory(trainer=other), trainer=other)
+    for question in questions[knowledge]:
+        QuestionResponseFactory(
+            assessment=foreign, question=question, selected_choices=list(question.choices.all())
+        )
+    return trainer.organization
+
+
+@pytest.mark.django_db
+class TestMCQAnalytics:
+    def test_matches_reference_implementation(self, organization_data):
+        scores, risks, completion = reference_analytics(organization_data)
+
+        assert mcq_analytics.category_scores(organization_data) == scores
+        assert mcq_analytics.risk_factors(organization_data) == risks
+        assert mcq_analytics.completion_rates(organization_data) == completion
+
+    def test_completion_counts(self, organization_data):
+        rates = {row['slug']: row for row in mcq_analytics.completion_rates(organization_data)}
+        assert set(rates) == {'knowledge', 'lifestyle'}
+        assert rates['knowledge']['complete_count'] == 2
+        assert rates['knowledge']['total_questions'] == 3
+        assert rates['lifestyle']['complete_count'] == 2
+        assert rates['lifestyle']['completion_rate'] == 50.0
+
+    def test_query_count_is_constant(self, organization_data, django_assert_num_queries):
+        trainer = TrainerFactory(organization=organization_data)
+        for _ in range(5):
+            AssessmentFactory(client=ClientFactory(trainer=trainer), trainer=trainer)
+
+        with django_assert_num_queries(2):
+            mcq_analytics.category_scores(organization_data)
+        with django_assert_num_queries(2):
+            mcq_analytics.risk_factors(organization_data)
+        with django_assert_num_queries(3):
+            mcq_analytics.completion_rates(organization_data)
+
+    def test_empty_organization(self):
+        organization = TrainerFactory().organization
+        QuestionCategoryFactory(name='Knowledge')
+
+        assert mcq_analytics.risk_factors(organization) == []
+        assert mcq_analytics.completion_rates(organization) == []
+        assert mcq_analytics.category_scores(organization)[0]['average_score'] == 0
+
+    def test_api_endpoints(self, organization_data):
+        trainer = organization_data.trainers.first()
+        client = APIClient()
+        client.force_authenticate(user=trainer.user)
+        scores, risks, completion = reference_analytics(organization_data)
+
+        for name, expected in (
+            ('category-scores', scores), ('risk-factors', risks), ('completion-rates', completion)
+        ):
+            response = client.get(reverse(f'api:mcq-analytics-{name}'))
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json() == expected
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not os.environ.get('MCQ_ANALYTICS_BENCHMARK'),
+    reason='set MCQ_ANALYTICS_BENCHMARK=<assessments> to run the benchmark',
+)
+def test_benchmark_large_organization(django_assert_num_queries):
+    """Regression benchmark: query count and time on a large organization."""
+    size = int(os.environ['MCQ_ANALYTICS_BENCHMARK'] or 50000)
+    trainer = TrainerFactory()
+    client = ClientFactory(trainer=trainer)
+    template = AssessmentFactory(client=client, trainer=trainer)
+
+    category = QuestionCategoryFactory(name='Knowledge')
+    questions = [MultipleChoiceQuestionFactory(category=category) for _ in range(3)]
+    risky = [QuestionChoiceFactory(question=q, contributes_to_risk=True) for q in questions]
+
+    fields = {
+        field.attname: getattr(template, field.attname)
+        for field in Assessment._meta.concrete_fields if not field.primary_key
+    }
+    Assessment.objects.bulk_create(
+        [Assessment(**fields) for _ in range(size - 1)], batch_size=2000
+    )
+    ids = list(Assessment.objects.filter(trainer=trainer).values_list('id', flat=True))
+    QuestionResponse.objects.bulk_create(
+        [QuestionResponse(assessment_id=pk, question=q) for pk in ids for q in questions],
+        batch_size=2000,
+    )
+    SelectedChoice = QuestionResponse.selected_choices.through
+    SelectedChoice.objects.bulk_create(
+        [
+            SelectedChoice(questionresponse_id=response_id, questionchoice_id=risky[0].pk)
+            for response_id in QuestionResponse.objects.filter(
+                question=questions[0]
+            ).values_list('id', flat=True)
+        ],
+        batch_size=2000,
+    )
+
+    mcq_rollups.rebuild()
+
+    started = time.perf_counter()
+    with django_assert_num_queries(7):
+        mcq_analytics.category_scores(trainer.organization)
+        mcq_analytics.risk_factors(trainer.organization)
+        rates = mcq_analytics.completion_rates(trainer.organization)
+    elapsed = time.perf_counter() - started
+
+    assert rates[0]['complete_count'] == size
+    print(f'\nMCQ analytics for {size} assessments: {elapsed:.2f}s')
@@ -0,0 +1,108 @@
+"""
+Tests for the versioned MCQ catalog snapshot and its API ETags.
+"""
+
+import pickle
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.assessments import mcq_catalog
+from apps.assessments.factories import (
+    MultipleChoiceQuestionFactory, QuestionCategoryFactory, QuestionChoiceFactory,
+)
+from apps.trainers.factories import TrainerFactory
+
+
+@pytest.fixture
+def catalog_data():
+    category = QuestionCategoryFactory(name='Lifestyle', order=1)
+    sleep = MultipleChoiceQuestionFactory(category=category, order=1, points=10)
+    for points in (10, 6, 2):
+        QuestionChoiceFactory(question=sleep, points=points)
+    habits = MultipleChoiceQuestionFactory(
+        category=category, order=2, question_type='multiple', points=10, depends_on=sleep
+    )
+    for points in (4, 3, -1):
+        QuestionChoiceFactory(question=habits, points=points)
+    MultipleChoiceQuestionFactory(category=category, order=3, is_active=False)
+    QuestionCategoryFactory(name='Hidden', is_active=False)
+    return {'category': category, 'sleep': sleep, 'habits': habits}
+
+
+@pytest.mark.django_db
+class TestMCQCatalog:
+    def test_snapshot_contents(self, catalog_data):
+        catalog = mcq_catalog.get_catalog()
+        category, sleep, habits = catalog_data['category'], catalog_data['sleep'], catalog_data['habits']
+
+        assert [c.pk for c in catalog.categories] == [category.pk]
+        assert [q.pk for q in catalog.questions] == [sleep.pk, habits.pk]
+        assert catalog.dependents == {sleep.pk: (habits.pk,)}
+        assert catalog.max_points == {sleep.pk: 10, habits.pk: 7}
+        assert catalog.category_max_points == {category.pk: 17}
+
+    def test_reads_do_not_query(self, catalog_data, django_assert_num_queries):
+        mcq_catalog.get_catalog()
+        with django_assert_num_queries(0):
+            catalog = mcq_catalog.get_catalog()
+            for question in catalog.questions:
+                list(question.choices.all())
+                question.category.name
+                question.depends_on
+
+    def test_saving_a_choice_publishes_new_version(self, catalog_data):
+        before = mcq_catalog.get_catalog()
+        choice = catalog_data['sleep'].choices.first()
+        choice.points = 8
+        choice.save()
+
+        after = mcq_catalog.get_catalog()
+        assert after is not before
+        assert after.content_version != before.content_version
+
+    def test_pickle_round_trip(self, catalog_data):
+        catalog = mcq_catalog.get_catalog()
+        restored = pickle.loads(pickle.dumps(catalog))
+
+        assert restored.content_version == catalog.content_version
+        assert restored.max_points == catalog.max_points
+        assert [q.pk for q in restored.questions] == [q.pk for q in catalog.questions]
+
+
+@pytest.mark.django_db
+class TestCatalogAPI:
+    @pytest.fixture
+    def api_client(self):
+        client = APIClient()
+        client.force_authenticate(user=TrainerFactory().user)
+        return client
+
+    def test_list_served_with_etag(self, api_client, catalog_data):
+        url = reverse('api:mcq-question-list')
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [
+            catalog_data['sleep'].pk, catalog_data['habits'].pk
+        ]
+        etag = response['ETag']
+        assert etag == mcq_catalog.get_catalog().etag
+
+        cached = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_category_questions_etag_changes_after_edit(self, api_client, catalog_data):
+        url = reverse('api:mcq-category-questions', kwargs={'pk': catalog_data['category'].pk})
+        etag = api_client.get(url)['ETag']
+
+        sleep = catalog_data['sleep']
+        sleep.question_text_ko = '평균 수면 시간은?'
+        sleep.save()
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert response.data[0]['question_text_ko'] == '평균 수면 시간은?'
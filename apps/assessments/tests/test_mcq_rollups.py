@@ -0,0 +1,171 @@
+"""
+Tests for the daily MCQ analytics rollups.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.assessments import mcq_rollups
+from apps.assessments.factories import (
+    AssessmentFactory, MultipleChoiceQuestionFactory,
+    QuestionCategoryFactory, QuestionChoiceFactory, QuestionResponseFactory,
+)
+from apps.assessments.mcq_scoring_module.mcq_submission import MCQSubmissionService
+from apps.assessments.models import (
+    MCQChoiceDailyRollup, MCQQuestionDailyRollup, QuestionResponse,
+)
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+def snapshot():
+    """All rollup rows as comparable tuples."""
+    questions = sorted(MCQQuestionDailyRollup.objects.values_list(
+        'organization_id', 'category_id', 'question_id', 'day',
+        'response_count', 'points_sum', 'risk_count',
+    ))
+    choices = sorted(MCQChoiceDailyRollup.objects.values_list(
+        'organization_id', 'question_id', 'choice_id', 'day',
+        'response_count', 'points_sum', 'risk_count',
+    ))
+    return questions, choices
+
+
+def rebuilt():
+    mcq_rollups.rebuild()
+    return snapshot()
+
+
+@pytest.fixture
+def trainer():
+    return TrainerFactory()
+
+
+@pytest.fixture
+def questions():
+    category = QuestionCategoryFactory(name='Lifestyle')
+    single = MultipleChoiceQuestionFactory(category=category, order=1, points=10)
+    QuestionChoiceFactory(question=single, points=10, order=1)
+    QuestionChoiceFactory(question=single, points=0, order=2, contributes_to_risk=True)
+    multiple = MultipleChoiceQuestionFactory(
+        category=category, order=2, question_type='multiple', points=10
+    )
+    for points in (5, 3):
+        QuestionChoiceFactory(question=multiple, points=points, contributes_to_risk=True)
+    return single, multiple
+
+
+def make_assessment(trainer, **kwargs):
+    kwargs.setdefault('date', timezone.now())
+    return AssessmentFactory(client=ClientFactory(trainer=trainer), trainer=trainer, **kwargs)
+
+
+def choice(question, index):
+    return list(question.choices.all())[index]
+
+
+@pytest.mark.django_db
+class TestRollupMaintenance:
+    def test_single_response_writes(self, trainer, questions):
+        single, multiple = questions
+        today = make_assessment(trainer)
+        yesterday = make_assessment(trainer, date=timezone.now() - timedelta(days=1))
+
+        QuestionResponseFactory(assessment=today, question=single, selected_choices=[choice(single, 1)])
+        QuestionResponseFactory(
+            assessment=today, question=multiple,
+            selected_choices=[choice(multiple, 0), choice(multiple, 1)],
+        )
+        QuestionResponseFactory(assessment=yesterday, question=single, selected_choices=[choice(single, 0)])
+
+        rows = MCQQuestionDailyRollup.objects.filter(question=multiple).get()
+        assert (rows.response_count, rows.points_sum, rows.risk_count) == (1, 8, 2)
+        assert MCQQuestionDailyRollup.objects.filter(question=single).count() == 2
+        assert snapshot() == rebuilt()
+
+    def test_changing_and_deleting_responses(self, trainer, questions):
+        single, _ = questions
+        assessment = make_assessment(trainer)
+        response = QuestionResponseFactory(
+            assessment=assessment, question=single, selected_choices=[choice(single, 0)]
+        )
+
+        response.selected_choices.set([choice(single, 1)])
+        row = MCQChoiceDailyRollup.objects.get()
+        assert (row.choice_id, row.risk_count) == (choice(single, 1).id, 1)
+
+        response.delete()
+        assert snapshot() == ([], [])
+
+        QuestionResponseFactory(assessment=assessment, question=single, selected_choices=[choice(single, 0)])
+        assessment.delete()
+        assert snapshot() == ([], [])
+
+    def test_submission_service(self, trainer, questions):
+        single, multiple = questions
+        assessment = make_assessment(trainer)
+        other = make_assessment(trainer)
+        QuestionResponseFactory(assessment=other, question=single, selected_choices=[choice(single, 1)])
+
+        MCQSubmissionService(assessment).submit([
+            {'question_id': single.id, 'selected_choices': [choice(single, 0).id]},
+            {'question_id': multiple.id, 'selected_choices': [choice(multiple, 1).id]},
+        ])
+        assert snapshot() == rebuilt()
+
+        MCQSubmissionService(assessment).submit(
+            [{'question_id': single.id, 'selected_choices': [choice(single, 1).id]}], replace=True
+        )
+        assert snapshot() == rebuilt()
+        row = MCQQuestionDailyRollup.objects.get(question=single)
+        assert (row.response_count, row.risk_count) == (2, 2)
+
+    def test_editing_a_choice_reprices_rows(self, trainer, questions):
+        single, _ = questions
+        safe = choice(single, 0)
+        for _ in range(3):
+            QuestionResponseFactory(
+                assessment=make_assessment(trainer), question=single, selected_choices=[safe]
+            )
+
+        safe.points = 7
+        safe.contributes_to_risk = True
+        safe.save()
+
+        row = MCQChoiceDailyRollup.objects.get(choice=safe)
+        assert (row.points_sum, row.risk_count) == (21, 3)
+        assert MCQQuestionDailyRollup.objects.get(question=single).risk_count == 3
+        # Response points are stored when answered and are not repriced
+        assert snapshot()[1] == rebuilt()[1]
+
+    def test_organization_less_trainer(self, questions):
+        single, _ = questions
+        trainer = TrainerFactory(organization=None)
+        QuestionResponseFactory(
+            assessment=make_assessment(trainer), question=single, selected_choices=[choice(single, 1)]
+        )
+        QuestionResponseFactory(
+            assessment=make_assessment(trainer), question=single, selected_choices=[choice(single, 1)]
+        )
+
+        row = MCQQuestionDailyRollup.objects.get()
+        assert (row.organization_id, row.response_count) == (None, 2)
+        assert snapshot() == rebuilt()
+
+
+@pytest.mark.django_db
+class TestRollupReaders:
+    def test_rebuild_command(self, trainer, questions):
+        single, _ = questions
+        assessment = make_assessment(trainer)
+        QuestionResponse.objects.bulk_create([QuestionResponse(assessment=assessment, question=single)])
+        assert not MCQQuestionDailyRollup.objects.exists()
+
+        out = StringIO()
+        call_command('rebuild_mcq_rollups', stdout=out)
+
+        assert 'Rebuilt MCQ rollups: 1 question rows, 0 choice rows' in out.getvalue()
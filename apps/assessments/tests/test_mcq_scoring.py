@@ -6,7 +6,9 @@ import pytest
 from decimal import Decimal
 from django.test import TestCase
 from apps.assessments.models import Assessment, QuestionCategory, MultipleChoiceQuestion, QuestionChoice, QuestionResponse
-from apps.assessments.mcq_scoring_module.mcq_scoring import MCQScoringEngine, calculate_mcq_scores_for_assessment
+from apps.assessments.mcq_scoring_module.mcq_scoring import (
+    MCQScoringEngine, calculate_mcq_scores_batch, calculate_mcq_scores_for_assessment
+)
 from apps.clients.models import Client
 from apps.trainers.models import Trainer, Organization
 from django.contrib.auth import get_user_model
@@ -343,4 +345,75 @@ class TestMCQScoringEngine(TestCase):
         self.assertEqual(scores['lifestyle_score'], 0)
         self.assertEqual(scores['readiness_score'], 0)
         # Comprehensive score should equal physical score * 0.6
-        self.assertEqual(scores['comprehensive_score'], 75.0 * 0.6)
\ No newline at end of file
+        self.assertEqual(scores['comprehensive_score'], 75.0 * 0.6)
+    
+    def _answer(self, assessment, category, points, earned, risk_weight=None):
+        """Create a single-choice question answered with one choice."""
+        question = MultipleChoiceQuestion.objects.create(
+            category=category,
+            question_text=f"{category.name} question {points}/{earned}",
+            question_text_ko="질문",
+            question_type='single',
+            points=points
+        )
+        choice = QuestionChoice.objects.create(
+            question=question,
+            choice_text=f"Answer {earned}",
+            choice_text_ko="답변",
+            points=earned,
+            contributes_to_risk=risk_weight is not None,
+            risk_weight=risk_weight or Decimal('0')
+        )
+        response = QuestionResponse.objects.create(assessment=assessment, question=question)
+        response.selected_choices.add(choice)
+        return response
+    
+    def test_scoring_uses_two_queries(self):
+        """Category totals and risk factors are aggregated in two queries."""
+        for earned in (10, 5, 0):
+            self._answer(self.assessment, self.knowledge_category, 10, earned)
+        self._answer(self.assessment, self.lifestyle_category, 10, 2, Decimal('0.5'))
+        self._answer(self.assessment, self.lifestyle_category, 10, 8)
+        
+        engine = MCQScoringEngine(self.assessment)
+        with self.assertNumQueries(2):
+            scores = engine.calculate_mcq_scores()
+        
+        self.assertEqual(scores['knowledge_score'], 50.0)
+        self.assertEqual(scores['lifestyle_score'], 50.0)
+        self.assertEqual(scores['readiness_score'], 0)
+        self.assertEqual(scores['comprehensive_score'], round(75.0 * 0.6 + 50 * 0.15 + 50 * 0.15, 1))
+        self.assertEqual(scores['mcq_risk_factors'], [{
+            'category': 'Lifestyle',
+            'question': 'Lifestyle question 10/2',
+            'answer': 'Answer 2',
+            'risk_weight': 0.5,
+            'risk_type': 'mcq_response'
+        }])
+    
+    def test_batch_matches_single_assessment_scoring(self):
+        """The batch variant returns the same result per assessment."""
+        other = Assessment.objects.create(
+            client=self.client_obj,
+            trainer=self.trainer,
+            date=datetime.now(),
+            overall_score=60.0
+        )
+        self._answer(self.assessment, self.knowledge_category, 10, 7)
+        self._answer(self.assessment, self.readiness_category, 10, 3, Decimal('0.9'))
+        self._answer(other, self.knowledge_category, 10, 4)
+        
+        expected = {
+            assessment.pk: MCQScoringEngine(assessment).calculate_mcq_scores()
+            for assessment in (self.assessment, other)
+        }
+        
+        fresh = list(Assessment.objects.filter(pk__in=expected))
+        with self.assertNumQueries(2):
+            results = calculate_mcq_scores_batch(fresh)
+        
+        self.assertEqual(results, expected)
+        self.assertEqual(
+            {assessment.pk: assessment.knowledge_score for assessment in fresh},
+            {self.assessment.pk: 70.0, other.pk: 40.0}
+        )
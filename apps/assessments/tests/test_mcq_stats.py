@@ -0,0 +1,170 @@
+"""
+Tests for the single-pass MCQ statistics collector.
+"""
+
+import json
+import os
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.assessments import mcq_stats
+from apps.assessments.factories import (
+    AssessmentFactory, MultipleChoiceQuestionFactory,
+    QuestionCategoryFactory, QuestionChoiceFactory, QuestionResponseFactory,
+)
+from apps.assessments.models import QuestionResponse
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+@pytest.fixture
+def dataset():
+    """Responses of two trainers spread over ninety days."""
+    category = QuestionCategoryFactory(name='Knowledge')
+    single = MultipleChoiceQuestionFactory(category=category, points=10)
+    right = QuestionChoiceFactory(question=single, points=10)
+    wrong = QuestionChoiceFactory(question=single, points=0)
+    scale = MultipleChoiceQuestionFactory(category=category, question_type='scale', points=5)
+
+    now = timezone.now()
+    trainers = [TrainerFactory(), TrainerFactory()]
+    for index in range(24):
+        trainer = trainers[index % 2]
+        assessment = AssessmentFactory(
+            client=ClientFactory(trainer=trainer), trainer=trainer,
+            date=now - timedelta(days=index * 4),
+        )
+        # Set after save so the scoring pipeline does not overwrite it
+        score = None if index % 7 == 0 else 40 + index * 2
+        type(assessment).objects.filter(pk=assessment.pk).update(comprehensive_score=score)
+
+        correct = index % 3 != 0
+        QuestionResponseFactory(
+            assessment=assessment, question=single,
+            points_earned=10 if correct else 0,
+            selected_choices=[right if correct else wrong],
+        )
+        if index % 2:
+            QuestionResponseFactory(assessment=assessment, question=scale, points_earned=index % 5)
+    return single, scale, right, wrong, trainers, now
+
+
+def reference(start, end, trainer_id=None):
+    """Counters computed by walking every response."""
+    responses = QuestionResponse.objects.filter(
+        assessment__date__gte=start, assessment__date__lte=end
+    ).select_related('question').prefetch_related('selected_choices')
+    if trainer_id:
+        responses = responses.filter(assessment__trainer_id=trainer_id)
+
+    question_responses, question_points, choices = Counter(), Counter(), Counter()
+    assessments, per_type = set(), {}
+    for response in responses:
+        question_responses[response.question_id] += 1
+        question_points[response.question_id] += response.points_earned
+        choices.update(choice.id for choice in response.selected_choices.all())
+        assessments.add(response.assessment_id)
+        per_type.setdefault(response.question.question_type, Counter())[response.assessment_id] += 1
+    average_answered = {
+        q_type: sum(counts.values()) / len(counts) for q_type, counts in per_type.items()
+    }
+    return question_responses, question_points, choices, len(assessments), average_answered
+
+
+def as_tuple(stats):
+    return (
+        stats.question_responses, stats.question_points, stats.choice_selections,
+        stats.assessments_with_responses,
+        {q_type: stats.average_answered(q_type) for q_type in stats.type_assessments},
+    )
+
+
+@pytest.mark.django_db
+class TestCollector:
+    def test_matches_reference(self, dataset):
+        *_, trainers, now = dataset
+        start, end = now - timedelta(days=60), now
+
+        assert as_tuple(mcq_stats.collect(start, end)) == reference(start, end)
+        assert as_tuple(mcq_stats.collect(start, end, trainers[1].id)) == reference(start, end, trainers[1].id)
+
+    def test_shards_merge_to_the_same_counters(self, dataset):
+        *_, now = dataset
+        start, end = now - timedelta(days=100), now
+
+        whole = mcq_stats.collect(start, end)
+        sharded = mcq_stats.collect(start, end, shards=7, chunk_size=3)
+
+        assert as_tuple(sharded) == as_tuple(whole)
+        assert sharded.score_histograms == whole.score_histograms
+        assert sharded.total_responses == whole.total_responses == 36
+
+    def test_date_shards_cover_the_range(self):
+        now = timezone.now()
+        shards = mcq_stats.date_shards(now - timedelta(days=10), now, 4)
+
+        assert shards[0][0] == now - timedelta(days=10)
+        assert shards[-1][1:] == (now, True)
+        assert all(shard[1] == following[0] for shard, following in zip(shards, shards[1:]))
+        assert [inclusive for *_, inclusive in shards] == [False, False, False, True]
+
+    def test_discrimination_index_ranks_by_score(self):
+        stats = mcq_stats.ResponseStats()
+        # Ten assessments with distinct scores; the top three answer correctly
+        for index in range(10):
+            stats.add(1, 'single', 10 if index >= 7 else 0, 50 + index * 5)
+            stats.flush()
+        # Unscored assessments are not ranked
+        stats.add(1, 'single', 10, None)
+        stats.flush()
+
+        # Two assessments per group: both top ones correct, no bottom ones
+        assert stats.discrimination_index(1) == 1.0
+        assert stats.discrimination_index(2) is None
+
+    def test_discrimination_index_splits_boundary_ties(self):
+        stats = mcq_stats.ResponseStats()
+        for correct in (True, False, True, False):
+            stats.add(1, 'single', 10 if correct else 0, 80)
+            stats.flush()
+
+        # One assessment per group, drawn from a bin that is half correct
+        assert stats.discrimination_index(1) == 0
+
+
+@pytest.mark.django_db
+class TestStatisticsCommand:
+    def test_report(self, dataset):
+        out = StringIO()
+        call_command('mcq_statistics', detailed=True, shards=3, stdout=out)
+
+        output = out.getvalue()
+        assert 'Total MCQ Responses: 36' in output
+        assert 'Assessments with MCQ: 24' in output
+        assert 'Discrimination Index' in output
+
+    def test_json_export(self, dataset):
+        single, *_, trainers, _ = dataset
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            filename = f.name
+
+        try:
+            call_command('mcq_statistics', export=filename, trainer=trainers[0].id, stdout=StringIO())
+            with open(filename, encoding='utf-8') as f:
+                report = json.load(f)
+        finally:
+            os.unlink(filename)
+
+        assert report['overview']['total_responses'] == 12
+        question = next(q for q in report['questions'] if q['id'] == single.id)
+        assert question['response_count'] == 12
+        assert {choice['count'] for choice in question['choices']} == {4, 8}
+        assert set(report) == {
+            'overview', 'categories', 'questions', 'response_patterns', 'quality_metrics'
+        }
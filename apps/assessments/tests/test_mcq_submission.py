@@ -0,0 +1,130 @@
+"""
+Tests for the bulk MCQ submission service.
+"""
+
+import pytest
+
+from apps.assessments.factories import (
+    AssessmentFactory, MultipleChoiceQuestionFactory,
+    QuestionCategoryFactory, QuestionChoiceFactory,
+)
+from apps.assessments.mcq_scoring_module.mcq_submission import (
+    MCQSubmissionError, MCQSubmissionService
+)
+from apps.assessments.models import QuestionResponse
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+@pytest.fixture
+def assessment():
+    trainer = TrainerFactory()
+    client = ClientFactory(trainer=trainer)
+    return AssessmentFactory(client=client, trainer=trainer)
+
+
+@pytest.fixture
+def questionnaire():
+    """Ten single-choice knowledge questions and one multiple-choice question."""
+    category = QuestionCategoryFactory(name='Knowledge')
+    questions = []
+    for _ in range(10):
+        question = MultipleChoiceQuestionFactory(category=category, points=10)
+        for points in (10, 5, 0):
+            QuestionChoiceFactory(question=question, points=points)
+        questions.append(question)
+
+    multiple = MultipleChoiceQuestionFactory(category=category, question_type='multiple', points=10)
+    for points in (5, 3, 2):
+        QuestionChoiceFactory(question=multiple, points=points)
+    questions.append(multiple)
+    return questions
+
+
+def answer(question, *positions):
+    choices = list(question.choices.all())
+    return {
+        'question_id': question.id,
+        'selected_choices': [choices[i].id for i in positions],
+    }
+
+
+@pytest.mark.django_db
+class TestMCQSubmissionService:
+    def test_points_and_scores(self, assessment, questionnaire):
+        *singles, multiple = questionnaire
+        answers = [answer(question, 0) for question in singles[:5]]
+        answers += [answer(question, 1) for question in singles[5:]]
+        answers.append(answer(multiple, 0, 1))
+
+        MCQSubmissionService(assessment).submit(answers)
+
+        responses = QuestionResponse.objects.filter(assessment=assessment)
+        # Points match what the per-response path calculates
+        for response in responses:
+            assert response.points_earned == response.calculate_points()
+        assert sum(response.points_earned for response in responses) == 50 + 25 + 8
+
+        assessment.refresh_from_db()
+        assert assessment.knowledge_score == round(83 / 110 * 100, 1)
+
+    def test_query_count_does_not_grow_with_questions(
+        self, assessment, questionnaire, django_assert_max_num_queries
+    ):
+        answers = [answer(question, 0) for question in questionnaire]
+        # load questions + choices, existing responses, writes, scoring, save,
+        # one rollup bucket refresh
+        with django_assert_max_num_queries(20):
+            MCQSubmissionService(assessment).submit(answers)
+
+        updated = [answer(question, 1) for question in questionnaire]
+        with django_assert_max_num_queries(20):
+            MCQSubmissionService(assessment).submit(updated)
+
+        assert QuestionResponse.objects.filter(assessment=assessment).count() == len(questionnaire)
+
+    def test_resubmission_updates_in_place(self, assessment, questionnaire):
+        first, second = questionnaire[:2]
+        MCQSubmissionService(assessment).submit([answer(first, 0), answer(second, 0)])
+        original = QuestionResponse.objects.get(assessment=assessment, question=first)
+
+        MCQSubmissionService(assessment).submit([answer(first, 2)])
+
+        response = QuestionResponse.objects.get(assessment=assessment, question=first)
+        assert response.pk == original.pk
+        assert response.points_earned == 0
+        assert list(response.selected_choices.values_list('points', flat=True)) == [0]
+        # Questions not in the submission are kept
+        assert QuestionResponse.objects.filter(assessment=assessment, question=second).exists()
+
+    def test_replace_drops_other_responses(self, assessment, questionnaire):
+        first, second = questionnaire[:2]
+        MCQSubmissionService(assessment).submit([answer(first, 0), answer(second, 0)])
+
+        MCQSubmissionService(assessment).submit([answer(first, 1)], replace=True)
+
+        assert list(
+            QuestionResponse.objects.filter(assessment=assessment).values_list('question_id', flat=True)
+        ) == [first.id]
+
+    def test_foreign_choices_are_ignored(self, assessment, questionnaire):
+        first, second = questionnaire[:2]
+        foreign = second.choices.first()
+
+        MCQSubmissionService(assessment).submit([{
+            'question_id': first.id,
+            'selected_choices': [foreign.id, 'invalid'],
+        }])
+
+        response = QuestionResponse.objects.get(assessment=assessment, question=first)
+        assert not response.selected_choices.exists()
+        assert response.points_earned == 0
+
+    def test_unknown_question_writes_nothing(self, assessment, questionnaire):
+        with pytest.raises(MCQSubmissionError):
+            MCQSubmissionService(assessment).submit([
+                answer(questionnaire[0], 0),
+                {'question_id': 999999, 'selected_choices': []},
+            ])
+
+        assert not QuestionResponse.objects.filter(assessment=assessment).exists()
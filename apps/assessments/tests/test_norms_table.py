@@ -0,0 +1,141 @@
+"""
+Tests for the cached normative table used for percentile rankings.
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.assessments import norms_table
+from apps.assessments.factories import AssessmentFactory
+from apps.assessments.models import Assessment, NormativeData
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+def make_norm(test_type, gender='M', age_min=30, age_max=39, knots=(13, 17, 22, 30, 39), **kwargs):
+    p10, p25, p50, p75, p90 = knots
+    return NormativeData.objects.create(
+        test_type=test_type, gender=gender, age_min=age_min, age_max=age_max,
+        percentile_10=p10, percentile_25=p25, percentile_50=p50,
+        percentile_75=p75, percentile_90=p90,
+        source=kwargs.pop('source', 'ACSM Guidelines'), year=2021, **kwargs
+    )
+
+
+class TestNormsTable(TestCase):
+    """Percentiles from the table match NormativeData.get_percentile"""
+
+    def setUp(self):
+        self.norm = make_norm('push_up')
+        make_norm('overall', gender='A', age_min=0, age_max=120, knots=(40, 50, 60, 70, 80))
+        make_norm('single_leg_balance', gender='A', age_min=0, age_max=120,
+                  knots=(5, 10, 20, 30, 45))
+
+    def test_interpolation_matches_model(self):
+        table = norms_table.get_table()
+        for score in [0, 10, 13, 15, 17, 19.5, 22, 26, 30, 35, 39, 50]:
+            expected = self.norm.get_percentile(score)
+            assert table.percentile('push_up', 'M', 35, score) == pytest.approx(expected)
+
+    def test_age_and_gender_fallback(self):
+        table = norms_table.get_table()
+        assert table.find('push_up', 'M', 35).pk == self.norm.pk
+        assert table.find('push_up', 'M', 40) is None
+        assert table.find('push_up', 'F', 35) is None
+        assert table.find('overall', 'F', 70).gender == 'A'
+
+    def test_norm_version_reflects_contents(self):
+        before = norms_table.build_table().norm_version
+        assert norms_table.build_table().norm_version == before
+
+        self.norm.percentile_50 = 23
+        self.norm.save()
+        assert norms_table.build_table().norm_version != before
+
+
+class TestPercentileRankingsFromTable(TestCase):
+    """Rankings are served from memory and support batches"""
+
+    def setUp(self):
+        make_norm('push_up')
+        make_norm('overall', gender='A', age_min=0, age_max=120, knots=(40, 50, 60, 70, 80))
+        make_norm('single_leg_balance', gender='A', age_min=0, age_max=120,
+                  knots=(5, 10, 20, 30, 45))
+
+        trainer = TrainerFactory()
+        client = ClientFactory(trainer=trainer, age=35, gender='male')
+        self.assessments = [AssessmentFactory(client=client, trainer=trainer) for _ in range(3)]
+
+    def test_rankings_shape(self):
+        assessment = Assessment.objects.select_related('client').get(pk=self.assessments[0].pk)
+        rankings = assessment.get_percentile_rankings()
+
+        assert rankings['push_up']['source'] == 'ACSM Guidelines'
+        assert 10 <= rankings['push_up']['percentile'] <= 90
+        assert abs(rankings['push_up']['upper_percentile'] + rankings['push_up']['percentile'] - 100) <= 0.1
+        assert rankings['overall']['year'] == 2021
+        assert rankings['strength']['percentile'] is None
+        assert 'single_leg_balance' in rankings
+
+    def test_no_queries_when_warm(self):
+        assessments = list(Assessment.objects.select_related('client'))
+        assessments[0].get_percentile_rankings()
+        with self.assertNumQueries(0):
+            for assessment in assessments:
+                assessment.get_percentile_rankings()
+
+    def test_batch_matches_single(self):
+        assessments = list(Assessment.objects.select_related('client'))
+        batch = norms_table.rank_assessments(assessments)
+        for assessment in assessments:
+            assert batch[assessment.pk] == norms_table.rank_assessment(assessment)
+
+    def test_load_normative_data_invalidates(self):
+        table = norms_table.get_table()
+        call_command('load_normative_data', stdout=open('/dev/null', 'w'))
+        assert norms_table.get_table() is not table
+
+
+class TestNormSnapshot(TestCase):
+    """Percentiles and performance age are persisted at scoring time"""
+
+    def setUp(self):
+        make_norm('push_up')
+        make_norm('overall', gender='A', age_min=20, age_max=39, knots=(40, 50, 60, 70, 80))
+        make_norm('overall', gender='A', age_min=40, age_max=59, knots=(30, 40, 50, 60, 70))
+
+        trainer = TrainerFactory()
+        self.client_obj = ClientFactory(trainer=trainer, age=35, gender='male')
+        self.assessment = AssessmentFactory(client=self.client_obj, trainer=trainer)
+
+    def test_snapshot_saved_with_scores(self):
+        assessment = Assessment.objects.select_related('client').get(pk=self.assessment.pk)
+        table = norms_table.get_table()
+
+        assert assessment.norm_version == table.norm_version
+        assert assessment.percentile_rankings_snapshot == assessment.get_percentile_rankings()
+        assert assessment.performance_age_snapshot == assessment.calculate_performance_age()
+
+    def test_readers_load_snapshot_without_queries(self):
+        assessment = Assessment.objects.select_related('client').get(pk=self.assessment.pk)
+        norms_table.reset()
+        with self.assertNumQueries(0):
+            rankings, performance_age = assessment.get_norm_snapshot()
+        assert rankings == assessment.percentile_rankings_snapshot
+        assert performance_age == assessment.performance_age_snapshot
+
+    def test_refresh_only_stale_snapshots(self):
+        out = StringIO()
+        call_command('refresh_norm_snapshots', stdout=out)
+        assert '0 snapshots to refresh' in out.getvalue()
+
+        NormativeData.objects.filter(test_type='push_up').update(percentile_50=25)
+        out = StringIO()
+        call_command('refresh_norm_snapshots', stdout=out)
+        assert '1 snapshots to refresh' in out.getvalue()
+
+        assessment = Assessment.objects.get(pk=self.assessment.pk)
+        assert assessment.norm_version == norms_table.get_table().norm_version
@@ -0,0 +1,90 @@
+"""
+Tests for the chunked recalculate_scores management command.
+"""
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from apps.assessments.factories import AssessmentFactory
+from apps.assessments.management.commands.recalculate_scores import _split
+from apps.assessments.models import Assessment
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+@pytest.fixture
+def assessments():
+    trainer = TrainerFactory()
+    client = ClientFactory(trainer=trainer, age=30, gender='male')
+    created = [
+        AssessmentFactory(client=client, trainer=trainer, push_up_reps=reps)
+        for reps in [10, 20, 30, 40, 50]
+    ]
+    # Wipe computed scores without going through save()
+    Assessment.objects.update(push_up_score=None, overall_score=None, strength_score=None)
+    return created
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return str(tmp_path / 'recalculate.checkpoint')
+
+
+def run(*args):
+    out = StringIO()
+    call_command('recalculate_scores', *args, stdout=out)
+    return out.getvalue()
+
+
+def test_recalculates_in_chunks(assessments, checkpoint):
+    output = run('--chunk-size', '2', '--checkpoint', checkpoint)
+
+    assert 'Found 5 assessments to process' in output
+    assert 'Processed 2/5 assessments' in output
+    assert 'Processed 5/5 assessments' in output
+    assert 'rows/sec' in output and 'ETA' in output
+    assert 'Successfully updated 5 assessments' in output
+
+    for assessment in Assessment.objects.all():
+        assert assessment.push_up_score is not None
+        assert assessment.overall_score is not None
+
+    # A completed run removes its checkpoint
+    import os
+    assert not os.path.exists(checkpoint)
+
+
+def test_dry_run_writes_nothing(assessments, checkpoint):
+    output = run('--dry-run', '--checkpoint', checkpoint)
+
+    assert 'Dry run complete. Would update 5 assessments.' in output
+    assert not Assessment.objects.filter(overall_score__isnull=False).exists()
+
+
+def test_resume_from_checkpoint(assessments, checkpoint):
+    with open(checkpoint, 'w') as f:
+        json.dump({'last_id': assessments[2].pk}, f)
+
+    output = run('--resume', '--checkpoint', checkpoint)
+
+    assert f'Resuming after assessment #{assessments[2].pk}' in output
+    assert 'Found 2 assessments to process' in output
+    scored = set(
+        Assessment.objects.filter(overall_score__isnull=False).values_list('pk', flat=True)
+    )
+    assert scored == {assessments[3].pk, assessments[4].pk}
+
+
+def test_single_assessment(assessments, checkpoint):
+    output = run('--assessment-id', str(assessments[0].pk), '--checkpoint', checkpoint)
+
+    assert f'Processing single assessment #{assessments[0].pk}' in output
+    assert Assessment.objects.filter(overall_score__isnull=False).count() == 1
+
+
+def test_split_into_worker_batches():
+    assert _split(list(range(5)), 2) == [[0, 1, 2], [3, 4]]
+    assert _split(list(range(2)), 4) == [[0], [1]]
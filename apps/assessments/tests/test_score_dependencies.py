@@ -0,0 +1,151 @@
+"""
+Tests for the dependency index mapping standards and norms to assessment cohorts.
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from apps.assessments import score_dependencies
+from apps.assessments.factories import AssessmentFactory
+from apps.assessments.models import Assessment, NormativeData, TestStandard
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+def make_assessment(trainer, gender, age, **kwargs):
+    client = ClientFactory(trainer=trainer, gender=gender, age=age)
+    kwargs.setdefault('push_up_reps', 20)
+    kwargs.setdefault('push_up_type', 'standard')
+    return AssessmentFactory(client=client, trainer=trainer, **kwargs)
+
+
+@pytest.fixture
+def cohort():
+    trainer = TrainerFactory()
+    return {
+        'female_45': make_assessment(trainer, 'female', 45),
+        'female_45_modified': make_assessment(trainer, 'female', 45, push_up_type='modified'),
+        'female_35': make_assessment(trainer, 'female', 35),
+        'male_45': make_assessment(trainer, 'male', 45),
+    }
+
+
+@pytest.fixture
+def female_40s_standard():
+    return TestStandard.objects.create(
+        name='Female 40-49 push-up', test_type='push_up', gender='F',
+        age_min=40, age_max=49, metric_type='repetitions', variation_type='standard',
+        excellent_threshold=25, good_threshold=15, average_threshold=8,
+    )
+
+
+@pytest.fixture
+def rescore_pending(tmp_path):
+    def run():
+        out = StringIO()
+        call_command(
+            'recalculate_scores', '--pending',
+            '--checkpoint', str(tmp_path / 'checkpoint'), stdout=out
+        )
+        return out.getvalue()
+    return run
+
+
+def queued_ids():
+    return set(Assessment.objects.filter(scoring_fingerprint='').values_list('id', flat=True))
+
+
+@pytest.mark.django_db
+class TestCohorts:
+    def test_push_up_standard_cohort(self, cohort, female_40s_standard):
+        affected = score_dependencies.affected_assessments(standards=[female_40s_standard])
+        assert set(affected.values_list('id', flat=True)) == {cohort['female_45'].pk}
+
+    def test_standard_without_variation_covers_all_types(self, cohort):
+        state = score_dependencies.StandardState(
+            'push_up', 'A', 40, 49, None, None, 20, 10, 5, 0, True
+        )
+        affected = score_dependencies.affected_assessments(standards=[state])
+        assert set(affected.values_list('id', flat=True)) == {
+            cohort['female_45'].pk, cohort['female_45_modified'].pk, cohort['male_45'].pk,
+        }
+
+    def test_balance_standard_affects_everyone(self, cohort):
+        state = score_dependencies.StandardState(
+            'balance', 'A', 18, 65, None, 'eyes_closed', 30, 20, 10, 0, True
+        )
+        assert score_dependencies.affected_assessments(standards=[state]).count() == 4
+
+    def test_unused_standard_affects_nobody(self, cohort):
+        state = score_dependencies.StandardState(
+            'toe_touch', 'A', 0, 120, None, None, 10, 5, 0, -5, True
+        )
+        assert not score_dependencies.affected_assessments(standards=[state]).exists()
+
+    def test_norm_cohort_by_gender_and_age(self, cohort):
+        norm = NormativeData(
+            test_type='push_up', gender='M', age_min=40, age_max=49,
+            percentile_10=5, percentile_25=10, percentile_50=15,
+            percentile_75=20, percentile_90=25, source='ACSM', year=2024,
+        )
+        affected = score_dependencies.affected_assessments(norms=[norm])
+        assert set(affected.values_list('id', flat=True)) == {cohort['male_45'].pk}
+
+
+@pytest.mark.django_db
+class TestEnqueueOnChange:
+    def test_editing_standard_queues_only_its_cohort(self, cohort, female_40s_standard, rescore_pending):
+        # Creating the standard already queued its cohort; start from scored rows
+        rescore_pending()
+        assert not queued_ids()
+
+        female_40s_standard.good_threshold = 18
+        female_40s_standard.save()
+
+        assert queued_ids() == {cohort['female_45'].pk}
+        unaffected = Assessment.objects.select_related('client').get(pk=cohort['male_45'].pk)
+        assert not unaffected.scoring_is_stale()
+
+    def test_description_edit_queues_nothing(self, cohort, female_40s_standard, rescore_pending):
+        rescore_pending()
+
+        female_40s_standard.description = '설명만 수정'
+        female_40s_standard.save()
+        assert not queued_ids()
+
+    def test_inactive_standard_edit_queues_nothing(self, cohort):
+        TestStandard.objects.create(
+            name='Draft', test_type='push_up', gender='F', age_min=40, age_max=49,
+            metric_type='repetitions', is_active=False,
+            excellent_threshold=25, good_threshold=15, average_threshold=8,
+        )
+        assert not queued_ids()
+
+    def test_pending_rescoring_applies_new_thresholds(self, cohort, female_40s_standard, rescore_pending):
+        assert 'Found 1 assessments to process' in rescore_pending()
+        assessment = Assessment.objects.select_related('client').get(pk=cohort['female_45'].pk)
+        assert assessment.push_up_score == 3
+        assert not assessment.scoring_is_stale()
+
+
+@pytest.mark.django_db
+class TestRescoreAffectedCommand:
+    def test_dry_run_reports_rows_and_organizations(self, cohort, female_40s_standard, rescore_pending):
+        rescore_pending()
+
+        out = StringIO()
+        call_command('rescore_affected', '--standard', str(female_40s_standard.pk),
+                     '--dry-run', stdout=out)
+
+        output = out.getvalue()
+        assert '1 assessments affected' in output
+        assert f"{cohort['female_45'].trainer.organization.name}: 1" in output
+        assert not queued_ids()
+
+    def test_queues_cohort(self, cohort, female_40s_standard, rescore_pending):
+        rescore_pending()
+
+        call_command('rescore_affected', '--standard', str(female_40s_standard.pk), stdout=StringIO())
+        assert queued_ids() == {cohort['female_45'].pk}
@@ -0,0 +1,76 @@
+"""
+Tests for the scoring-input fingerprint that lets saves skip rescoring.
+"""
+
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from apps.assessments.factories import AssessmentFactory
+from apps.assessments.models import Assessment, TestStandard
+from apps.clients.factories import ClientFactory
+from apps.trainers.factories import TrainerFactory
+
+
+@pytest.fixture
+def assessment():
+    trainer = TrainerFactory()
+    client = ClientFactory(trainer=trainer, age=30, gender='male')
+    return AssessmentFactory(client=client, trainer=trainer, push_up_reps=25)
+
+
+def test_fingerprint_stored_after_scoring(assessment):
+    assert assessment.scoring_fingerprint
+    assert not assessment.scoring_is_stale()
+
+
+def test_fingerprint_is_deterministic(assessment):
+    reloaded = Assessment.objects.select_related('client').get(pk=assessment.pk)
+    assert reloaded.compute_scoring_fingerprint() == assessment.scoring_fingerprint
+
+
+def test_notes_edit_skips_rescoring(assessment):
+    assessment.push_up_notes = '메모 수정'
+    with mock.patch.object(Assessment, 'calculate_scores') as calculate:
+        assessment.save()
+    calculate.assert_not_called()
+
+
+def test_input_change_triggers_rescoring(assessment):
+    assessment.push_up_reps = 50
+    assessment.save()
+    assert assessment.push_up_score == 4
+    assert not assessment.scoring_is_stale()
+
+
+def test_client_and_standards_changes_make_scores_stale(assessment):
+    fingerprint = assessment.scoring_fingerprint
+
+    assessment.client.age = 55
+    assert assessment.compute_scoring_fingerprint() != fingerprint
+
+    assessment.client.age = 30
+    TestStandard.objects.create(
+        test_type='push_up', gender='M', age_min=0, age_max=120, metric_type='repetitions',
+        excellent_threshold=60, good_threshold=50, average_threshold=40, name='Strict'
+    )
+    assert assessment.compute_scoring_fingerprint() != fingerprint
+
+
+def test_recalculate_only_stale(assessment, tmp_path):
+    fresh = AssessmentFactory(client=assessment.client, trainer=assessment.trainer)
+    Assessment.objects.filter(pk=assessment.pk).update(push_up_reps=50)
+
+    out = StringIO()
+    call_command(
+        'recalculate_scores', '--only-stale',
+        '--checkpoint', str(tmp_path / 'checkpoint'), stdout=out
+    )
+
+    assert 'Found 1 stale assessments.' in out.getvalue()
+    assessment.refresh_from_db()
+    assert assessment.push_up_score == 4
+    assert not Assessment.objects.select_related('client').get(pk=assessment.pk).scoring_is_stale()
+    assert not Assessment.objects.select_related('client').get(pk=fresh.pk).scoring_is_stale()
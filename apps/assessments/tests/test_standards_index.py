@@ -0,0 +1,127 @@
+"""
+Tests for the in-memory TestStandard lookup index.
+"""
+
+import pytest
+from django.test import TestCase
+
+from apps.assessments import standards_index
+from apps.assessments.models import TestStandard
+from apps.assessments.scoring import get_test_standard
+
+
+def make_standard(**kwargs):
+    defaults = {
+        'test_type': 'push_up',
+        'gender': 'M',
+        'age_min': 20,
+        'age_max': 29,
+        'metric_type': 'repetitions',
+        'excellent_threshold': 40,
+        'good_threshold': 30,
+        'average_threshold': 20,
+        'name': 'Test standard',
+    }
+    defaults.update(kwargs)
+    return TestStandard.objects.create(**defaults)
+
+
+class TestStandardIndexLookup(TestCase):
+    """The index must resolve the same standard as TestStandard.get_standard"""
+
+    def setUp(self):
+        make_standard(gender='M', age_min=20, age_max=29)
+        make_standard(gender='M', age_min=30, age_max=39)
+        make_standard(gender='A', age_min=0, age_max=120)
+        make_standard(gender='F', age_min=20, age_max=39, variation_type='modified')
+        make_standard(gender='A', age_min=20, age_max=59, variation_type='wall')
+        make_standard(test_type='balance', gender='A', age_min=0, age_max=120,
+                      metric_type='time', conditions='eyes_open')
+        make_standard(test_type='balance', gender='A', age_min=40, age_max=49,
+                      metric_type='time', conditions='eyes_open', is_active=False)
+        # Overlapping ranges for one key
+        make_standard(test_type='toe_touch', gender='F', age_min=0, age_max=50,
+                      metric_type='distance')
+        make_standard(test_type='toe_touch', gender='F', age_min=30, age_max=60,
+                      metric_type='distance')
+
+    def test_matches_orm_fallback_chain(self):
+        """Every combination resolves to the same row as the ORM cascade"""
+        index = standards_index.build_index()
+        for test_type in ['push_up', 'balance', 'toe_touch', 'step_test']:
+            for gender in ['M', 'F', 'A']:
+                for variation in [None, 'modified', 'wall', 'knee']:
+                    for conditions in [None, 'eyes_open', 'eyes_closed']:
+                        for age in [0, 19, 20, 29, 30, 45, 55, 60, 120]:
+                            expected = TestStandard.get_standard(
+                                test_type, gender, age, variation, conditions
+                            )
+                            found = index.lookup(
+                                test_type, gender, age, variation, conditions
+                            )
+                            assert (found and found.pk) == (expected and expected.pk), (
+                                test_type, gender, variation, conditions, age
+                            )
+
+    def test_lookup_issues_no_queries(self):
+        """Warm lookups are served from memory"""
+        get_test_standard('push_up', 'M', 25)
+        with self.assertNumQueries(0):
+            for age in range(0, 121):
+                get_test_standard('push_up', 'M', age)
+                get_test_standard('push_up', 'F', age, 'modified')
+                get_test_standard('balance', 'A', age, conditions='eyes_open')
+
+    def test_inactive_standards_excluded(self):
+        """Inactive rows are not compiled into the index"""
+        standard = get_test_standard('balance', 'A', 45, conditions='eyes_open')
+        assert standard.age_min == 0
+
+
+class TestStandardIndexInvalidation(TestCase):
+    """The index is rebuilt when standards change"""
+
+    def test_rebuilt_after_save(self):
+        standard = make_standard(excellent_threshold=40)
+        assert get_test_standard('push_up', 'M', 25).excellent_threshold == 40
+
+        standard.excellent_threshold = 50
+        standard.save()
+        assert get_test_standard('push_up', 'M', 25).excellent_threshold == 50
+
+    def test_rebuilt_after_delete(self):
+        standard = make_standard()
+        assert get_test_standard('push_up', 'M', 25) is not None
+
+        standard.delete()
+        assert get_test_standard('push_up', 'M', 25) is None
+
+    def test_rebuilt_after_admin_toggle(self):
+        from django.contrib.admin.sites import AdminSite
+        from apps.assessments.admin import TestStandardAdmin
+
+        make_standard()
+        admin = TestStandardAdmin(TestStandard, AdminSite())
+        admin.message_user = lambda *args, **kwargs: None
+        assert get_test_standard('push_up', 'M', 25) is not None
+
+        admin.deactivate_standards(None, TestStandard.objects.all())
+        assert get_test_standard('push_up', 'M', 25) is None
+
+        admin.activate_standards(None, TestStandard.objects.all())
+        assert get_test_standard('push_up', 'M', 25) is not None
+
+    def test_stale_shared_version_triggers_rebuild(self):
+        """A worker rebuilds when the shared version stamp changes"""
+        from unittest import mock
+
+        make_standard()
+        index = standards_index.get_index()
+
+        with mock.patch.object(standards_index, '_shared_version', return_value='other'), \
+                mock.patch.object(standards_index, 'VERSION_CHECK_INTERVAL', 0):
+            rebuilt = standards_index.get_index()
+            assert rebuilt is not index
+            assert rebuilt.version == 'other'
+            # Matching stamp keeps the same snapshot
+            assert standards_index.get_index() is rebuilt
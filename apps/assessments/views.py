@@ -10,6 +10,8 @@ from django.template.loader import render_to_string
 import json
 
 from .models import Assessment, QuestionCategory, MultipleChoiceQuestion, QuestionResponse
+from .mcq_catalog import get_catalog
+from .mcq_scoring_module.mcq_submission import MCQSubmissionService
 from .forms import AssessmentForm
 from .forms import AssessmentSearchForm
 from .forms.mcq_forms import MCQResponseForm, CategoryMCQFormSet
@@ -217,11 +219,8 @@ def assessment_detail_view(request, pk):
         'cardio': get_score_description(assessment.cardio_score or 0, 40)
     }
     
-    # Get percentile rankings
-    percentile_rankings = assessment.get_percentile_rankings()
-    
-    # Get performance age
-    performance_age_data = assessment.calculate_performance_age()
+    # Get percentile rankings and performance age from the scoring snapshot
+    percentile_rankings, performance_age_data = assessment.get_norm_snapshot()
     
     # Translate primary concerns to Korean if available
     if assessment.risk_factors and 'summary' in assessment.risk_factors:
@@ -463,16 +462,10 @@ def mcq_assessment_view(request, assessment_id):
     if request.GET.get('debug'):
         return mcq_assessment_debug_view(request, assessment_id)
     
-    # Get active categories
-    categories = QuestionCategory.objects.filter(
-        is_active=True
-    ).order_by('order')
-    
-    # Get all active questions
-    questions = MultipleChoiceQuestion.objects.filter(
-        is_active=True,
-        category__in=categories
-    ).select_related('category', 'depends_on').prefetch_related('choices').order_by('category__order', 'order')
+    # Active categories and questions come from the cached catalog snapshot
+    catalog = get_catalog()
+    categories = catalog.categories
+    questions = catalog.questions
     
     # Get existing responses
     existing_responses = QuestionResponse.objects.filter(
@@ -517,68 +510,33 @@ def mcq_save_view(request, assessment_id):
     )
     
     try:
-        # Get all questions
-        questions = MultipleChoiceQuestion.objects.filter(
-            is_active=True,
-            category__is_active=True
-        ).prefetch_related('choices')
+        # Active questions with their choices from the catalog snapshot
+        questions = get_catalog().questions
         
-        # Process each question
+        # Collect the submitted answers
+        answers = []
         for question in questions:
             field_name = f'question_{question.id}'
+            if field_name not in request.POST:
+                continue
             
-            if field_name in request.POST:
-                # Get or create response (update existing instead of delete/create)
-                response, created = QuestionResponse.objects.get_or_create(
-                    assessment=assessment,
-                    question=question,
-                    defaults={'points_earned': 0}
-                )
-                
-                # Clear existing choices before adding new ones
-                response.selected_choices.clear()
-                
-                if question.question_type == 'text':
-                    response.response_text = request.POST.get(field_name, '')
-                    response.save()
-                elif question.question_type == 'multiple':
-                    # Handle multiple checkboxes
-                    choice_ids = request.POST.getlist(field_name)
-                    for choice_id in choice_ids:
-                        try:
-                            choice = question.choices.get(id=choice_id)
-                            response.selected_choices.add(choice)
-                        except QuestionChoice.DoesNotExist:
-                            pass
-                else:
-                    # Single choice or scale
-                    choice_id = request.POST.get(field_name)
-                    if choice_id:
-                        try:
-                            if question.question_type == 'scale':
-                                # For scale, save as text
-                                response.response_text = choice_id
-                                response.save()
-                            else:
-                                choice = question.choices.get(id=choice_id)
-                                response.selected_choices.add(choice)
-                        except (QuestionChoice.DoesNotExist, ValueError):
-                            pass
-        
-        # Debug: Check if responses exist
-        response_count = assessment.question_responses.count()
-        print(f"DEBUG - Total responses saved: {response_count}")
-        
-        # Calculate MCQ scores
-        assessment.calculate_scores()
-        assessment.save()  # Save the calculated MCQ scores to database
-        
-        # Debug: Check if scores were actually saved
-        assessment.refresh_from_db()
-        print(f"DEBUG - After save: knowledge_score={assessment.knowledge_score}, "
-              f"lifestyle_score={assessment.lifestyle_score}, "
-              f"readiness_score={assessment.readiness_score}, "
-              f"comprehensive_score={assessment.comprehensive_score}")
+            answer = {'question_id': question.id}
+            if question.question_type == 'text':
+                answer['response_text'] = request.POST.get(field_name, '')
+            elif question.question_type == 'multiple':
+                # Handle multiple checkboxes
+                answer['selected_choices'] = request.POST.getlist(field_name)
+            else:
+                choice_id = request.POST.get(field_name)
+                if choice_id and question.question_type == 'scale':
+                    # For scale, save as text
+                    answer['response_text'] = choice_id
+                elif choice_id:
+                    answer['selected_choices'] = [choice_id]
+            answers.append(answer)
+        
+        # Write all responses in bulk and recompute the MCQ scores once
+        MCQSubmissionService(assessment, questions=questions).submit(answers)
         
         messages.success(request, 'MCQ 평가가 성공적으로 저장되었습니다.')
         
@@ -705,13 +663,8 @@ def mcq_print_view(request, assessment_id):
         trainer__organization=request.organization
     )
     
-    # Get all categories with questions
-    categories = QuestionCategory.objects.filter(
-        is_active=True
-    ).prefetch_related(
-        'multiplechoicequestion_set__choices',
-        'multiplechoicequestion_set__questionresponse_set__selected_choices'
-    ).order_by('order')
+    # Categories with their active questions from the catalog snapshot
+    categories = get_catalog().categories
     
     # Get all responses for this assessment
     responses = {}
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import AssessmentReport
+from django.utils import timezone
+from .models import AssessmentReport, ReportJob
 
 
 @admin.register(AssessmentReport)
@@ -15,3 +16,28 @@ class AssessmentReportAdmin(admin.ModelAdmin):
             'assessment__client',
             'generated_by'
         )
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'assessment', 'organization', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'organization']
+    search_fields = ['assessment__client__name', 'locked_by']
+    readonly_fields = ['created_at', 'finished_at', 'locked_by', 'locked_at', 'report', 'error']
+    actions = ['requeue']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'assessment__client',
+            'organization'
+        )
+    
+    @admin.action(description='선택한 작업 다시 대기열에 추가')
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=ReportJob.STATUS_RUNNING).update(
+            status=ReportJob.STATUS_QUEUED,
+            attempts=0,
+            run_after=timezone.now(),
+            error=''
+        )
+        self.message_user(request, f'{updated}개 작업을 다시 대기열에 추가했습니다.')
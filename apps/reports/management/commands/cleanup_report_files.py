@@ -0,0 +1,153 @@
+"""
+Reclaim storage held by duplicate and orphaned report PDFs.
+
+New reports are stored once per content hash (see ReportGenerator). This
+command cleans up what that does not prevent:
+
+- reports of the same assessment, type and content hash created by
+  concurrent requests are merged into the newest one
+- byte-identical files, mostly from before content hashing, are pointed
+  at a single copy
+- files under reports/assessments/ that no report references are deleted
+  once they are older than --min-age-hours, so renders still being
+  saved are left alone
+
+Usage:
+    python manage.py cleanup_report_files --dry-run
+    python manage.py cleanup_report_files
+    python manage.py cleanup_report_files --min-age-hours 1
+"""
+
+import hashlib
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.reports.models import AssessmentReport, ReportJob
+
+
+REPORT_ROOT = 'reports/assessments'
+
+
+def _walk(storage, directory):
+    """Storage names of all files below a directory."""
+    try:
+        directories, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield f'{directory}/{name}'
+    for name in directories:
+        yield from _walk(storage, f'{directory}/{name}')
+
+
+def _file_digest(storage, name):
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Remove duplicate and orphaned report PDF files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be removed without making changes',
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=24,
+            help='Only delete unreferenced files older than this (default: 24)',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+        self.storage = AssessmentReport._meta.get_field('file_path').storage
+
+        merged = self.merge_duplicate_reports()
+        repointed = self.share_identical_files()
+        deleted, reclaimed = self.delete_orphans(timedelta(hours=options['min_age_hours']))
+
+        prefix = 'Would remove' if self.dry_run else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {merged} duplicate reports, repointed {repointed} reports to shared files, "
+            f"{deleted} orphaned files ({reclaimed / 1024 / 1024:.1f} MB)"
+        ))
+
+    def merge_duplicate_reports(self):
+        """Keep the newest report per (assessment, type, content hash)."""
+        groups = (
+            AssessmentReport.objects.exclude(content_hash='')
+            .values('assessment_id', 'report_type', 'content_hash')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+            .order_by()
+        )
+        merged = 0
+        for group in groups:
+            ids = list(
+                AssessmentReport.objects.filter(
+                    assessment_id=group['assessment_id'],
+                    report_type=group['report_type'],
+                    content_hash=group['content_hash'],
+                ).order_by('-generated_at', '-id').values_list('id', flat=True)
+            )
+            keep, duplicates = ids[0], ids[1:]
+            merged += len(duplicates)
+            if self.dry_run:
+                continue
+            # Their files stay on disk until they are found orphaned below
+            with transaction.atomic():
+                ReportJob.objects.filter(report_id__in=duplicates).update(report_id=keep)
+                AssessmentReport.objects.filter(id__in=duplicates).delete()
+        return merged
+
+    def share_identical_files(self):
+        """Point reports whose files have identical bytes at one copy."""
+        by_size = defaultdict(set)
+        for name, size in AssessmentReport.objects.exclude(file_path='').values_list('file_path', 'file_size'):
+            by_size[size].add(name)
+
+        repointed = 0
+        for names in by_size.values():
+            if len(names) < 2:
+                continue
+            by_digest = defaultdict(list)
+            for name in sorted(names):
+                if self.storage.exists(name):
+                    by_digest[_file_digest(self.storage, name)].append(name)
+            for copies in by_digest.values():
+                keep, others = copies[0], copies[1:]
+                if not others:
+                    continue
+                reports = AssessmentReport.objects.filter(file_path__in=others)
+                repointed += reports.count() if self.dry_run else reports.update(file_path=keep)
+        return repointed
+
+    def delete_orphans(self, min_age):
+        """Delete unreferenced files below REPORT_ROOT."""
+        referenced = set(AssessmentReport.objects.exclude(file_path='').values_list('file_path', flat=True))
+        cutoff = timezone.now() - min_age
+
+        deleted = reclaimed = 0
+        for name in _walk(self.storage, REPORT_ROOT):
+            if name in referenced or self.storage.get_modified_time(name) > cutoff:
+                continue
+            size = self.storage.size(name)
+            if self.verbosity >= 2:
+                self.stdout.write(f"  {name}")
+            if not self.dry_run:
+                self.storage.delete(name)
+            deleted += 1
+            reclaimed += size
+        return deleted, reclaimed
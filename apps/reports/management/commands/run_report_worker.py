@@ -0,0 +1,134 @@
+"""
+Process queued PDF report jobs.
+
+Each worker renders one report at a time; run several workers for more
+throughput. With --render-workers the PDFs are rendered by a pool of warm
+render processes (see apps.reports.render_pool) that are recycled before
+their memory grows too large; the pool's metrics are printed on exit. How many jobs run at once overall and per organization is
+limited by the queue (see apps.reports.queue), not by the number of
+workers. SIGTERM and SIGINT let the current job finish before exiting.
+
+Usage:
+    python manage.py run_report_worker
+    python manage.py run_report_worker --burst
+    python manage.py run_report_worker --max-jobs 100 --poll-interval 5
+    python manage.py run_report_worker --render-workers 2
+"""
+
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.reports import queue
+from apps.reports.models import ReportJob
+from apps.reports.render_pool import RenderPool
+from apps.reports.services import ReportGenerator
+
+
+class Command(BaseCommand):
+    help = 'Run a worker that generates queued PDF reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no job can be claimed instead of waiting for more',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Exit after processing this many jobs (default: 0, no limit)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when no job can be claimed (default: 2)',
+        )
+        parser.add_argument(
+            '--worker-id',
+            type=str,
+            default=f'{socket.gethostname()}:{os.getpid()}',
+            help='Name recorded on claimed jobs (default: host:pid)',
+        )
+        parser.add_argument(
+            '--render-workers',
+            type=int,
+            default=0,
+            help='Render PDFs in this many warm worker processes (default: 0, render in-process)',
+        )
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id']
+        max_jobs = options['max_jobs']
+        self.stopping = False
+
+        previous = {
+            signum: signal.signal(signum, self._stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            processed = self._work(worker_id, max_jobs, options)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(f"Report worker {worker_id} stopped after {processed} jobs")
+
+    def _work(self, worker_id, max_jobs, options):
+        self.stdout.write(f"Report worker {worker_id} started")
+        pool = RenderPool(workers=options['render_workers']) if options['render_workers'] else None
+        generator = ReportGenerator(render_pool=pool)
+        try:
+            return self._process(worker_id, max_jobs, options, generator)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+                self._write_metrics(pool.metrics())
+
+    def _process(self, worker_id, max_jobs, options, generator):
+        processed = 0
+
+        while not self.stopping and not (max_jobs and processed >= max_jobs):
+            close_old_connections()
+            job = queue.claim(worker_id)
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.monotonic()
+            job = queue.run(job, generator)
+            processed += 1
+
+            elapsed = time.monotonic() - started
+            if job.status == ReportJob.STATUS_SUCCEEDED:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Job #{job.pk}: report #{job.report_id} for assessment {job.assessment_id} in {elapsed:.1f}s"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f"Job #{job.pk}: attempt {job.attempts}/{job.max_attempts} failed, {job.status}: {job.error}"
+                ))
+
+        return processed
+
+    def _write_metrics(self, metrics):
+        if not metrics['renders']:
+            self.stdout.write(f"Render pool: no renders, {metrics['failures']} failures")
+            return
+        self.stdout.write(
+            f"Render pool: {metrics['renders']} renders, {metrics['failures']} failures, "
+            f"{metrics['recycles']} recycles, avg {metrics['render_seconds_avg']:.2f}s, "
+            f"p95 {metrics['render_seconds_p95']:.2f}s, max {metrics['render_seconds_max']:.2f}s, "
+            f"peak worker RSS {metrics['max_worker_rss_mb']:.0f} MB"
+        )
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0021_mcq_daily_rollups'),
+        ('reports', '0003_remove_summary_report_type'),
+        ('trainers', '0004_auditlog_notification_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('detailed', '상세 보고서')], default='detailed', max_length=20, verbose_name='보고서 유형')),
+                ('priority', models.SmallIntegerField(default=0, help_text='Lower runs first within an organization', verbose_name='우선순위')),
+                ('status', models.CharField(choices=[('queued', '대기 중'), ('running', '생성 중'), ('succeeded', '완료'), ('failed', '실패')], default='queued', max_length=20, verbose_name='상태')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='최대 시도 횟수')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='실행 가능 시각')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='작업자')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='작업 시작')),
+                ('error', models.TextField(blank=True, verbose_name='오류')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='요청일시')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='완료일시')),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='assessments.assessment', verbose_name='평가')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='trainers.organization', verbose_name='조직')),
+                ('report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='reports.assessmentreport', verbose_name='보고서')),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='요청자')),
+            ],
+            options={
+                'verbose_name': '보고서 생성 작업',
+                'verbose_name_plural': '보고서 생성 작업',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='reports_rep_status_f5271a_idx'), models.Index(fields=['organization', 'locked_at'], name='reports_rep_organiz_6d22f6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentreport',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the rendered report; identical reports share one file', max_length=64, verbose_name='내용 해시'),
+        ),
+    ]
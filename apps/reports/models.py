@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from apps.assessments.models import Assessment
 
 
@@ -40,6 +41,13 @@ class AssessmentReport(models.Model):
         default=0,
         verbose_name="파일 크기 (bytes)"
     )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 of the rendered report; identical reports share one file",
+        verbose_name="내용 해시"
+    )
     
     class Meta:
         verbose_name = "평가 보고서"
@@ -58,3 +66,126 @@ class AssessmentReport(models.Model):
         date_str = self.assessment.date.strftime('%Y%m%d')
         client_name = self.assessment.client.name.replace(' ', '_')
         return f"fitness_assessment_{client_name}_{date_str}.pdf"
+    
+    def delete_file(self):
+        """Delete the PDF unless another report shares it"""
+        if not self.file_path:
+            return
+        shared = AssessmentReport.objects.filter(
+            file_path=self.file_path.name
+        ).exclude(pk=self.pk).exists()
+        if not shared:
+            self.file_path.delete(save=False)
+
+
+class ReportJob(models.Model):
+    """Queued PDF report generation (see apps.reports.queue)"""
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, '대기 중'),
+        (STATUS_RUNNING, '생성 중'),
+        (STATUS_SUCCEEDED, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+    
+    assessment = models.ForeignKey(
+        Assessment,
+        on_delete=models.CASCADE,
+        related_name='report_jobs',
+        verbose_name="평가"
+    )
+    organization = models.ForeignKey(
+        'trainers.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='report_jobs',
+        verbose_name="조직"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name="요청자"
+    )
+    report_type = models.CharField(
+        max_length=20,
+        choices=AssessmentReport.REPORT_TYPES,
+        default='detailed',
+        verbose_name="보고서 유형"
+    )
+    priority = models.SmallIntegerField(
+        default=0,
+        help_text="Lower runs first within an organization",
+        verbose_name="우선순위"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name="상태"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="시도 횟수"
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+        verbose_name="최대 시도 횟수"
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="실행 가능 시각"
+    )
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="작업자"
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="작업 시작"
+    )
+    report = models.ForeignKey(
+        AssessmentReport,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name="보고서"
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="오류"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="요청일시"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="완료일시"
+    )
+    
+    class Meta:
+        verbose_name = "보고서 생성 작업"
+        verbose_name_plural = "보고서 생성 작업"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['organization', 'locked_at']),
+        ]
+    
+    def __str__(self):
+        return f"Report job #{self.pk} for assessment {self.assessment_id} ({self.status})"
+    
+    @property
+    def is_pending(self):
+        return self.status in (self.STATUS_QUEUED, self.STATUS_RUNNING)
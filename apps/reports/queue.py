@@ -0,0 +1,215 @@
+"""
+Database-backed queue for PDF report generation.
+
+Rendering a report with WeasyPrint takes seconds, which used to tie up a
+web worker for the whole request. Views now only `enqueue()` a ReportJob
+and poll its status; `python manage.py run_report_worker` processes run
+the jobs.
+
+Scheduling rules, applied by `claim()`:
+
+- at most REPORT_QUEUE_MAX_RUNNING jobs run at once across all workers,
+  and at most REPORT_QUEUE_MAX_RUNNING_PER_ORG per organization
+- among organizations with ready jobs, the one with the fewest running
+  jobs goes first, then the one served least recently, so a burst from
+  one organization cannot starve the others
+- within an organization jobs run by priority, then oldest first
+
+A failed job is retried with exponential backoff up to its max_attempts.
+A running job whose worker disappeared is handed out again once its lock
+is older than REPORT_QUEUE_LOCK_TIMEOUT.
+
+Claims are made with a conditional UPDATE, so two workers never run the
+same job. On PostgreSQL claims are also serialized with an advisory lock
+so the concurrency limits hold exactly; elsewhere concurrent claims may
+briefly exceed them by one.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from apps.reports.models import ReportJob
+from apps.reports.services import ReportGenerator
+
+logger = logging.getLogger(__name__)
+
+
+MAX_RUNNING = getattr(settings, 'REPORT_QUEUE_MAX_RUNNING', 2)
+MAX_RUNNING_PER_ORG = getattr(settings, 'REPORT_QUEUE_MAX_RUNNING_PER_ORG', 1)
+RETRY_DELAY = getattr(settings, 'REPORT_QUEUE_RETRY_DELAY', 30)
+LOCK_TIMEOUT = getattr(settings, 'REPORT_QUEUE_LOCK_TIMEOUT', 600)
+
+# Arbitrary key for pg_advisory_xact_lock
+ADVISORY_LOCK_KEY = 0x5EC0DE
+
+
+def _organization_q(organization_id) -> Q:
+    if organization_id is None:
+        return Q(organization__isnull=True)
+    return Q(organization_id=organization_id)
+
+
+def enqueue(assessment, user=None, report_type: str = 'detailed', priority: int = 0) -> ReportJob:
+    """
+    Queue a report for an assessment.
+
+    A queued or running job for the same assessment and report type is
+    returned instead of adding another.
+    """
+    pending = ReportJob.objects.filter(
+        assessment=assessment,
+        report_type=report_type,
+        status__in=[ReportJob.STATUS_QUEUED, ReportJob.STATUS_RUNNING],
+    ).order_by('created_at').first()
+    if pending:
+        return pending
+
+    trainer = assessment.trainer
+    return ReportJob.objects.create(
+        assessment=assessment,
+        organization_id=trainer.organization_id if trainer else None,
+        requested_by=user,
+        report_type=report_type,
+        priority=priority,
+    )
+
+
+def requeue_stale(now=None) -> int:
+    """Release running jobs whose lock has expired. Returns the number released."""
+    now = now or timezone.now()
+    stale = ReportJob.objects.filter(
+        status=ReportJob.STATUS_RUNNING,
+        locked_at__lt=now - timedelta(seconds=LOCK_TIMEOUT),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=ReportJob.STATUS_FAILED,
+        error='Worker stopped responding',
+        locked_by='',
+        finished_at=now,
+    )
+    requeued = stale.update(
+        status=ReportJob.STATUS_QUEUED,
+        locked_by='',
+        run_after=now,
+    )
+    return failed + requeued
+
+
+def _next_job(now) -> Optional[ReportJob]:
+    running = dict(
+        ReportJob.objects.filter(status=ReportJob.STATUS_RUNNING)
+        .order_by()
+        .values_list('organization_id')
+        .annotate(count=Count('id'))
+    )
+    if sum(running.values()) >= MAX_RUNNING:
+        return None
+
+    ready = ReportJob.objects.filter(status=ReportJob.STATUS_QUEUED, run_after__lte=now)
+    for organization_id, count in running.items():
+        if count >= MAX_RUNNING_PER_ORG:
+            ready = ready.exclude(_organization_q(organization_id))
+
+    organizations = set(ready.order_by().values_list('organization_id', flat=True).distinct())
+    if not organizations:
+        return None
+
+    last_served = dict(
+        ReportJob.objects.filter(locked_at__isnull=False)
+        .filter(Q(organization_id__in=organizations - {None}) | Q(organization__isnull=True))
+        .order_by()
+        .values_list('organization_id')
+        .annotate(last=Max('locked_at'))
+    )
+    never = now - timedelta(days=365 * 100)
+    organization_id = min(
+        organizations,
+        key=lambda org: (running.get(org, 0), last_served.get(org) or never, org or 0),
+    )
+    return ready.filter(_organization_q(organization_id)).order_by('priority', 'created_at').first()
+
+
+def claim(worker_id: str) -> Optional[ReportJob]:
+    """
+    Reserve the next job for a worker.
+
+    Returns:
+        The claimed job, now running, or None when nothing may run
+    """
+    now = timezone.now()
+    requeue_stale(now)
+
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [ADVISORY_LOCK_KEY])
+
+        # Lost races against another worker's claim are retried a few times
+        for _ in range(3):
+            job = _next_job(now)
+            if job is None:
+                return None
+            claimed = ReportJob.objects.filter(pk=job.pk, status=ReportJob.STATUS_QUEUED).update(
+                status=ReportJob.STATUS_RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+    return None
+
+
+def run(job: ReportJob, generator: Optional[ReportGenerator] = None) -> ReportJob:
+    """
+    Generate the report of a claimed job and record the outcome.
+
+    Failures are rescheduled with exponential backoff until the job runs
+    out of attempts.
+    """
+    generator = generator or ReportGenerator()
+    still_ours = ReportJob.objects.filter(
+        pk=job.pk, status=ReportJob.STATUS_RUNNING, locked_by=job.locked_by
+    )
+
+    try:
+        report = generator.generate_assessment_report(
+            assessment_id=job.assessment_id,
+            report_type=job.report_type,
+            user=job.requested_by,
+        )
+    except Exception as e:
+        logger.exception(f"Report job {job.pk} failed (attempt {job.attempts})")
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            still_ours.update(
+                status=ReportJob.STATUS_QUEUED,
+                locked_by='',
+                error=str(e),
+                run_after=now + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1)),
+            )
+        else:
+            still_ours.update(
+                status=ReportJob.STATUS_FAILED,
+                locked_by='',
+                error=str(e),
+                finished_at=now,
+            )
+    else:
+        still_ours.update(
+            status=ReportJob.STATUS_SUCCEEDED,
+            locked_by='',
+            report=report,
+            error='',
+            finished_at=timezone.now(),
+        )
+
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,205 @@
+"""
+Pool of long-lived WeasyPrint render processes.
+
+Each worker process sets up Django and loads the report fonts and base
+stylesheet once (see services.render_resources), then renders many
+reports. WeasyPrint processes grow over time, so workers are recycled:
+
+- a worker exits after REPORT_RENDER_MAX_RENDERS renders and is replaced
+  (ProcessPoolExecutor's max_tasks_per_child)
+- every render reports the worker's peak RSS; once one passes
+  REPORT_RENDER_MAX_RSS_MB the pool starts fresh workers for new renders
+  and lets the old ones finish what they have
+
+Workers are spawned rather than forked so they never inherit the web
+process's database connections or fontconfig state.
+
+`metrics()` exposes render counts, render times and worker memory.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+WORKERS = getattr(settings, 'REPORT_RENDER_WORKERS', 2)
+MAX_RENDERS = getattr(settings, 'REPORT_RENDER_MAX_RENDERS', 200)
+MAX_RSS_MB = getattr(settings, 'REPORT_RENDER_MAX_RSS_MB', 512)
+
+# Render times kept for the metrics percentiles
+TIMING_WINDOW = 500
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _init_worker():
+    """Configure Django and warm the fonts and stylesheet in a new worker."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    from apps.reports.services import WEASYPRINT_AVAILABLE, render_resources
+    if WEASYPRINT_AVAILABLE:
+        render_resources()
+
+
+def _render(html_string: str):
+    """Render in a worker; returns (pdf bytes, seconds, pid, peak RSS in MB)."""
+    from apps.reports.services import render_pdf
+
+    started = time.perf_counter()
+    pdf = render_pdf(html_string)
+    return pdf, time.perf_counter() - started, os.getpid(), _peak_rss_mb()
+
+
+class RenderPool:
+    """
+    Render report HTML to PDF bytes in warm worker processes.
+
+    Thread-safe; `submit()` may be called from several threads.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_renders: Optional[int] = None,
+                 max_rss_mb: Optional[float] = None, render=_render, initializer=_init_worker):
+        self.workers = workers or WORKERS
+        self.max_renders = max_renders or MAX_RENDERS
+        self.max_rss_mb = max_rss_mb or MAX_RSS_MB
+        self._render = render
+        self._initializer = initializer
+        self._lock = threading.Lock()
+        self._executor = None
+        self._generation = 0
+
+        self._renders = 0
+        self._failures = 0
+        self._recycles = 0
+        self._timings = deque(maxlen=TIMING_WINDOW)
+        self._worker_rss = {}
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=self._initializer,
+            max_tasks_per_child=self.max_renders,
+        )
+
+    def submit(self, html_string: str) -> Future:
+        """Queue a render; the future resolves to the PDF bytes."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+            generation = self._generation
+            inner = self._executor.submit(self._render, html_string)
+
+        outer = Future()
+
+        def done(inner_future):
+            try:
+                pdf, seconds, pid, rss_mb = inner_future.result()
+            except BaseException as e:
+                with self._lock:
+                    self._failures += 1
+                outer.set_exception(e)
+                return
+            self._record(generation, seconds, pid, rss_mb)
+            outer.set_result(pdf)
+
+        inner.add_done_callback(done)
+        return outer
+
+    def render(self, html_string: str) -> bytes:
+        """Render and wait for the PDF bytes."""
+        return self.submit(html_string).result()
+
+    def _record(self, generation, seconds, pid, rss_mb):
+        with self._lock:
+            self._renders += 1
+            self._timings.append(seconds)
+            self._worker_rss[pid] = rss_mb
+            if rss_mb > self.max_rss_mb and generation == self._generation:
+                logger.info(
+                    f"Render worker {pid} reached {rss_mb:.0f} MB, recycling render pool"
+                )
+                self._recycle_locked()
+
+    def _recycle_locked(self):
+        old, self._executor = self._executor, None
+        self._generation += 1
+        self._recycles += 1
+        self._worker_rss.clear()
+        if old is not None:
+            # Queued renders still run on the old workers before they exit
+            threading.Thread(target=old.shutdown, kwargs={'wait': True}, daemon=True).start()
+
+    def recycle(self):
+        """Start fresh workers for subsequent renders."""
+        with self._lock:
+            self._recycle_locked()
+
+    def metrics(self) -> Dict:
+        """
+        Render and memory statistics since the pool was created.
+
+        Returns:
+            Dict with renders, failures, recycles, render time (average,
+            p95 and max seconds over the last TIMING_WINDOW renders) and
+            the latest peak RSS per live worker pid in MB
+        """
+        with self._lock:
+            timings = sorted(self._timings)
+            worker_rss = dict(self._worker_rss)
+            renders, failures, recycles = self._renders, self._failures, self._recycles
+
+        def percentile(share):
+            return timings[min(len(timings) - 1, int(len(timings) * share))] if timings else None
+
+        return {
+            'workers': self.workers,
+            'renders': renders,
+            'failures': failures,
+            'recycles': recycles,
+            'render_seconds_avg': sum(timings) / len(timings) if timings else None,
+            'render_seconds_p95': percentile(0.95),
+            'render_seconds_max': timings[-1] if timings else None,
+            'worker_rss_mb': worker_rss,
+            'max_worker_rss_mb': max(worker_rss.values()) if worker_rss else None,
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> RenderPool:
+    """The process-wide render pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool()
+            atexit.register(_pool.shutdown)
+        return _pool
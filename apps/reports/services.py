@@ -1,6 +1,7 @@
 import os
+import hashlib
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Dict, List, Any, Optional
 from io import BytesIO
 
@@ -24,15 +25,90 @@ from apps.assessments.mcq_scoring_module.mcq_scoring import MCQScoringEngine
 
 logger = logging.getLogger(__name__)
 
+# Bump when render_resources()' stylesheet or fonts change so cached PDFs are not reused
+RENDER_VERSION = '1'
+
+
+def content_path(content_hash: str) -> str:
+    """Storage name of the PDF with the given content hash"""
+    return f"reports/assessments/content/{content_hash[:2]}/{content_hash}.pdf"
+
+
+_render_resources = None
+
+
+def render_resources():
+    """
+    FontConfiguration and base stylesheet of the current process.
+    
+    Font discovery and parsing the NanumGothic @font-face rules are a large
+    part of a render, so they are done once per process and reused. The
+    cache is keyed by pid because fontconfig state must not be shared with
+    forked children.
+    """
+    global _render_resources
+    if _render_resources is not None and _render_resources[0] == os.getpid():
+        return _render_resources[1:]
+    
+    font_config = FontConfiguration()
+    
+    # Get font path
+    font_path = os.path.join(settings.STATIC_ROOT or settings.STATICFILES_DIRS[0], 'fonts')
+    
+    # CSS for Korean font and page setup
+    font_css = CSS(string=f'''
+        @font-face {{
+            font-family: 'NanumGothic';
+            src: url('file://{font_path}/NanumGothic.ttf');
+            font-weight: normal;
+        }}
+        @font-face {{
+            font-family: 'NanumGothic';
+            src: url('file://{font_path}/NanumGothicBold.ttf');
+            font-weight: bold;
+        }}
+        @page {{
+            size: A4;
+            margin: 15mm 15mm 15mm 15mm;
+        }}
+        body {{
+            font-family: 'NanumGothic', 'Noto Sans KR', sans-serif;
+            margin: 0;
+            padding: 0;
+        }}
+        .page {{
+            width: 100%;
+            max-width: 100%;
+            margin: 0;
+            padding: 0;
+            box-shadow: none;
+        }}
+    ''', font_config=font_config)
+    
+    _render_resources = (os.getpid(), font_config, font_css)
+    return font_config, font_css
+
+
+def render_pdf(html_string: str) -> bytes:
+    """Render report HTML to PDF bytes with this process's fonts and stylesheet"""
+    font_config, font_css = render_resources()
+    return HTML(string=html_string).write_pdf(
+        stylesheets=[font_css],
+        font_config=font_config
+    )
+
 
 class ReportGenerator:
     """Service for generating PDF reports from assessments"""
     
-    def __init__(self):
-        if WEASYPRINT_AVAILABLE:
-            self.font_config = FontConfiguration()
-        else:
-            self.font_config = None
+    def __init__(self, render_pool=None):
+        """
+        Args:
+            render_pool: Optional RenderPool (apps.reports.render_pool) that
+                renders PDFs in warm worker processes; renders in-process
+                when omitted
+        """
+        self.render_pool = render_pool
     
     def generate_assessment_report(
         self, 
@@ -58,71 +134,40 @@ class ReportGenerator:
             # Get assessment with related data
             assessment = Assessment.objects.select_related('client').get(id=assessment_id)
             
-            # Calculate scores
-            scores = self._calculate_scores(assessment)
-            
-            # Calculate BMI
-            bmi = self._calculate_bmi(assessment.client.height, assessment.client.weight)
-            
-            # Get test results formatted for display
-            test_results = self._format_test_results(assessment)
-            
-            # Get MCQ data
-            mcq_data = self._get_mcq_data(assessment)
-            
-            # Get suggestions (including MCQ-based suggestions)
-            suggestions = self._get_suggestions(scores, mcq_data)
-            
-            # Get training program
-            training_program = self._get_training_program(assessment.client, scores)
-            
-            # Calculate follow-up dates
-            intermediate_check = assessment.created_at.date() + timedelta(days=45)
-            next_assessment = assessment.created_at.date() + timedelta(days=90)
-            
-            # Prepare context for template
-            context = {
-                'assessment': assessment,
-                'client': assessment.client,
-                'trainer_name': user.get_full_name() if user else '트레이너',
-                'bmi': bmi,
-                'scores': scores,
-                'strength_pct': min(100, max(0, (scores['strength'] / 5) * 100)),
-                'mobility_pct': min(100, max(0, (scores['mobility'] / 5) * 100)),
-                'balance_pct': min(100, max(0, (scores['balance'] / 5) * 100)),
-                'cardio_pct': min(100, max(0, (scores['cardio'] / 5) * 100)),
-                'overall_rating': self._get_overall_rating(scores['overall']),
-                'test_results': test_results,
-                'suggestions': suggestions,
-                'training_program': training_program,
-                'intermediate_check': intermediate_check,
-                'next_assessment': next_assessment,
-                # MCQ-related context
-                'mcq_data': mcq_data,
-                'has_mcq_data': mcq_data['has_responses'],
-                'mcq_scores': mcq_data['scores'],
-                'mcq_insights': mcq_data['insights'],
-                'mcq_risk_factors': mcq_data['risk_factors'],
-                'comprehensive_score': mcq_data['comprehensive_score'],
-            }
-            
             # Render HTML
+            context = self._build_context(assessment, user)
             html_string = render_to_string('reports/assessment_report.html', context)
+            content_hash = self._content_hash(html_string)
             
-            # Convert to PDF
-            pdf_file = self._html_to_pdf(html_string)
+            # Nothing in the report changed since it was last generated
+            cached = AssessmentReport.objects.filter(
+                assessment=assessment,
+                report_type=report_type,
+                content_hash=content_hash
+            ).order_by('-generated_at').first()
+            if cached and cached.file_path and cached.file_path.storage.exists(cached.file_path.name):
+                logger.info(f"Reusing report {cached.id} for assessment {assessment_id}")
+                return cached
             
-            # Create report record
-            report = AssessmentReport.objects.create(
+            report = AssessmentReport(
                 assessment=assessment,
                 generated_by=user,
                 report_type=report_type,
-                file_size=pdf_file.getbuffer().nbytes
+                content_hash=content_hash
             )
             
-            # Save PDF file
-            filename = f"assessment_report_{assessment.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            report.file_path.save(filename, ContentFile(pdf_file.getvalue()))
+            # Identical reports share one file, so only render when it is missing
+            storage = report.file_path.storage
+            filename = content_path(content_hash)
+            if storage.exists(filename):
+                report.file_size = storage.size(filename)
+            else:
+                pdf_file = self._html_to_pdf(html_string)
+                report.file_size = pdf_file.getbuffer().nbytes
+                filename = storage.save(filename, ContentFile(pdf_file.getvalue()))
+            
+            report.file_path.name = filename
+            report.save()
             
             logger.info(f"Generated report for assessment {assessment_id}")
             return report
@@ -134,54 +179,75 @@ class ReportGenerator:
             logger.error(f"Error generating report: {str(e)}")
             raise
     
+    def _build_context(self, assessment: Assessment, user=None) -> Dict[str, Any]:
+        """Template context for an assessment report"""
+        # Calculate scores
+        scores = self._calculate_scores(assessment)
+        
+        # Calculate BMI
+        bmi = self._calculate_bmi(assessment.client.height, assessment.client.weight)
+        
+        # Get test results formatted for display
+        test_results = self._format_test_results(assessment)
+        
+        # Get MCQ data
+        mcq_data = self._get_mcq_data(assessment)
+        
+        # Get suggestions (including MCQ-based suggestions)
+        suggestions = self._get_suggestions(scores, mcq_data)
+        
+        # Get training program
+        training_program = self._get_training_program(assessment.client, scores)
+        
+        # Calculate follow-up dates
+        intermediate_check = assessment.created_at.date() + timedelta(days=45)
+        next_assessment = assessment.created_at.date() + timedelta(days=90)
+        
+        return {
+            'assessment': assessment,
+            'client': assessment.client,
+            'trainer_name': user.get_full_name() if user else '트레이너',
+            'bmi': bmi,
+            'scores': scores,
+            'strength_pct': min(100, max(0, (scores['strength'] / 5) * 100)),
+            'mobility_pct': min(100, max(0, (scores['mobility'] / 5) * 100)),
+            'balance_pct': min(100, max(0, (scores['balance'] / 5) * 100)),
+            'cardio_pct': min(100, max(0, (scores['cardio'] / 5) * 100)),
+            'overall_rating': self._get_overall_rating(scores['overall']),
+            'test_results': test_results,
+            'suggestions': suggestions,
+            'training_program': training_program,
+            'intermediate_check': intermediate_check,
+            'next_assessment': next_assessment,
+            # MCQ-related context
+            'mcq_data': mcq_data,
+            'has_mcq_data': mcq_data['has_responses'],
+            'mcq_scores': mcq_data['scores'],
+            'mcq_insights': mcq_data['insights'],
+            'mcq_risk_factors': mcq_data['risk_factors'],
+            'comprehensive_score': mcq_data['comprehensive_score'],
+        }
+    
+    def _content_hash(self, html_string: str) -> str:
+        """
+        Key identifying a rendered report.
+        
+        The HTML carries the assessment inputs, scores, MCQ data, trainer
+        name and template; RENDER_VERSION covers the stylesheet and fonts
+        added at render time.
+        """
+        digest = hashlib.sha256(RENDER_VERSION.encode())
+        digest.update(html_string.encode('utf-8'))
+        return digest.hexdigest()
+    
     def _html_to_pdf(self, html_string: str) -> BytesIO:
-        """Convert HTML to PDF using WeasyPrint"""
+        """Convert HTML to PDF using WeasyPrint, in the render pool when one is set"""
         if not WEASYPRINT_AVAILABLE:
             raise RuntimeError("WeasyPrint is not available.")
-            
-        # Get font path
-        font_path = os.path.join(settings.STATIC_ROOT or settings.STATICFILES_DIRS[0], 'fonts')
-        
-        # CSS for Korean font and page setup
-        font_css = CSS(string=f'''
-            @font-face {{
-                font-family: 'NanumGothic';
-                src: url('file://{font_path}/NanumGothic.ttf');
-                font-weight: normal;
-            }}
-            @font-face {{
-                font-family: 'NanumGothic';
-                src: url('file://{font_path}/NanumGothicBold.ttf');
-                font-weight: bold;
-            }}
-            @page {{
-                size: A4;
-                margin: 15mm 15mm 15mm 15mm;
-            }}
-            body {{
-                font-family: 'NanumGothic', 'Noto Sans KR', sans-serif;
-                margin: 0;
-                padding: 0;
-            }}
-            .page {{
-                width: 100%;
-                max-width: 100%;
-                margin: 0;
-                padding: 0;
-                box-shadow: none;
-            }}
-        ''', font_config=self.font_config)
-        
-        # Generate PDF
-        pdf_file = BytesIO()
-        HTML(string=html_string).write_pdf(
-            pdf_file,
-            stylesheets=[font_css],
-            font_config=self.font_config
-        )
-        pdf_file.seek(0)
         
-        return pdf_file
+        if self.render_pool is not None:
+            return BytesIO(self.render_pool.render(html_string))
+        return BytesIO(render_pdf(html_string))
     
     def _calculate_scores(self, assessment: Assessment) -> Dict[str, float]:
         """Get category scores from assessment data"""
@@ -0,0 +1,66 @@
+"""
+Tests for the WeasyPrint render worker pool.
+
+The workers run fake_render instead of WeasyPrint; it reports the RSS
+given in the HTML so recycling can be triggered on demand.
+"""
+
+import os
+
+import pytest
+
+from apps.reports.render_pool import RenderPool
+
+
+def fake_render(html_string):
+    if html_string == 'fail':
+        raise ValueError('bad template')
+    rss = 900.0 if html_string == 'big' else 100.0
+    return f'%PDF {html_string}'.encode(), 0.01, os.getpid(), rss
+
+
+def no_setup():
+    pass
+
+
+@pytest.fixture
+def pool():
+    pool = RenderPool(workers=2, max_renders=2, max_rss_mb=512, render=fake_render, initializer=no_setup)
+    yield pool
+    pool.shutdown()
+
+
+class TestRenderPool:
+    def test_renders_and_metrics(self, pool):
+        futures = [pool.submit(f'report {index}') for index in range(5)]
+
+        assert [future.result(timeout=60) for future in futures] == [
+            f'%PDF report {index}'.encode() for index in range(5)
+        ]
+        with pytest.raises(ValueError):
+            pool.render('fail')
+
+        metrics = pool.metrics()
+        assert (metrics['renders'], metrics['failures'], metrics['recycles']) == (5, 1, 0)
+        assert metrics['render_seconds_avg'] == pytest.approx(0.01)
+        assert metrics['max_worker_rss_mb'] == 100.0
+        # Workers exit after max_renders renders, so more than two served them
+        assert len(metrics['worker_rss_mb']) > 2
+
+    def test_large_worker_recycles_the_pool(self, pool):
+        pool.render('small')
+        first_workers = set(pool.metrics()['worker_rss_mb'])
+
+        assert pool.render('big') == b'%PDF big'
+        assert pool.metrics()['recycles'] == 1
+        assert pool.metrics()['worker_rss_mb'] == {}
+
+        pool.render('small')
+        metrics = pool.metrics()
+        assert set(metrics['worker_rss_mb']).isdisjoint(first_workers)
+        assert metrics['renders'] == 3
+
+    def test_metrics_before_any_render(self):
+        metrics = RenderPool(workers=1).metrics()
+        assert metrics['renders'] == 0
+        assert metrics['render_seconds_p95'] is None
@@ -0,0 +1,152 @@
+"""
+Tests for content-addressed report storage and its cleanup command.
+"""
+
+import os
+import time
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from apps.assessments.factories import AssessmentFactory
+from apps.clients.factories import ClientFactory
+from apps.reports import services
+from apps.reports.models import AssessmentReport
+from apps.reports.services import ReportGenerator
+from apps.trainers.factories import TrainerFactory
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def renders():
+    """Count PDF renders without WeasyPrint."""
+    calls = []
+
+    def html_to_pdf(self, html_string):
+        calls.append(html_string)
+        return BytesIO(b'%PDF-1.7 ' + str(len(calls)).encode())
+
+    with patch.object(services, 'WEASYPRINT_AVAILABLE', True), \
+            patch.object(ReportGenerator, '_html_to_pdf', html_to_pdf):
+        yield calls
+
+
+@pytest.fixture
+def assessment():
+    trainer = TrainerFactory()
+    return AssessmentFactory(client=ClientFactory(trainer=trainer), trainer=trainer)
+
+
+@pytest.mark.django_db
+class TestReportCache:
+    def test_unchanged_assessment_reuses_report(self, media, renders, assessment):
+        user = assessment.trainer.user
+
+        first = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+        second = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+
+        assert second.pk == first.pk
+        assert len(renders) == 1
+        assert first.file_path.name == services.content_path(first.content_hash)
+        assert first.file_size == os.path.getsize(first.file_path.path)
+
+    def test_changes_render_a_new_report(self, media, renders, assessment):
+        user = assessment.trainer.user
+        first = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+
+        assessment.client.name = 'Renamed Client'
+        assessment.client.save()
+        renamed = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+        # The trainer name is part of the report
+        other_trainer = ReportGenerator().generate_assessment_report(assessment.id, user=None)
+
+        assert len({first.content_hash, renamed.content_hash, other_trainer.content_hash}) == 3
+        assert len(renders) == 3
+
+    def test_identical_content_shares_the_file(self, media, renders, assessment):
+        user = assessment.trainer.user
+        first = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+
+        # A deleted record leaves its file for the next identical report
+        AssessmentReport.objects.filter(pk=first.pk).delete()
+        again = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+        assert again.pk != first.pk
+        assert again.file_path.name == first.file_path.name
+        assert len(renders) == 1
+
+        # Deleting one of two reports sharing a file keeps the file
+        sharing = AssessmentReport.objects.create(
+            assessment=assessment, file_path=again.file_path.name, content_hash='other'
+        )
+        sharing.delete_file()
+        assert default_storage.exists(again.file_path.name)
+        sharing.delete()
+        name = again.file_path.name
+        again.delete_file()
+        assert not default_storage.exists(name)
+
+    def test_missing_file_is_rendered_again(self, media, renders, assessment):
+        user = assessment.trainer.user
+        first = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+        default_storage.delete(first.file_path.name)
+
+        second = ReportGenerator().generate_assessment_report(assessment.id, user=user)
+
+        assert second.pk != first.pk
+        assert len(renders) == 2
+        assert default_storage.exists(second.file_path.name)
+
+
+@pytest.mark.django_db
+class TestCleanupCommand:
+    def save(self, name, content, age_hours=48):
+        name = default_storage.save(name, ContentFile(content))
+        stamp = time.time() - age_hours * 3600
+        os.utime(default_storage.path(name), (stamp, stamp))
+        return name
+
+    def test_cleanup(self, media, assessment):
+        # Byte-identical legacy files
+        legacy_a = self.save('reports/assessments/2025/01/a.pdf', b'%PDF same')
+        legacy_b = self.save('reports/assessments/2025/02/b.pdf', b'%PDF same')
+        report_a = AssessmentReport.objects.create(assessment=assessment, file_path=legacy_a, file_size=9)
+        report_b = AssessmentReport.objects.create(assessment=assessment, file_path=legacy_b, file_size=9)
+        # Duplicate records of one content hash
+        shared = self.save('reports/assessments/content/ab/abc.pdf', b'%PDF hashed')
+        duplicates = [
+            AssessmentReport.objects.create(
+                assessment=assessment, file_path=shared, file_size=11, content_hash='abc'
+            )
+            for _ in range(2)
+        ]
+        # Orphans, one too recent to touch
+        self.save('reports/assessments/2025/03/orphan.pdf', b'%PDF orphan')
+        recent = self.save('reports/assessments/2025/03/recent.pdf', b'%PDF recent', age_hours=1)
+
+        out = StringIO()
+        call_command('cleanup_report_files', dry_run=True, stdout=out)
+        assert 'Would remove 1 duplicate reports, repointed 1 reports to shared files, 1 orphaned files' in out.getvalue()
+        assert AssessmentReport.objects.count() == 4
+
+        out = StringIO()
+        call_command('cleanup_report_files', stdout=out)
+
+        report_a.refresh_from_db()
+        report_b.refresh_from_db()
+        assert report_a.file_path.name == report_b.file_path.name == legacy_a
+        assert list(AssessmentReport.objects.filter(content_hash='abc')) == [duplicates[1]]
+        remaining = {
+            name for name in (legacy_a, legacy_b, shared, recent,
+                              'reports/assessments/2025/03/orphan.pdf')
+            if default_storage.exists(name)
+        }
+        assert remaining == {legacy_a, shared, recent}
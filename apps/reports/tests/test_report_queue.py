@@ -0,0 +1,204 @@
+"""
+Tests for the report generation queue and its worker.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.assessments.factories import AssessmentFactory
+from apps.clients.factories import ClientFactory
+from apps.reports import queue
+from apps.reports.models import AssessmentReport, ReportJob
+from apps.trainers.factories import OrganizationFactory, TrainerFactory
+
+
+class FakeGenerator:
+    """Stands in for ReportGenerator; fails the first `failures` calls."""
+
+    def __init__(self, failures=0, render_pool=None):
+        self.failures = failures
+        self.calls = []
+
+    def generate_assessment_report(self, assessment_id, report_type='detailed', user=None):
+        self.calls.append(assessment_id)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('render failed')
+        return AssessmentReport.objects.create(assessment_id=assessment_id, generated_by=user)
+
+
+def make_assessment(trainer):
+    return AssessmentFactory(client=ClientFactory(trainer=trainer), trainer=trainer)
+
+
+@pytest.fixture
+def trainers():
+    return [TrainerFactory(organization=OrganizationFactory()) for _ in range(2)]
+
+
+@pytest.mark.django_db
+class TestQueue:
+    def test_enqueue_reuses_pending_job(self, trainers):
+        assessment = make_assessment(trainers[0])
+
+        job = queue.enqueue(assessment, trainers[0].user)
+        assert queue.enqueue(assessment, trainers[0].user) == job
+        assert job.organization_id == trainers[0].organization_id
+
+        ReportJob.objects.filter(pk=job.pk).update(status=ReportJob.STATUS_SUCCEEDED)
+        assert queue.enqueue(assessment, trainers[0].user) != job
+
+    def test_claim_and_run(self, trainers):
+        job = queue.enqueue(make_assessment(trainers[0]), trainers[0].user)
+
+        claimed = queue.claim('worker-1')
+        assert (claimed.pk, claimed.status, claimed.locked_by, claimed.attempts) == (
+            job.pk, ReportJob.STATUS_RUNNING, 'worker-1', 1
+        )
+        assert queue.claim('worker-2') is None
+
+        done = queue.run(claimed, FakeGenerator())
+        assert done.status == ReportJob.STATUS_SUCCEEDED
+        assert done.report.generated_by == trainers[0].user
+        assert done.finished_at is not None
+
+    @patch.object(queue, 'MAX_RUNNING', 3)
+    @patch.object(queue, 'MAX_RUNNING_PER_ORG', 2)
+    def test_concurrency_limits(self, trainers):
+        busy, quiet = trainers
+        for _ in range(5):
+            queue.enqueue(make_assessment(busy))
+        queue.enqueue(make_assessment(quiet))
+
+        claimed = [queue.claim(f'worker-{index}') for index in range(4)]
+
+        assert claimed[3] is None
+        organizations = [job.organization_id for job in claimed[:3]]
+        assert sorted(organizations) == sorted([busy.organization_id] * 2 + [quiet.organization_id])
+
+    @patch.object(queue, 'MAX_RUNNING_PER_ORG', 5)
+    def test_organizations_take_turns(self, trainers):
+        busy, quiet = trainers
+        for _ in range(6):
+            queue.enqueue(make_assessment(busy))
+        for _ in range(2):
+            queue.enqueue(make_assessment(quiet))
+
+        order = []
+        generator = FakeGenerator()
+        while True:
+            job = queue.claim('worker')
+            if job is None:
+                break
+            order.append(job.organization_id)
+            queue.run(job, generator)
+
+        # The burst does not hold back the quiet organization's jobs
+        assert order[:4] == [busy.organization_id, quiet.organization_id] * 2
+        assert len(order) == 8
+
+    def test_within_organization_priority_then_age(self, trainers):
+        first = queue.enqueue(make_assessment(trainers[0]), priority=5)
+        urgent = queue.enqueue(make_assessment(trainers[0]), priority=0)
+        second = queue.enqueue(make_assessment(trainers[0]), priority=5)
+
+        order = []
+        for _ in range(3):
+            job = queue.claim('worker')
+            order.append(job.pk)
+            queue.run(job, FakeGenerator())
+        assert order == [urgent.pk, first.pk, second.pk]
+
+    def test_failures_retry_with_backoff_then_fail(self, trainers):
+        job = queue.enqueue(make_assessment(trainers[0]))
+        generator = FakeGenerator(failures=3)
+
+        job = queue.run(queue.claim('worker'), generator)
+        assert job.status == ReportJob.STATUS_QUEUED
+        assert job.error == 'render failed'
+        assert job.run_after > timezone.now() + timedelta(seconds=queue.RETRY_DELAY - 5)
+        # Not ready until the backoff has passed
+        assert queue.claim('worker') is None
+
+        for attempt in (2, 3):
+            ReportJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            job = queue.run(queue.claim('worker'), generator)
+            assert job.attempts == attempt
+
+        assert job.status == ReportJob.STATUS_FAILED
+        assert job.finished_at is not None
+
+    def test_stale_locks_are_released(self, trainers):
+        job = queue.enqueue(make_assessment(trainers[0]))
+        queue.claim('vanished')
+        ReportJob.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=queue.LOCK_TIMEOUT + 1)
+        )
+
+        claimed = queue.claim('worker')
+        assert (claimed.pk, claimed.locked_by, claimed.attempts) == (job.pk, 'worker', 2)
+
+        # The vanished worker can no longer record an outcome
+        claimed.locked_by = 'vanished'
+        queue.run(claimed, FakeGenerator())
+        claimed.refresh_from_db()
+        assert claimed.status == ReportJob.STATUS_RUNNING
+
+
+@pytest.mark.django_db
+class TestWorkerCommand:
+    def test_burst_drains_the_queue(self, trainers):
+        for trainer in trainers:
+            queue.enqueue(make_assessment(trainer))
+
+        out = StringIO()
+        with patch(
+            'apps.reports.management.commands.run_report_worker.ReportGenerator', FakeGenerator
+        ):
+            call_command('run_report_worker', burst=True, worker_id='test', stdout=out)
+
+        assert 'stopped after 2 jobs' in out.getvalue()
+        assert ReportJob.objects.filter(status=ReportJob.STATUS_SUCCEEDED).count() == 2
+
+
+@pytest.mark.django_db
+class TestViews:
+    @pytest.fixture(autouse=True)
+    def weasyprint(self):
+        with patch('apps.reports.views.WEASYPRINT_AVAILABLE', True):
+            yield
+
+    def test_generate_enqueues_without_rendering(self, client, trainers):
+        trainer = trainers[0]
+        assessment = make_assessment(trainer)
+        client.force_login(trainer.user)
+
+        with patch('apps.reports.services.ReportGenerator.generate_assessment_report') as render:
+            response = client.get(reverse('reports:generate', args=[assessment.pk]))
+
+        render.assert_not_called()
+        job = ReportJob.objects.get()
+        assert response.status_code == 302
+        assert response.url == reverse('reports:job_status', args=[job.pk])
+
+    def test_status_fragment_polls_until_done(self, client, trainers):
+        trainer = trainers[0]
+        client.force_login(trainer.user)
+        job = queue.enqueue(make_assessment(trainer), trainer.user)
+        url = reverse('reports:job_status', args=[job.pk])
+
+        response = client.get(url, HTTP_HX_REQUEST='true')
+        assert 'hx-trigger="every 2s"' in response.content.decode()
+
+        queue.run(queue.claim('worker'), FakeGenerator())
+        response = client.get(url, HTTP_HX_REQUEST='true')
+        content = response.content.decode()
+        job.refresh_from_db()
+        assert 'hx-trigger' not in content
+        assert reverse('reports:download', args=[job.report_id]) in content
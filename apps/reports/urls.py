@@ -11,6 +11,7 @@ urlpatterns = [
     
     # Report generation
     path('generate/<int:assessment_id>/', views.generate_report, name='generate'),
+    path('jobs/<int:job_id>/', views.report_job_status, name='job_status'),
     
     # Report actions
     path('<int:report_id>/download/', views.download_report, name='download'),
@@ -10,8 +10,9 @@ import logging
 
 from apps.assessments.models import Assessment
 from apps.clients.models import Client
-from apps.reports.models import AssessmentReport
-from apps.reports.services import ReportGenerator, WEASYPRINT_AVAILABLE
+from apps.reports import queue as report_queue
+from apps.reports.models import AssessmentReport, ReportJob
+from apps.reports.services import WEASYPRINT_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +58,7 @@ def report_list(request):
 
 @login_required
 def generate_report(request, assessment_id):
-    """Generate a new report for an assessment"""
+    """Queue a new report for an assessment and show its progress"""
     assessment = get_object_or_404(Assessment, pk=assessment_id)
     
     # Check if WeasyPrint is available
@@ -65,22 +66,28 @@ def generate_report(request, assessment_id):
         messages.error(request, 'PDF 생성 기능을 사용할 수 없습니다. WeasyPrint가 설치되지 않았습니다.')
         return redirect('assessments:detail', pk=assessment_id)
     
-    try:
-        # Generate detailed report directly
-        generator = ReportGenerator()
-        report = generator.generate_assessment_report(
-            assessment_id=assessment.id,
-            report_type='detailed',  # Always generate detailed report
-            user=request.user
-        )
-        
-        messages.success(request, '보고서가 성공적으로 생성되었습니다.')
-        return redirect('reports:download', report_id=report.id)
-        
-    except Exception as e:
-        logger.error(f"Error generating report: {str(e)}")
-        messages.error(request, '보고서 생성 중 오류가 발생했습니다.')
-        return redirect('assessments:detail', pk=assessment_id)
+    # Rendering happens in run_report_worker; the request only queues it
+    job = report_queue.enqueue(
+        assessment,
+        user=request.user,
+        report_type='detailed',  # Always generate detailed report
+    )
+    
+    if request.headers.get('HX-Request'):
+        return render(request, 'reports/partials/report_job_status.html', {'job': job})
+    return redirect('reports:job_status', job_id=job.id)
+
+
+@login_required
+def report_job_status(request, job_id):
+    """Report job progress; HTMX requests poll the status fragment"""
+    job = get_object_or_404(
+        ReportJob.objects.select_related('assessment__client'),
+        pk=job_id
+    )
+    
+    template = 'reports/partials/report_job_status.html' if request.headers.get('HX-Request') else 'reports/report_job.html'
+    return render(request, template, {'job': job})
 
 
 @login_required
@@ -139,9 +146,8 @@ def delete_report(request, report_id):
     """Delete a report"""
     report = get_object_or_404(AssessmentReport, pk=report_id)
     
-    # Delete the file
-    if report.file_path:
-        report.file_path.delete()
+    # Delete the file unless another report shares it
+    report.delete_file()
     
     # Delete the record
     report.delete()
@@ -116,4 +116,19 @@ def disable_logging(caplog):
     import logging
     logging.disable(logging.CRITICAL)
     yield
-    logging.disable(logging.NOTSET)
\ No newline at end of file
+    logging.disable(logging.NOTSET)
+
+# Reset per-process lookup caches so rolled-back rows never leak between tests
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    """
+    Clear in-memory indexes that outlive the test database transaction.
+    """
+    from apps.assessments import mcq_catalog, norms_table, standards_index
+    standards_index.reset()
+    norms_table.reset()
+    mcq_catalog.reset()
+    yield
+    standards_index.reset()
+    norms_table.reset()
+    mcq_catalog.reset()